@@ -7,6 +7,7 @@ import subprocess
 from dataclasses import dataclass
 
 from data_clients.exceptions import IMessageError
+from data_clients.imessage.sender import _sanitize_applescript
 
 logger = logging.getLogger(__name__)
 
@@ -28,7 +29,7 @@ def search_contacts(query: str, limit: int = 5) -> list[ContactResult]:
     Returns:
         List of ContactResult with name, phone numbers, and emails.
     """
-    safe_query = query.replace("\\", "\\\\").replace('"', '\\"')
+    safe_query = _sanitize_applescript(query)
 
     script = f'''
 tell application "Contacts"
@@ -5,7 +5,9 @@ from __future__ import annotations
 import logging
 import re
 import sqlite3
-from datetime import datetime, timedelta
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from pathlib import Path
 
 from data_clients.exceptions import IMessageReadError
@@ -37,6 +39,64 @@ _ATTRIBUTED_SKIP_TOKENS = (
     "NSObject",
 )
 
+# Column order shared by both fetch_messages queries; rows come back as plain
+# tuples and are unpacked positionally in _build_message.
+# NULLs are coalesced in SQL so rows need no Python-side normalization.
+_MESSAGE_COLUMNS = """
+    m.ROWID,
+    m.guid,
+    COALESCE(m.text, '') AS text,
+    m.attributedBody,
+    m.date,
+    m.is_from_me,
+    m.is_read,
+    COALESCE(m.service, '') AS service,
+    m.cache_has_attachments,
+    COALESCE(m.associated_message_type, 0) AS associated_message_type,
+    COALESCE(m.associated_message_guid, '') AS associated_message_guid,
+    COALESCE(m.thread_originator_guid, '') AS thread_originator_guid,
+    COALESCE(h.id, '') AS handle_id
+"""
+
+# Messages across all chats. The LIMIT is anchored on a descending date walk
+# so SQLite can stop after `limit` rows of the date index, then the outer
+# query restores chronological order.
+_RECENT_MESSAGES_SQL = f"""
+    SELECT * FROM (
+        SELECT {_MESSAGE_COLUMNS}
+        FROM message m
+        LEFT JOIN handle h ON h.ROWID = m.handle_id
+        WHERE m.date > ?
+        ORDER BY m.date DESC
+        LIMIT ?
+    )
+    ORDER BY date ASC
+"""
+
+
+def _exclusion_filter(excluded_contacts: list[str]) -> tuple[str, list[str]]:
+    """SQL conditions and parameters excluding chats that match ``excluded_contacts``.
+
+    A chat is excluded when its identifier or any participant handle contains
+    one of the strings. Filtering in SQL keeps excluded chats from using up
+    the ``LIMIT``.
+    """
+    if not excluded_contacts:
+        return "", []
+    matches = " OR ".join("instr(h.id, ?) > 0" for _ in excluded_contacts)
+    sql = "".join(
+        "\n                  AND instr(COALESCE(c.chat_identifier, ''), ?) = 0"
+        for _ in excluded_contacts
+    )
+    sql += f"""
+                  AND NOT EXISTS (
+                      SELECT 1
+                      FROM chat_handle_join chj
+                      JOIN handle h ON h.ROWID = chj.handle_id
+                      WHERE chj.chat_id = c.ROWID AND ({matches})
+                  )"""
+    return sql, [*excluded_contacts, *excluded_contacts]
+
 
 class ChatDBReader:
     """Read-only connection to the macOS Messages database."""
@@ -54,9 +114,7 @@ class ChatDBReader:
             )
         try:
             uri = f"file:{self.db_path}?mode=ro"
-            conn = sqlite3.connect(uri, uri=True)
-            conn.row_factory = sqlite3.Row
-            return conn
+            return sqlite3.connect(uri, uri=True)
         except (sqlite3.OperationalError, sqlite3.DatabaseError) as e:
             err = str(e).lower()
             if "unable to open" in err or "authorization denied" in err:
@@ -71,9 +129,13 @@ class ChatDBReader:
         """Detect if timestamps are in nanoseconds (newer macOS) or seconds."""
         if self._nanoseconds is not None:
             return self._nanoseconds
-        row = conn.execute("SELECT MAX(ABS(date)) FROM message").fetchone()
-        max_date = row[0] if row and row[0] else 0
-        self._nanoseconds = max_date > 1e12
+        # Probe the newest non-zero date via the rowid B-tree rather than
+        # scanning the whole column with MAX(ABS(date)).
+        row = conn.execute(
+            "SELECT ABS(date) FROM message WHERE date != 0 ORDER BY ROWID DESC LIMIT 1"
+        ).fetchone()
+        probe_date = row[0] if row and row[0] else 0
+        self._nanoseconds = probe_date > 1e12
         return self._nanoseconds
 
     def _convert_timestamp(self, apple_ts: int | None, conn: sqlite3.Connection) -> str:
@@ -89,12 +151,15 @@ class ChatDBReader:
         except (OSError, ValueError):
             return ""
 
-    def _apple_ts_from_datetime(self, dt: datetime, conn: sqlite3.Connection) -> int:
-        """Convert a datetime to an Apple timestamp for queries."""
-        unix_ts = dt.timestamp()
-        apple_ts = unix_ts - APPLE_EPOCH_OFFSET
+    def _apple_ts_since(self, days: int, conn: sqlite3.Connection) -> int:
+        """Apple timestamp for ``days`` ago, for ``date > ?`` query cutoffs.
+
+        Works from ``time.time()`` directly rather than building a datetime
+        and round-tripping it through ``.timestamp()``.
+        """
+        apple_ts = time.time() - days * 86400 - APPLE_EPOCH_OFFSET
         if self._detect_timestamp_format(conn):
-            apple_ts = int(apple_ts * 1e9)
+            apple_ts *= 1e9
         return int(apple_ts)
 
     def fetch_conversations(
@@ -106,51 +171,38 @@ class ChatDBReader:
         """Fetch recent conversations with participant info."""
         conn = self._connect()
         try:
-            since = datetime.now() - timedelta(days=days)
-            apple_since = self._apple_ts_from_datetime(since, conn)
+            apple_since = self._apple_ts_since(days, conn)
+            exclusion_sql, exclusion_params = _exclusion_filter(excluded_contacts or [])
 
             rows = conn.execute(
-                """
+                f"""
                 SELECT DISTINCT
                     c.ROWID as chat_id,
                     c.guid as chat_guid,
-                    c.chat_identifier,
-                    c.display_name,
-                    c.service_name
+                    COALESCE(c.chat_identifier, '') AS chat_identifier,
+                    COALESCE(c.display_name, '') AS display_name,
+                    COALESCE(c.service_name, '') AS service_name
                 FROM chat c
                 JOIN chat_message_join cmj ON cmj.chat_id = c.ROWID
                 JOIN message m ON m.ROWID = cmj.message_id
-                WHERE m.date > ?
+                WHERE m.date > ?{exclusion_sql}
                 ORDER BY m.date DESC
                 LIMIT ?
                 """,
-                (apple_since, limit),
+                (apple_since, *exclusion_params, limit),
             ).fetchall()
 
             conversations = []
-            for row in rows:
-                chat_guid = row["chat_guid"]
-                chat_id = row["chat_id"]
-
+            for chat_id, chat_guid, chat_identifier, display_name, service_name in rows:
                 participants = self._get_participants(conn, chat_id)
-
-                if excluded_contacts:
-                    identifier = row["chat_identifier"] or ""
-                    if any(exc in identifier for exc in excluded_contacts):
-                        continue
-                    if any(
-                        exc in p for p in participants for exc in excluded_contacts
-                    ):
-                        continue
-
-                is_group = len(participants) > 1 or bool(row["display_name"])
+                is_group = len(participants) > 1 or bool(display_name)
 
                 conversations.append({
                     "chat_guid": chat_guid,
-                    "chat_identifier": row["chat_identifier"] or "",
-                    "display_name": row["display_name"] or "",
+                    "chat_identifier": chat_identifier,
+                    "display_name": display_name,
                     "is_group": is_group,
-                    "service": row["service_name"] or "",
+                    "service": service_name,
                     "participant_ids": participants,
                 })
 
@@ -167,26 +219,12 @@ class ChatDBReader:
         """Fetch messages, optionally filtered by conversation."""
         conn = self._connect()
         try:
-            since = datetime.now() - timedelta(days=days)
-            apple_since = self._apple_ts_from_datetime(since, conn)
+            apple_since = self._apple_ts_since(days, conn)
 
             if chat_guid:
                 rows = conn.execute(
-                    """
-                    SELECT
-                        m.ROWID,
-                        m.guid,
-                        m.text,
-                        m.attributedBody,
-                        m.date,
-                        m.is_from_me,
-                        m.is_read,
-                        m.service,
-                        m.cache_has_attachments,
-                        m.associated_message_type,
-                        m.associated_message_guid,
-                        m.thread_originator_guid,
-                        h.id as handle_id
+                    f"""
+                    SELECT {_MESSAGE_COLUMNS}
                     FROM message m
                     JOIN chat_message_join cmj ON cmj.message_id = m.ROWID
                     JOIN chat c ON c.ROWID = cmj.chat_id
@@ -198,55 +236,61 @@ class ChatDBReader:
                     (chat_guid, apple_since, limit),
                 ).fetchall()
             else:
-                rows = conn.execute(
-                    """
-                    SELECT
-                        m.ROWID,
-                        m.guid,
-                        m.text,
-                        m.attributedBody,
-                        m.date,
-                        m.is_from_me,
-                        m.is_read,
-                        m.service,
-                        m.cache_has_attachments,
-                        m.associated_message_type,
-                        m.associated_message_guid,
-                        m.thread_originator_guid,
-                        h.id as handle_id
-                    FROM message m
-                    LEFT JOIN handle h ON h.ROWID = m.handle_id
-                    WHERE m.date > ?
-                    ORDER BY m.date ASC
-                    LIMIT ?
-                    """,
-                    (apple_since, limit),
-                ).fetchall()
+                rows = conn.execute(_RECENT_MESSAGES_SQL, (apple_since, limit)).fetchall()
 
-            messages = []
-            for row in rows:
-                text = row["text"] or ""
-                if not text.strip():
-                    text = self._extract_attributed_text(row["attributedBody"])
-                messages.append({
-                    "rowid": row["ROWID"],
-                    "guid": row["guid"],
-                    "text": text,
-                    "date": self._convert_timestamp(row["date"], conn),
-                    "is_from_me": bool(row["is_from_me"]),
-                    "is_read": bool(row["is_read"]),
-                    "service": row["service"] or "",
-                    "has_attachments": bool(row["cache_has_attachments"]),
-                    "associated_message_type": row["associated_message_type"] or 0,
-                    "associated_message_guid": row["associated_message_guid"] or "",
-                    "thread_originator_guid": row["thread_originator_guid"] or "",
-                    "handle_id": row["handle_id"] or "",
-                })
-
-            return messages
+            return [self._build_message(row, conn) for row in rows]
         finally:
             conn.close()
 
+    def fetch_messages_for_chats(
+        self,
+        chat_guids: list[str],
+        days: int = 1,
+        limit: int = 500,
+        workers: int = 4,
+    ) -> dict[str, list[dict]]:
+        """Fetch messages for several conversations concurrently.
+
+        Each worker runs ``fetch_messages`` on its own read-only connection;
+        SQLite serves concurrent readers and releases the GIL while a query
+        executes, so the per-chat queries overlap.
+
+        Returns:
+            dict mapping each chat_guid to its list of message dicts.
+        """
+        if not chat_guids:
+            return {}
+        max_workers = max(1, min(workers, len(chat_guids)))
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            results = pool.map(
+                lambda guid: self.fetch_messages(guid, days=days, limit=limit),
+                chat_guids,
+            )
+            return dict(zip(chat_guids, results))
+
+    def _build_message(self, row: tuple, conn: sqlite3.Connection) -> dict:
+        """Map a positional message row (see _MESSAGE_COLUMNS) to a result dict."""
+        (
+            rowid, guid, text, attributed_body, date, is_from_me, is_read, service,
+            has_attachments, assoc_type, assoc_guid, thread_guid, handle_id,
+        ) = row
+        if not text.strip():
+            text = self._extract_attributed_text(attributed_body)
+        return {
+            "rowid": rowid,
+            "guid": guid,
+            "text": text,
+            "date": self._convert_timestamp(date, conn),
+            "is_from_me": bool(is_from_me),
+            "is_read": bool(is_read),
+            "service": service,
+            "has_attachments": bool(has_attachments),
+            "associated_message_type": assoc_type,
+            "associated_message_guid": assoc_guid,
+            "thread_originator_guid": thread_guid,
+            "handle_id": handle_id,
+        }
+
     def _extract_attributed_text(self, attributed_body: bytes | None) -> str:
         """Best-effort plaintext extraction from attributedBody blobs."""
         if not attributed_body:
@@ -294,14 +338,13 @@ class ChatDBReader:
             """,
             (chat_id,),
         ).fetchall()
-        return [row["id"] for row in rows]
+        return [row[0] for row in rows]
 
     def get_message_count(self, days: int = 1) -> int:
         """Count messages in the last N days."""
         conn = self._connect()
         try:
-            since = datetime.now() - timedelta(days=days)
-            apple_since = self._apple_ts_from_datetime(since, conn)
+            apple_since = self._apple_ts_since(days, conn)
             row = conn.execute(
                 "SELECT COUNT(*) FROM message WHERE date > ?",
                 (apple_since,),
@@ -309,3 +352,23 @@ class ChatDBReader:
             return row[0] if row else 0
         finally:
             conn.close()
+
+    def get_message_counts_by_chat(self, days: int = 1) -> dict[str, int]:
+        """Count messages per conversation in the last N days with one grouped query."""
+        conn = self._connect()
+        try:
+            apple_since = self._apple_ts_since(days, conn)
+            rows = conn.execute(
+                """
+                SELECT c.guid, COUNT(*)
+                FROM chat c
+                JOIN chat_message_join cmj ON cmj.chat_id = c.ROWID
+                JOIN message m ON m.ROWID = cmj.message_id
+                WHERE m.date > ?
+                GROUP BY c.ROWID
+                """,
+                (apple_since,),
+            ).fetchall()
+            return dict(rows)
+        finally:
+            conn.close()
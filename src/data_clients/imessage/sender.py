@@ -10,10 +10,14 @@ from data_clients.exceptions import IMessageSendError
 
 logger = logging.getLogger(__name__)
 
+_APPLESCRIPT_ESCAPES = str.maketrans({"\\": "\\\\", '"': '\\"'})
+
 
 def _sanitize_applescript(text: str) -> str:
     """Sanitize a string for safe inclusion in AppleScript double-quoted strings."""
-    return text.replace("\\", "\\\\").replace('"', '\\"')
+    if "\\" not in text and '"' not in text:
+        return text
+    return text.translate(_APPLESCRIPT_ESCAPES)
 
 
 def _service_type(service: str) -> str:
@@ -1,5 +1,25 @@
 """LLM client wrappers (Anthropic Claude)."""
 
-from data_clients.llm.client import DEFAULT_MODEL, LLMClient, AsyncLLMClient, ToolStreamResult
+from data_clients.llm.cache import LLMCache
+from data_clients.llm.client import (
+    DEFAULT_MODEL,
+    AsyncLLMClient,
+    LLMClient,
+    ToolStreamResult,
+    install_orjson_serializer,
+)
+from data_clients.llm.coalesce import BatchWorker
+from data_clients.llm.ratelimit import LLMRateLimiter
+from data_clients.llm.sync_bridge import SharedLoopLLMClient
 
-__all__ = ["DEFAULT_MODEL", "LLMClient", "AsyncLLMClient", "ToolStreamResult"]
+__all__ = [
+    "DEFAULT_MODEL",
+    "LLMClient",
+    "AsyncLLMClient",
+    "SharedLoopLLMClient",
+    "ToolStreamResult",
+    "LLMCache",
+    "LLMRateLimiter",
+    "BatchWorker",
+    "install_orjson_serializer",
+]
@@ -0,0 +1,254 @@
+"""In-memory response cache for LLM calls (exact and optional semantic matching)."""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import hashlib
+import json
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any
+
+from data_clients.exceptions import LLMError
+
+if TYPE_CHECKING:
+    from data_clients.embeddings.base import BaseEmbedder
+
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
+
+
+class LLMCache:
+    """LRU cache of final LLM responses keyed by the full request.
+
+    Exact mode hashes ``model``, ``system``, ``messages``, ``temperature``,
+    ``max_tokens`` and ``tools``; by default only deterministic requests
+    (``temperature == 0``) are cached, since a sampled response is not a
+    faithful answer to a repeat of the same prompt.
+
+    Semantic mode is enabled by passing ``semantic_threshold`` and an
+    ``embedder`` (any :class:`~data_clients.embeddings.base.BaseEmbedder`).
+    Requests then also match a previous request with the same model, system
+    prompt and tools whose user text embeds within the cosine-similarity
+    threshold, and sampled requests become cacheable.
+
+    Args:
+        maxsize: Maximum number of cached responses (least recently used evicted).
+        semantic_threshold: Cosine similarity (e.g. ``0.92``) required for a
+            semantic hit. ``None`` disables semantic matching.
+        embedder: Embedder used to vectorize user text in semantic mode.
+        ttl: Seconds a response stays valid, or ``None`` to keep it until evicted.
+        max_temperature: Highest temperature cached in exact mode; raise it
+            (e.g. to ``0.2``) to accept near-deterministic responses.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        semantic_threshold: float | None = None,
+        embedder: BaseEmbedder | None = None,
+        ttl: float | None = None,
+        max_temperature: float = 0.0,
+    ):
+        if semantic_threshold is not None and embedder is None:
+            raise LLMError("An embedder is required when semantic_threshold is set.")
+        self.maxsize = maxsize
+        self.semantic_threshold = semantic_threshold
+        self.embedder = embedder
+        self.ttl = ttl
+        self.max_temperature = max_temperature
+        # key -> (expiry on the monotonic clock, response)
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        # scope key -> {exact key: embedding}
+        self._vectors: dict[str, dict[str, list[float]]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def cache_key(self, params: dict) -> str | None:
+        """Return the exact-match key for a request, or ``None`` if it is uncacheable."""
+        if params.get("temperature", 0) > self.max_temperature and self.semantic_threshold is None:
+            return None
+        payload = {
+            "model": params.get("model"),
+            "system": _system_key(params.get("system")),
+            "messages": params.get("messages"),
+            "temperature": params.get("temperature"),
+            "max_tokens": params.get("max_tokens"),
+            "tools": params.get("tools"),
+        }
+        return _sha256(payload)
+
+    def get(self, params: dict) -> dict | None:
+        """Look up a cached response for a request."""
+        key = self.cache_key(params)
+        if key is None:
+            return None
+        with self._lock:
+            hit = self._live(key)
+            if hit is not None:
+                self._entries.move_to_end(key)
+                return hit
+        if self.semantic_threshold is None:
+            return None
+        return self._get_similar(params)
+
+    def put(self, params: dict, response: dict) -> None:
+        """Store the final response for a request."""
+        key = self.cache_key(params)
+        if key is None:
+            return
+        embedding = None
+        if self.semantic_threshold is not None:
+            text = _user_text(params.get("messages"))
+            if text:
+                embedding = self.embedder.embed_query(text)
+        expires = time.monotonic() + self.ttl if self.ttl is not None else math.inf
+        with self._lock:
+            self._entries[key] = (expires, response)
+            self._entries.move_to_end(key)
+            if embedding is not None:
+                self._vectors.setdefault(_scope_key(params), {})[key] = embedding
+            while len(self._entries) > self.maxsize:
+                evicted, _ = self._entries.popitem(last=False)
+                self._drop_vector(evicted)
+
+    async def aget(self, params: dict) -> dict | None:
+        """``get`` for async callers.
+
+        In semantic mode the lookup embeds the user text, which may be a
+        network call, so it runs in a worker thread instead of blocking the
+        event loop.
+        """
+        if self.semantic_threshold is None:
+            return self.get(params)
+        return await asyncio.to_thread(self.get, params)
+
+    async def aput(self, params: dict, response: dict) -> None:
+        """``put`` for async callers; semantic-mode embedding runs in a worker thread."""
+        if self.semantic_threshold is None:
+            self.put(params, response)
+        else:
+            await asyncio.to_thread(self.put, params, response)
+
+    def clear(self) -> None:
+        """Drop all cached responses."""
+        with self._lock:
+            self._entries.clear()
+            self._vectors.clear()
+
+    def _get_similar(self, params: dict) -> dict | None:
+        text = _user_text(params.get("messages"))
+        if not text:
+            return None
+        with self._lock:
+            candidates = list(self._vectors.get(_scope_key(params), {}).items())
+        if not candidates:
+            return None
+        query = self.embedder.embed_query(text)
+        best_key, best_score = None, self.semantic_threshold
+        for key, vector in candidates:
+            score = _cosine(query, vector)
+            if score >= best_score:
+                best_key, best_score = key, score
+        if best_key is None:
+            return None
+        with self._lock:
+            return self._live(best_key)
+
+    def _live(self, key: str) -> dict | None:
+        """Return an unexpired entry, dropping it if stale. Caller holds the lock."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, response = entry
+        if expires < time.monotonic():
+            del self._entries[key]
+            self._drop_vector(key)
+            return None
+        return response
+
+    def _drop_vector(self, key: str) -> None:
+        for vectors in self._vectors.values():
+            vectors.pop(key, None)
+
+
+def _dumps(payload: Any, sort_keys: bool = False) -> bytes:
+    """Serialize to JSON bytes, using orjson when it is installed.
+
+    ``default=str`` lets SDK content-block objects echoed back in multi-turn
+    tool conversations serialize instead of raising.
+    """
+    if orjson is not None:
+        option = orjson.OPT_SORT_KEYS if sort_keys else 0
+        try:
+            return orjson.dumps(payload, default=str, option=option)
+        except TypeError:
+            pass  # e.g. non-str dict keys; the stdlib handles those
+    return json.dumps(payload, sort_keys=sort_keys, default=str).encode()
+
+
+def _sha256(payload: Any) -> str:
+    return hashlib.sha256(_dumps(payload, sort_keys=True)).hexdigest()
+
+
+@functools.lru_cache(maxsize=64)
+def _text_digest(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def _system_key(system: Any) -> Any:
+    """Stand-in for the system prompt in cache keys, digesting its text once.
+
+    Agent loops resend the same multi-KB system prompt on every call; keying
+    on a memoized digest avoids re-serializing and re-hashing it each time.
+    """
+    if isinstance(system, str):
+        return _text_digest(system)
+    if isinstance(system, list):
+        return [
+            {**block, "text": _text_digest(block["text"])}
+            if isinstance(block, dict) and isinstance(block.get("text"), str)
+            else block
+            for block in system
+        ]
+    return system
+
+
+def _scope_key(params: dict) -> str:
+    """Key for the request context a semantic match must share."""
+    return _sha256({
+        "model": params.get("model"),
+        "system": _system_key(params.get("system")),
+        "tools": params.get("tools"),
+    })
+
+
+def _user_text(messages: list[dict] | None) -> str:
+    """Concatenate the plain-text content of user messages."""
+    parts: list[str] = []
+    for message in messages or []:
+        if message.get("role") != "user":
+            continue
+        content = message.get("content")
+        if isinstance(content, str):
+            parts.append(content)
+        elif isinstance(content, list):
+            parts.extend(
+                block.get("text", "")
+                for block in content
+                if isinstance(block, dict) and block.get("type") == "text"
+            )
+    return "\n".join(parts)
+
+
+def _cosine(a: list[float], b: list[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
@@ -0,0 +1,49 @@
+"""Append-only JSONL checkpoints so large LLM jobs can resume after a crash."""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from pathlib import Path
+
+from data_clients.llm.cache import _dumps
+
+logger = logging.getLogger(__name__)
+
+
+class JsonlCheckpoint:
+    """One ``{"index", "custom_id", "result"}`` record per completed item.
+
+    Each record is flushed and fsync'd as it is written, so a crash loses at
+    most the item in flight. Re-running a job with the same file skips every
+    index already recorded.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+
+    def load(self) -> dict[int, dict]:
+        """Return previously completed results keyed by item index."""
+        done: dict[int, dict] = {}
+        if not self.path.exists():
+            return done
+        with self.path.open("r", encoding="utf-8") as f:
+            for line_no, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                    done[int(record["index"])] = record["result"]
+                except (ValueError, KeyError, TypeError):
+                    # A torn final line from a crash mid-write; that item reruns.
+                    logger.warning(f"Skipping unreadable checkpoint line {line_no} in {self.path}")
+        return done
+
+    def write(self, index: int, result: dict, custom_id: str | None = None) -> None:
+        """Durably append one completed result."""
+        record = {"index": index, "custom_id": custom_id, "result": result}
+        with self.path.open("ab") as f:
+            f.write(_dumps(record) + b"\n")
+            f.flush()
+            os.fsync(f.fileno())
@@ -3,28 +3,465 @@
 from __future__ import annotations
 
 import asyncio
+import atexit
+import functools
+import importlib.util
+import json
 import logging
 import os
+import random
+import threading
 import time
-from contextlib import asynccontextmanager
-from typing import Any, AsyncIterator, Iterator
+from collections import OrderedDict
+from contextlib import AsyncExitStack, ExitStack, asynccontextmanager, nullcontext
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Iterator
 
 from data_clients.exceptions import LLMError
+from data_clients.llm import cache as _cache_module
+from data_clients.llm.cache import LLMCache
+from data_clients.llm.checkpoint import JsonlCheckpoint
+from data_clients.llm.coalesce import BatchWorker
+from data_clients.llm.pricing import CostTracker
+from data_clients.llm.ratelimit import LLMRateLimiter, estimate_input_tokens
+
+
+class _AnthropicNotInstalled(Exception):
+    """Placeholder for SDK exception types; never raised, so it never matches."""
+
+
+try:
+    from anthropic import APIConnectionError, APIError, APITimeoutError, RateLimitError
+except ImportError:  # anthropic is an optional extra; the client constructors report it
+    APIConnectionError = APIError = APITimeoutError = RateLimitError = _AnthropicNotInstalled
 
 logger = logging.getLogger(__name__)
 
 
 DEFAULT_MODEL = os.environ.get("DEFAULT_LLM_MODEL", "claude-haiku-4-5-20251001")
 
+# Anthropic only caches prefixes of ~1024+ tokens; shorter system prompts
+# gain nothing from a breakpoint.
+_PROMPT_CACHE_MIN_CHARS = 1024
+_EPHEMERAL = {"type": "ephemeral"}
+
+# httpx refuses http2=True without h2, so probe for it once at import.
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+_shared_http_client = None
+_shared_http_client_lock = threading.Lock()
+# (api_key, base_url) -> (http pool the client was built on, Anthropic client),
+# least recently used first
+_sync_clients: OrderedDict[tuple[str | None, str | None], tuple[Any, Any]] = OrderedDict()
+_SYNC_CLIENTS_MAX = 32
+
+
+def _http_options(max_connections: int = 100) -> dict[str, Any]:
+    """Pool, timeout and protocol settings for the SDK's httpx clients.
+
+    Keep-alive connections are held for a minute so bursts of calls reuse
+    warm TLS sessions, and HTTP/2 multiplexing is used when the optional
+    ``h2`` package is installed. Only the connect timeout differs from the
+    SDK's defaults: a non-streaming call with a large ``max_tokens`` can
+    take minutes to answer, so reads keep the SDK's long timeout.
+    """
+    import httpx
+    from anthropic import DEFAULT_TIMEOUT, Timeout
+
+    return {
+        "limits": httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=60.0,
+        ),
+        # The SDK's own Timeout type, which it accepts whichever httpx it is built on
+        "timeout": Timeout(
+            connect=10.0,
+            read=DEFAULT_TIMEOUT.read,
+            write=DEFAULT_TIMEOUT.write,
+            pool=DEFAULT_TIMEOUT.pool,
+        ),
+        "http2": _HTTP2_AVAILABLE,
+    }
+
+
+def install_orjson_serializer() -> bool:
+    """Serialize Anthropic SDK request bodies with orjson, process-wide.
+
+    Large ``messages`` histories and tool schemas are re-encoded on every
+    call; orjson does this several times faster than the SDK's stdlib
+    encoder. Anything orjson rejects (SDK pydantic models, non-str keys)
+    falls back to the original encoder. Opt-in because it replaces an SDK
+    internal for every client in the process.
+
+    Returns:
+        True if orjson is installed and the SDK exposes the hook.
+    """
+    orjson = _cache_module.orjson
+    if orjson is None:
+        return False
+    try:
+        from anthropic import _base_client
+    except ImportError:
+        return False
+    original = getattr(_base_client, "openapi_dumps", None)
+    if original is None:
+        return False
+    if getattr(original, "_orjson", False):
+        return True
+
+    def dumps(obj: Any) -> bytes:
+        try:
+            return orjson.dumps(obj)
+        except TypeError:
+            return original(obj)
+
+    dumps._orjson = True
+    _base_client.openapi_dumps = dumps
+    return True
+
+
+def _get_shared_http_client():
+    """Process-wide keep-alive HTTP pool shared by ``LLMClient`` instances.
+
+    Built lazily so ad-hoc clients reuse warm TCP/TLS connections instead of
+    each opening their own pool.
+    """
+    global _shared_http_client
+    with _shared_http_client_lock:
+        if _shared_http_client is None or _shared_http_client.is_closed:
+            from anthropic import DefaultHttpxClient
+
+            if _shared_http_client is None:
+                atexit.register(_close_shared_http_client)
+            _shared_http_client = DefaultHttpxClient(**_http_options())
+        return _shared_http_client
+
+
+def _close_shared_http_client() -> None:
+    """Close the shared pool at interpreter exit so its sockets are released cleanly."""
+    with _shared_http_client_lock:
+        if _shared_http_client is not None:
+            _shared_http_client.close()
+
+
+def _get_sync_client(api_key: str | None, base_url: str | None = None):
+    """Process-wide ``Anthropic`` client per ``(api_key, base_url)`` on the shared pool.
+
+    Saves rebuilding the SDK client (auth headers, resource tree) for every
+    short-lived ``LLMClient``. Holds at most ``_SYNC_CLIENTS_MAX`` clients,
+    evicting the least recently used, so processes that use many per-user
+    keys do not keep every key and client alive.
+    """
+    key = (api_key or os.environ.get("ANTHROPIC_API_KEY"), base_url)
+    http_client = _get_shared_http_client()
+    with _shared_http_client_lock:
+        entry = _sync_clients.get(key)
+        # A client built on a pool that has since been closed and replaced is stale.
+        if entry is not None and entry[0] is http_client:
+            _sync_clients.move_to_end(key)
+            return entry[1]
+        from anthropic import Anthropic
+
+        client = Anthropic(api_key=key[0], base_url=base_url, http_client=http_client)
+        _sync_clients[key] = (http_client, client)
+        _sync_clients.move_to_end(key)
+        if len(_sync_clients) > _SYNC_CLIENTS_MAX:
+            _sync_clients.popitem(last=False)
+        return client
+
+
+def _backoff(attempt: int, base: float = 1.0, cap: float = 60.0) -> float:
+    """Full-jitter exponential backoff: uniform in ``[0, min(cap, base * 2**attempt)]``.
+
+    Randomizing the whole interval keeps clients that were throttled together
+    from retrying in lockstep.
+    """
+    return random.uniform(0, min(cap, base * 2**attempt))
+
+
+def _rate_limit_delay(error: Exception, attempt: int) -> float:
+    """Seconds to wait after a 429, preferring the server's own hints.
+
+    Checks ``retry-after-ms`` and ``retry-after`` (delta-seconds or
+    HTTP-date), then the ``anthropic-ratelimit-*-reset`` RFC 3339 timestamps
+    of the buckets that are exhausted (``*-remaining`` of 0, or unreported),
+    and only falls back to jittered backoff when none parse.
+    """
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    wait = _parse_retry_after_ms(headers.get("retry-after-ms"))
+    if wait is None:
+        wait = _parse_retry_after(headers.get("retry-after"))
+    if wait is None:
+        resets = [
+            _seconds_until(headers.get(f"anthropic-ratelimit-{kind}-reset"))
+            for kind in ("requests", "tokens", "input-tokens", "output-tokens")
+            if headers.get(f"anthropic-ratelimit-{kind}-remaining", "0") == "0"
+        ]
+        resets = [r for r in resets if r is not None]
+        wait = max(resets) if resets else None
+    return wait if wait is not None else _backoff(attempt + 1)
+
+
+def _retry_wait(error: Exception, attempt: int, rate_limiter: LLMRateLimiter | None) -> float:
+    """Seconds to sleep before retrying after ``error``, shared by every retry loop.
+
+    Raises:
+        LLMError: If the error is not retryable (anything but a 429 or timeout).
+    """
+    if isinstance(error, RateLimitError):
+        if rate_limiter is not None:
+            rate_limiter.penalize()
+        wait = _rate_limit_delay(error, attempt)
+        logger.warning(f"Rate limited, retrying in {wait:.1f}s (attempt {attempt + 1})")
+        return wait
+    if isinstance(error, APITimeoutError):
+        wait = _backoff(attempt)
+        logger.warning(f"API timeout, retrying in {wait:.1f}s (attempt {attempt + 1})")
+        return wait
+    raise LLMError(f"Claude API error: {error}") from error
+
+
+def _retry_sync(fn: Callable) -> Callable:
+    """Retry a sync ``LLMClient`` method under the shared 429/timeout policy."""
+
+    @functools.wraps(fn)
+    def wrapper(self, *args, **kwargs):
+        for attempt in range(self.max_retries):
+            try:
+                return fn(self, *args, **kwargs)
+            except APIError as e:
+                time.sleep(_retry_wait(e, attempt, self.rate_limiter))
+        raise LLMError(f"Failed after {self.max_retries} retries")
+
+    return wrapper
+
+
+def _retry_async(fn: Callable) -> Callable:
+    """Async counterpart of :func:`_retry_sync` for ``AsyncLLMClient`` methods."""
+
+    @functools.wraps(fn)
+    async def wrapper(self, *args, **kwargs):
+        for attempt in range(self.max_retries):
+            try:
+                return await fn(self, *args, **kwargs)
+            except APIError as e:
+                await asyncio.sleep(_retry_wait(e, attempt, self.rate_limiter))
+        raise LLMError(f"Failed after {self.max_retries} retries")
+
+    return wrapper
+
+
+def _parse_retry_after_ms(value: str | None) -> float | None:
+    try:
+        return max(0.0, float(value) / 1000) if value else None
+    except ValueError:
+        return None
+
+
+def _parse_retry_after(value: str | None) -> float | None:
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def _seconds_until(value: str | None) -> float | None:
+    """Seconds from now until an RFC 3339 timestamp, or ``None`` if unparseable."""
+    if not value:
+        return None
+    try:
+        when = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, when.timestamp() - time.time())
+
+
+def _resolve_cache(cache: LLMCache | bool | None) -> LLMCache | None:
+    """``cache=True`` means a default one-hour, 1024-entry ``LLMCache``."""
+    if cache is True:
+        return LLMCache(maxsize=1024, ttl=3600)
+    if cache is False:
+        return None
+    return cache
+
+
+def _resolve_rate_limiter(
+    rate_limiter: LLMRateLimiter | None, rpm: int | None, tpm: int | None
+) -> LLMRateLimiter | None:
+    """``rpm``/``tpm`` build a private limiter; pass ``rate_limiter`` to share one."""
+    if rate_limiter is not None and (rpm or tpm):
+        raise LLMError("Pass either rate_limiter or rpm/tpm, not both.")
+    if rpm or tpm:
+        return LLMRateLimiter(rpm=rpm, tpm=tpm)
+    return rate_limiter
+
+
+def _cached_result(cache: LLMCache | None, stats: dict, params: dict) -> dict | None:
+    """Return a cache hit for ``params`` (tagged ``cached``), updating hit/miss stats."""
+    if cache is None:
+        return None
+    return _count_lookup(stats, cache.get(params))
+
+
+async def _acached_result(cache: LLMCache | None, stats: dict, params: dict) -> dict | None:
+    """``_cached_result`` for async callers; see ``LLMCache.aget``."""
+    if cache is None:
+        return None
+    return _count_lookup(stats, await cache.aget(params))
+
+
+def _count_lookup(stats: dict, hit: dict | None) -> dict | None:
+    """Record a cache lookup in ``stats`` and tag a hit as ``cached`` with zero usage."""
+    if hit is None:
+        stats["misses"] += 1
+        return None
+    stats["hits"] += 1
+    # No tokens are billed for a cached answer.
+    return {
+        **hit,
+        "input_tokens": 0,
+        "output_tokens": 0,
+        "cache_creation_tokens": 0,
+        "cache_read_tokens": 0,
+        "cached": True,
+    }
+
+
+def _request_params(
+    model: str,
+    max_tokens: int,
+    temperature: float,
+    system: str,
+    messages: list[dict],
+    tools: list[dict] | None = None,
+    prompt_cache: bool = False,
+) -> dict:
+    """Build ``messages.create`` / ``messages.stream`` keyword arguments.
+
+    With ``prompt_cache``, a system prompt of at least
+    ``_PROMPT_CACHE_MIN_CHARS`` is sent as a text block marked as an ephemeral
+    cache breakpoint, as is the last tool definition, so the server can reuse
+    the cached prefix across calls.
+    """
+    params: dict[str, Any] = {
+        "model": model,
+        "max_tokens": max_tokens,
+        "temperature": temperature,
+        "system": system,
+        "messages": messages,
+    }
+    if tools is not None:
+        params["tools"] = tools
+    if prompt_cache:
+        if isinstance(system, str) and len(system) >= _PROMPT_CACHE_MIN_CHARS:
+            params["system"] = _cached_system_block(system)
+        if tools:
+            params["tools"] = [*tools[:-1], {**tools[-1], "cache_control": _EPHEMERAL}]
+    return params
+
+
+@functools.lru_cache(maxsize=64)
+def _cached_system_block(system: str) -> list[dict]:
+    """System prompt as a cache-breakpoint text block, built once per distinct prompt.
+
+    Services typically send the same few system prompts on every call, so
+    this skips rebuilding the block (and gives the response cache an
+    identical object to hash).
+    """
+    return [{"type": "text", "text": system, "cache_control": _EPHEMERAL}]
+
+
+def _generate_params(
+    default_model: str,
+    system_prompt: str,
+    user_content: str | list[dict],
+    max_tokens: int = 4096,
+    temperature: float = 0.3,
+    model: str | None = None,
+    prompt_cache: bool = False,
+) -> dict:
+    """Build request kwargs from ``generate``-style arguments."""
+    if isinstance(user_content, str):
+        msgs = [{"role": "user", "content": user_content}]
+    else:
+        msgs = user_content
+    return _request_params(
+        model or default_model, max_tokens, temperature, system_prompt, msgs,
+        prompt_cache=prompt_cache,
+    )
+
+
+def _usage_fields(usage: Any) -> dict:
+    """Token counts from an SDK ``usage`` object, including prompt-cache activity."""
+    return {
+        "input_tokens": usage.input_tokens,
+        "output_tokens": usage.output_tokens,
+        # Absent on older SDK versions; None when the request did not use caching.
+        "cache_creation_tokens": getattr(usage, "cache_creation_input_tokens", None) or 0,
+        "cache_read_tokens": getattr(usage, "cache_read_input_tokens", None) or 0,
+    }
+
+
+def _join_text(parts: list[str]) -> str:
+    """Join text blocks with newlines, skipping the copy for the usual single block."""
+    if not parts:
+        return ""
+    if len(parts) == 1:
+        return parts[0]
+    return "\n".join(parts)
+
+
+def _batch_entry_result(entry: Any, params: dict) -> dict | LLMError:
+    """Convert one Message Batches result line into a ``generate``-style result."""
+    result = entry.result
+    if result.type != "succeeded":
+        detail = getattr(getattr(result, "error", None), "error", None)
+        reason = f"{result.type}: {detail.message}" if detail else result.type
+        return LLMError(f"Batch request {entry.custom_id} failed ({reason})")
+    message = result.message
+    return {
+        "text": message.content[0].text,
+        **_usage_fields(message.usage),
+        "model": params["model"],
+    }
+
 
 class LLMClient:
-    """Synchronous wrapper around the Anthropic SDK."""
+    """Synchronous wrapper around the Anthropic SDK.
+
+    Instances with the same ``api_key`` and ``base_url`` share one SDK client
+    and keep-alive HTTP pool by default, closed at interpreter exit; pass
+    ``http_client`` to use your own, which is left for you to close.
+
+    Pass an ``LLMCache`` (or ``cache=True`` for a one-hour default) to reuse
+    responses to repeated deterministic prompts, and ``rpm``/``tpm`` (or a
+    shared ``LLMRateLimiter``) to stay under the account's rate limits.
+    """
 
     def __init__(
         self,
         api_key: str | None = None,
         model: str = DEFAULT_MODEL,
         max_retries: int = 3,
+        cache: LLMCache | bool | None = None,
+        rate_limiter: LLMRateLimiter | None = None,
+        http_client: Any | None = None,
+        enable_prompt_cache: bool = True,
+        base_url: str | None = None,
+        rpm: int | None = None,
+        tpm: int | None = None,
     ):
         if not api_key and not os.environ.get("ANTHROPIC_API_KEY"):
             raise LLMError(
@@ -38,9 +475,18 @@ class LLMClient:
                 "anthropic is required for LLMClient. "
                 "Install with: pip install data-clients[llm]"
             )
-        self._client = Anthropic(api_key=api_key or None)
+        if http_client is None:
+            self._client = _get_sync_client(api_key, base_url)
+        else:
+            self._client = Anthropic(
+                api_key=api_key or None, base_url=base_url, http_client=http_client
+            )
         self.model = model
         self.max_retries = max_retries
+        self.cache = _resolve_cache(cache)
+        self.stats = {"hits": 0, "misses": 0}
+        self.rate_limiter = _resolve_rate_limiter(rate_limiter, rpm, tpm)
+        self.enable_prompt_cache = enable_prompt_cache
 
     @property
     def client(self):
@@ -54,50 +500,82 @@ class LLMClient:
         max_tokens: int = 4096,
         temperature: float = 0.3,
         model: str | None = None,
+        no_cache: bool = False,
     ) -> dict:
         """Send a message to Claude and return the response with usage info.
 
         Args:
             user_content: A single string (wrapped as user message) or a list
                 of message dicts (``[{"role": ..., "content": ...}, ...]``).
+            no_cache: Bypass the response cache for this call (no lookup, no store).
 
         Returns:
-            dict with keys: text, input_tokens, output_tokens, model
+            dict with keys: text, input_tokens, output_tokens,
+            cache_creation_tokens, cache_read_tokens, model
         """
-        from anthropic import APIError, APITimeoutError, RateLimitError
+        params = _generate_params(
+            self.model, system_prompt, user_content, max_tokens, temperature, model,
+            prompt_cache=self.enable_prompt_cache,
+        )
+        use_model = params["model"]
+        cache = None if no_cache else self.cache
+        cached = _cached_result(cache, self.stats, params)
+        if cached is not None:
+            return cached
+        response = self._send(params)
+        result = {
+            "text": response.content[0].text,
+            **_usage_fields(response.usage),
+            "model": use_model,
+        }
+        if cache is not None:
+            cache.put(params, result)
+        return result
 
-        use_model = model or self.model
-        if isinstance(user_content, str):
-            msgs = [{"role": "user", "content": user_content}]
-        else:
-            msgs = user_content
-        for attempt in range(self.max_retries):
+    def generate_stream_first(
+        self,
+        system_prompt: str,
+        user_content: str | list[dict],
+        max_tokens: int = 4096,
+        temperature: float = 0.3,
+        model: str | None = None,
+        first_token_cb: Callable[[str], None] | None = None,
+    ) -> dict:
+        """``generate`` over the streaming endpoint, reporting the first token early.
+
+        ``first_token_cb`` is called with the first text chunk as soon as it
+        arrives, so downstream work can start at time-to-first-token rather
+        than after the whole response.
+
+        Returns:
+            ``generate``-style dict plus ``ttft_ms`` (milliseconds to the first
+            text chunk, ``None`` if the response had no text).
+        """
+        params = _generate_params(
+            self.model, system_prompt, user_content, max_tokens, temperature, model,
+            prompt_cache=self.enable_prompt_cache,
+        )
+        started = time.perf_counter()
+        ttft_ms = None
+        chunks: list[str] = []
+        stack, stream = self._open_stream(params)
+        with stack:
             try:
-                response = self._client.messages.create(
-                    model=use_model,
-                    max_tokens=max_tokens,
-                    temperature=temperature,
-                    system=system_prompt,
-                    messages=msgs,
-                )
-                return {
-                    "text": response.content[0].text,
-                    "input_tokens": response.usage.input_tokens,
-                    "output_tokens": response.usage.output_tokens,
-                    "model": use_model,
-                }
-            except RateLimitError:
-                wait = 2 ** (attempt + 1)
-                logger.warning(f"Rate limited, retrying in {wait}s (attempt {attempt + 1})")
-                time.sleep(wait)
-            except APITimeoutError:
-                wait = 2 ** attempt
-                logger.warning(f"API timeout, retrying in {wait}s (attempt {attempt + 1})")
-                time.sleep(wait)
+                for text in stream.text_stream:
+                    if ttft_ms is None:
+                        ttft_ms = (time.perf_counter() - started) * 1000
+                        if first_token_cb is not None:
+                            first_token_cb(text)
+                    chunks.append(text)
+                final = stream.get_final_message()
             except APIError as e:
-                raise LLMError(f"Claude API error: {e}") from e
-
-        raise LLMError(f"Failed after {self.max_retries} retries")
+                raise LLMError(f"Claude API error mid-stream: {e}") from e
+        return {
+            "text": "".join(chunks),
+            **_usage_fields(final.usage),
+            "model": params["model"],
+            "ttft_ms": ttft_ms,
+        }
 
     def generate_with_tools(
         self,
@@ -107,57 +585,41 @@ class LLMClient:
         max_tokens: int = 4096,
         temperature: float = 0.3,
         model: str | None = None,
+        no_cache: bool = False,
     ) -> dict:
         """Multi-turn message call with tool definitions.
 
+        Pass ``no_cache=True`` to bypass the response cache for this call.
+
         Returns:
-            dict with keys: text, tool_calls, stop_reason, input_tokens, output_tokens, model
+            dict with keys: text, tool_calls, stop_reason, input_tokens, output_tokens,
+            cache_creation_tokens, cache_read_tokens, model
             tool_calls is a list of dicts with keys: name, input, id
         """
-        from anthropic import APIError, APITimeoutError, RateLimitError
-
         use_model = model or self.model
-        for attempt in range(self.max_retries):
-            try:
-                response = self._client.messages.create(
-                    model=use_model,
-                    max_tokens=max_tokens,
-                    temperature=temperature,
-                    system=system_prompt,
-                    messages=messages,
-                    tools=tools,
-                )
-                text_parts = []
-                tool_calls = []
-                for block in response.content:
-                    if block.type == "text":
-                        text_parts.append(block.text)
-                    elif block.type == "tool_use":
-                        tool_calls.append({
-                            "name": block.name,
-                            "input": block.input,
-                            "id": block.id,
-                        })
-                return {
-                    "text": "\n".join(text_parts),
-                    "tool_calls": tool_calls,
-                    "stop_reason": response.stop_reason,
-                    "input_tokens": response.usage.input_tokens,
-                    "output_tokens": response.usage.output_tokens,
-                    "model": use_model,
-                }
-            except RateLimitError:
-                wait = 2 ** (attempt + 1)
-                logger.warning(f"Rate limited, retrying in {wait}s (attempt {attempt + 1})")
-                time.sleep(wait)
-            except APITimeoutError:
-                wait = 2 ** attempt
-                logger.warning(f"API timeout, retrying in {wait}s (attempt {attempt + 1})")
-                time.sleep(wait)
-            except APIError as e:
-                raise LLMError(f"Claude API error: {e}") from e
-
-        raise LLMError(f"Failed after {self.max_retries} retries")
+        params = _request_params(
+            use_model, max_tokens, temperature, system_prompt, messages, tools,
+            prompt_cache=self.enable_prompt_cache,
+        )
+        cache = None if no_cache else self.cache
+        cached = _cached_result(cache, self.stats, params)
+        if cached is not None:
+            return cached
+        response = self._send(params)
+        result = {
+            "text": _join_text([b.text for b in response.content if b.type == "text"]),
+            "tool_calls": [
+                {"name": b.name, "input": b.input, "id": b.id}
+                for b in response.content
+                if b.type == "tool_use"
+            ],
+            "stop_reason": response.stop_reason,
+            **_usage_fields(response.usage),
+            "model": use_model,
+        }
+        if cache is not None:
+            cache.put(params, result)
+        return result
 
     def stream(
         self,
@@ -168,65 +630,408 @@ class LLMClient:
         model: str | None = None,
     ) -> Iterator[str]:
         """Stream a response, yielding text chunks."""
-        from anthropic import APIError, APITimeoutError, RateLimitError
-
         use_model = model or self.model
-        for attempt in range(self.max_retries):
-            try:
-                with self._client.messages.stream(
-                    model=use_model,
-                    max_tokens=max_tokens,
-                    temperature=temperature,
-                    system=system_prompt,
-                    messages=messages,
-                ) as stream:
-                    for text in stream.text_stream:
-                        yield text
+        params = _request_params(
+            use_model, max_tokens, temperature, system_prompt, messages,
+            prompt_cache=self.enable_prompt_cache,
+        )
+        stack, first, chunks = self._open_text_stream(params)
+        with stack:
+            if first is None:
                 return
-            except RateLimitError:
-                wait = 2 ** (attempt + 1)
-                logger.warning(f"Rate limited, retrying in {wait}s (attempt {attempt + 1})")
-                time.sleep(wait)
-            except APITimeoutError:
-                wait = 2 ** attempt
-                logger.warning(f"API timeout, retrying in {wait}s (attempt {attempt + 1})")
+            yield first
+            try:
+                yield from chunks
+            except APIError as e:
+                # Text has already been yielded, so a mid-stream failure
+                # cannot be retried without repeating it.
+                raise LLMError(f"Claude API error mid-stream: {e}") from e
+
+    def generate_batch(
+        self,
+        requests: list[dict],
+        batch_size: int = 10_000,
+        poll_interval: float = 10.0,
+        max_poll_interval: float = 300.0,
+        min_batch_size: int = 0,
+        on_progress: Callable[[int, int], None] | None = None,
+        output_jsonl: str | Path | None = None,
+        track_cost: bool = False,
+    ) -> list[dict | LLMError]:
+        """Run many ``generate`` calls through the Message Batches API.
+
+        Batched requests cost about half as much as realtime calls but may
+        take up to 24 hours; this blocks until every submitted batch has
+        ended, polling after ``poll_interval`` seconds and doubling the wait
+        up to ``max_poll_interval``. Requests are split into batches of at
+        most ``batch_size``.
+
+        Args:
+            requests: ``generate`` keyword-argument dicts (``system_prompt``,
+                ``user_content`` and optionally ``max_tokens``,
+                ``temperature``, ``model``).
+            min_batch_size: Below this many uncached requests, skip the batch
+                round-trip and call ``generate`` for each one instead.
+            on_progress: Called with ``(completed, total)`` as results arrive.
+            output_jsonl: Checkpoint file; results are appended as they are
+                collected and already-recorded items are not resubmitted.
+            track_cost: Log a running estimated USD cost at batch pricing.
+
+        Returns:
+            A list aligned with ``requests``: a ``generate``-style result dict
+            per item, or an ``LLMError`` for items that errored, expired or
+            were canceled.
+        """
+        all_params = [
+            _generate_params(self.model, **req, prompt_cache=self.enable_prompt_cache)
+            for req in requests
+        ]
+        checkpoint = JsonlCheckpoint(output_jsonl) if output_jsonl else None
+        done = checkpoint.load() if checkpoint else {}
+        cost = CostTracker(discount=0.5) if track_cost else None
+        results: list[dict | LLMError | None] = [None] * len(all_params)
+        pending = []
+        for i, params in enumerate(all_params):
+            results[i] = done.get(i) or _cached_result(self.cache, self.stats, params)
+            if results[i] is None:
+                pending.append(i)
+        completed = len(results) - len(pending)
+
+        def record(i: int, result: dict | BaseException, custom_id: str | None = None) -> None:
+            nonlocal completed
+            results[i] = result
+            completed += 1
+            if isinstance(result, dict):
+                if checkpoint:
+                    checkpoint.write(i, result, custom_id=custom_id)
+                if cost:
+                    cost.add(result)
+            if on_progress:
+                on_progress(completed, len(results))
+
+        if pending and len(pending) < min_batch_size:
+            # The lookup above already counted these misses, so bypass the
+            # cache in generate and store the results here instead.
+            for i in pending:
+                try:
+                    result = self.generate(**requests[i], no_cache=True)
+                except LLMError as e:
+                    record(i, e)
+                    continue
+                if self.cache is not None:
+                    self.cache.put(all_params[i], result)
+                record(i, result)
+            pending = []
+
+        batches = []
+        for start in range(0, len(pending), batch_size):
+            batches.append(self._with_retries(
+                self._client.messages.batches.create,
+                requests=[
+                    {"custom_id": f"req-{i}", "params": all_params[i]}
+                    for i in pending[start : start + batch_size]
+                ],
+            ))
+
+        for batch in batches:
+            wait = poll_interval
+            while batch.processing_status != "ended":
                 time.sleep(wait)
+                wait = min(wait * 2, max_poll_interval)
+                batch = self._with_retries(self._client.messages.batches.retrieve, batch.id)
+            for entry in self._with_retries(self._client.messages.batches.results, batch.id):
+                i = int(entry.custom_id.removeprefix("req-"))
+                result = _batch_entry_result(entry, all_params[i])
+                if self.cache is not None and isinstance(result, dict):
+                    self.cache.put(all_params[i], result)
+                record(i, result, custom_id=entry.custom_id)
+
+        if cost:
+            cost.log()
+
+        return [
+            r if r is not None else LLMError(f"Batch request req-{i} returned no result")
+            for i, r in enumerate(results)
+        ]
+
+    def _acquire(self, params: dict) -> None:
+        """Wait on the client-side rate limiter, if configured, before a request."""
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(estimate_input_tokens(params))
+
+    @_retry_sync
+    def _send(self, params: dict) -> Any:
+        """Rate-limited ``messages.create``, retried."""
+        self._acquire(params)
+        return self._client.messages.create(**params)
+
+    def _enter_stream(self, params: dict) -> tuple[ExitStack, Any]:
+        """Open a message stream; return it and an ``ExitStack`` that closes it."""
+        self._acquire(params)
+        with ExitStack() as stack:
+            stream = stack.enter_context(self._client.messages.stream(**params))
+            return stack.pop_all(), stream
+
+    @_retry_sync
+    def _open_stream(self, params: dict) -> tuple[ExitStack, Any]:
+        """``_enter_stream``, retried until the response starts."""
+        return self._enter_stream(params)
+
+    @_retry_sync
+    def _open_text_stream(self, params: dict) -> tuple[ExitStack, str | None, Iterator[str]]:
+        """Open a stream and read its first text chunk, retrying until one arrives.
+
+        Failures before the first token (including errors delivered as stream
+        events, such as an overloaded server) are safe to retry because the
+        caller has seen nothing yet. Returns the exit stack, the first chunk
+        (``None`` for an empty response) and an iterator over the rest.
+        """
+        stack, stream = self._enter_stream(params)
+        with stack:
+            chunks = iter(stream.text_stream)
+            first = next(chunks, None)
+            return stack.pop_all(), first, chunks
+
+    @_retry_sync
+    def _with_retries(self, fn, *args, **kwargs):
+        """Call ``fn`` under the client's rate-limit/timeout retry policy."""
+        return fn(*args, **kwargs)
+
+
+class _Endpoint:
+    """One upstream (API key / base URL) with its own SDK client and load counter."""
+
+    __slots__ = ("client", "name", "capacity", "in_flight", "_semaphore")
+
+    def __init__(self, client: Any, name: str, concurrency_limit: int | None = None):
+        self.client = client
+        self.name = name
+        # Unlimited endpoints still need a denominator for load comparison.
+        self.capacity = concurrency_limit or 64
+        self.in_flight = 0
+        self._semaphore = asyncio.Semaphore(concurrency_limit) if concurrency_limit else None
+
+    @property
+    def load(self) -> float:
+        return self.in_flight / self.capacity
+
+    @asynccontextmanager
+    async def slot(self):
+        self.in_flight += 1
+        try:
+            if self._semaphore is None:
+                yield
+            else:
+                async with self._semaphore:
+                    yield
+        finally:
+            self.in_flight -= 1
+
+
+class _EndpointPool:
+    """Least-loaded routing over several endpoints with failover.
+
+    Each call goes to the endpoint with the lowest ``in_flight / capacity``;
+    on a 429, 5xx, timeout or connection error it moves on to the next
+    least-loaded endpoint before the caller's retry loop sees the error.
+    """
+
+    def __init__(self, endpoints: list[_Endpoint], fallback: bool = True):
+        self.endpoints = endpoints
+        self.fallback = fallback
+
+    def ranked(self) -> list[_Endpoint]:
+        return sorted(self.endpoints, key=lambda ep: ep.load)
+
+    async def create(self, params: dict) -> Any:
+        candidates = self.ranked()
+        if not self.fallback:
+            candidates = candidates[:1]
+        for i, endpoint in enumerate(candidates):
+            try:
+                async with endpoint.slot():
+                    return await endpoint.client.messages.create(**params)
             except APIError as e:
-                raise LLMError(f"Claude API error: {e}") from e
+                if i == len(candidates) - 1 or not _should_failover(e):
+                    raise
+                logger.warning(
+                    f"Endpoint {endpoint.name} failed ({type(e).__name__}), failing over"
+                )
+
+    async def close(self) -> None:
+        for endpoint in self.endpoints:
+            await endpoint.client.close()
 
-        raise LLMError(f"Failed after {self.max_retries} retries")
+
+def _should_failover(error: Exception) -> bool:
+    if isinstance(error, (RateLimitError, APIConnectionError)):
+        return True
+    return (getattr(error, "status_code", None) or 0) >= 500
 
 
 class AsyncLLMClient:
-    """Asynchronous wrapper around the Anthropic SDK."""
+    """Asynchronous wrapper around the Anthropic SDK.
+
+    Use ``async with AsyncLLMClient() as llm:`` (or ``await llm.close()``) so
+    the instance's HTTP pool is released; a passed-in ``http_client`` is
+    left open for its owner.
+
+    Args:
+        endpoints: Optional list of ``{"api_key", "base_url",
+            "concurrency_limit"}`` dicts (all keys optional) to spread
+            requests over several keys or gateways. Each call is routed to
+            the least-loaded endpoint; ``api_key`` is then ignored.
+        fallback: With ``endpoints``, retry a call on the next endpoint after
+            a 429, 5xx, timeout or connection error.
+        max_concurrency: Cap on requests in flight across every call made
+            through this client, including concurrent ``generate_many`` runs.
+        qps: Maximum request starts per second, spaced evenly.
+        rpm: Requests-per-minute budget for a private ``LLMRateLimiter``.
+        tpm: Input-tokens-per-minute budget for a private ``LLMRateLimiter``.
+    """
 
     def __init__(
         self,
         api_key: str | None = None,
         model: str = DEFAULT_MODEL,
         max_retries: int = 3,
+        cache: LLMCache | bool | None = None,
+        rate_limiter: LLMRateLimiter | None = None,
+        http_client: Any | None = None,
+        enable_prompt_cache: bool = True,
+        endpoints: list[dict] | None = None,
+        fallback: bool = True,
+        max_concurrency: int | None = None,
+        qps: float | None = None,
+        rpm: int | None = None,
+        tpm: int | None = None,
     ):
-        if not api_key and not os.environ.get("ANTHROPIC_API_KEY"):
+        if not endpoints and not api_key and not os.environ.get("ANTHROPIC_API_KEY"):
             raise LLMError(
                 "Anthropic API key is required. "
                 "Pass it directly or set ANTHROPIC_API_KEY in your environment."
             )
         try:
-            from anthropic import AsyncAnthropic
+            from anthropic import AsyncAnthropic, DefaultAsyncHttpxClient
         except ImportError:
             raise ImportError(
                 "anthropic is required for AsyncLLMClient. "
                 "Install with: pip install data-clients[llm]"
             )
-        self._client = AsyncAnthropic(api_key=api_key or None)
+        # Async pools are bound to the event loop they first run on, so unlike
+        # LLMClient each instance owns its pool unless one is passed in.
+        self._owns_http_client = http_client is None
+
+        http_options = _http_options(max(100, 2 * (max_concurrency or 0)))
+
+        def new_client(key: str | None, base_url: str | None = None):
+            pool = http_client or DefaultAsyncHttpxClient(**http_options)
+            return AsyncAnthropic(api_key=key or None, base_url=base_url, http_client=pool)
+
+        self._pool: _EndpointPool | None = None
+        if endpoints:
+            self._pool = _EndpointPool(
+                [
+                    _Endpoint(
+                        new_client(ep.get("api_key"), ep.get("base_url")),
+                        name=ep.get("base_url") or f"endpoint-{i}",
+                        concurrency_limit=ep.get("concurrency_limit"),
+                    )
+                    for i, ep in enumerate(endpoints)
+                ],
+                fallback=fallback,
+            )
+            self._client = self._pool.endpoints[0].client
+        else:
+            self._client = new_client(api_key)
         self.model = model
         self.max_retries = max_retries
+        self.cache = _resolve_cache(cache)
+        self.stats = {"hits": 0, "misses": 0}
+        self.rate_limiter = _resolve_rate_limiter(rate_limiter, rpm, tpm)
+        self.enable_prompt_cache = enable_prompt_cache
+        self._semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+        self._interval = 1.0 / qps if qps else 0.0
+        self._next_start = 0.0
+        self._batch_worker: BatchWorker | None = None
 
     @property
     def client(self):
         """Access the underlying AsyncAnthropic SDK client for advanced usage."""
         return self._client
 
+    async def close(self) -> None:
+        """Release the HTTP pool if this client owns it (a passed-in pool is left open)."""
+        if self._batch_worker is not None:
+            await self._batch_worker.close()
+        if not self._owns_http_client:
+            return
+        if self._pool is not None:
+            await self._pool.close()
+        else:
+            await self._client.close()
+
+    async def aclose(self) -> None:
+        """Alias for ``close()``, matching the httpx/anthropic async naming."""
+        await self.close()
+
+    async def _create(self, params: dict) -> Any:
+        async with self._concurrency():
+            if self._pool is not None:
+                return await self._pool.create(params)
+            return await self._client.messages.create(**params)
+
+    @_retry_async
+    async def _send(self, params: dict) -> Any:
+        """Rate-limited, concurrency-bounded ``messages.create``, retried."""
+        await self._acquire(params)
+        return await self._create(params)
+
+    async def _enter_stream(self, params: dict) -> tuple[AsyncExitStack, Any]:
+        """Open a message stream under the concurrency cap.
+
+        Returns the entered stream and an ``AsyncExitStack`` that closes it
+        and releases the concurrency slot.
+        """
+        await self._acquire(params)
+        async with AsyncExitStack() as stack:
+            await stack.enter_async_context(self._concurrency())
+            stream = await stack.enter_async_context(
+                self._stream_client().messages.stream(**params)
+            )
+            return stack.pop_all(), stream
+
+    @_retry_async
+    async def _open_stream(self, params: dict) -> tuple[AsyncExitStack, Any]:
+        """``_enter_stream``, retried until the response starts."""
+        return await self._enter_stream(params)
+
+    @_retry_async
+    async def _open_text_stream(
+        self, params: dict
+    ) -> tuple[AsyncExitStack, str | None, AsyncIterator[str]]:
+        """Async variant of ``LLMClient._open_text_stream``."""
+        stack, stream = await self._enter_stream(params)
+        async with stack:
+            chunks = aiter(stream.text_stream)
+            first = await anext(chunks, None)
+            return stack.pop_all(), first, chunks
+
+    def _concurrency(self):
+        return self._semaphore if self._semaphore is not None else nullcontext()
+
+    def _stream_client(self) -> Any:
+        # Streams are not failed over: tokens may already have been yielded.
+        if self._pool is not None:
+            return self._pool.ranked()[0].client
+        return self._client
+
+    async def __aenter__(self) -> AsyncLLMClient:
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
     async def generate(
         self,
         system_prompt: str,
@@ -234,47 +1039,69 @@ class AsyncLLMClient:
         max_tokens: int = 4096,
         temperature: float = 0.3,
         model: str | None = None,
+        no_cache: bool = False,
     ) -> dict:
         """Send a message to Claude and return the response with usage info.
 
         Args:
             user_content: A single string (wrapped as user message) or a list
                 of message dicts (``[{"role": ..., "content": ...}, ...]``).
+            no_cache: Bypass the response cache for this call (no lookup, no store).
         """
-        from anthropic import APIError, APITimeoutError, RateLimitError
+        params = _generate_params(
+            self.model, system_prompt, user_content, max_tokens, temperature, model,
+            prompt_cache=self.enable_prompt_cache,
+        )
+        use_model = params["model"]
+        cache = None if no_cache else self.cache
+        cached = await _acached_result(cache, self.stats, params)
+        if cached is not None:
+            return cached
+        response = await self._send(params)
+        result = {
+            "text": response.content[0].text,
+            **_usage_fields(response.usage),
+            "model": use_model,
+        }
+        if cache is not None:
+            await cache.aput(params, result)
+        return result
 
-        use_model = model or self.model
-        if isinstance(user_content, str):
-            msgs = [{"role": "user", "content": user_content}]
-        else:
-            msgs = user_content
-        for attempt in range(self.max_retries):
+    async def generate_stream_first(
+        self,
+        system_prompt: str,
+        user_content: str | list[dict],
+        max_tokens: int = 4096,
+        temperature: float = 0.3,
+        model: str | None = None,
+        first_token_cb: Callable[[str], None] | None = None,
+    ) -> dict:
+        """Async variant of ``LLMClient.generate_stream_first``."""
+        params = _generate_params(
+            self.model, system_prompt, user_content, max_tokens, temperature, model,
+            prompt_cache=self.enable_prompt_cache,
+        )
+        started = time.perf_counter()
+        ttft_ms = None
+        chunks: list[str] = []
+        stack, stream = await self._open_stream(params)
+        async with stack:
             try:
-                response = await self._client.messages.create(
-                    model=use_model,
-                    max_tokens=max_tokens,
-                    temperature=temperature,
-                    system=system_prompt,
-                    messages=msgs,
-                )
-                return {
-                    "text": response.content[0].text,
-                    "input_tokens": response.usage.input_tokens,
-                    "output_tokens": response.usage.output_tokens,
-                    "model": use_model,
-                }
-            except RateLimitError:
-                wait = 2 ** (attempt + 1)
-                logger.warning(f"Rate limited, retrying in {wait}s (attempt {attempt + 1})")
-                await asyncio.sleep(wait)
-            except APITimeoutError:
-                wait = 2 ** attempt
-                logger.warning(f"API timeout, retrying in {wait}s (attempt {attempt + 1})")
-                await asyncio.sleep(wait)
+                async for text in stream.text_stream:
+                    if ttft_ms is None:
+                        ttft_ms = (time.perf_counter() - started) * 1000
+                        if first_token_cb is not None:
+                            first_token_cb(text)
+                    chunks.append(text)
+                final = await stream.get_final_message()
             except APIError as e:
-                raise LLMError(f"Claude API error: {e}") from e
-
-        raise LLMError(f"Failed after {self.max_retries} retries")
+                raise LLMError(f"Claude API error mid-stream: {e}") from e
+        return {
+            "text": "".join(chunks),
+            **_usage_fields(final.usage),
+            "model": params["model"],
+            "ttft_ms": ttft_ms,
+        }
 
     async def generate_with_tools(
         self,
@@ -284,56 +1111,40 @@ class AsyncLLMClient:
         max_tokens: int = 4096,
         temperature: float = 0.3,
         model: str | None = None,
+        no_cache: bool = False,
     ) -> dict:
         """Multi-turn message call with tool definitions.
 
+        Pass ``no_cache=True`` to bypass the response cache for this call.
+
         Returns:
-            dict with keys: text, tool_calls, stop_reason, input_tokens, output_tokens, model
+            dict with keys: text, tool_calls, stop_reason, input_tokens, output_tokens,
+            cache_creation_tokens, cache_read_tokens, model
         """
-        from anthropic import APIError, APITimeoutError, RateLimitError
-
         use_model = model or self.model
-        for attempt in range(self.max_retries):
-            try:
-                response = await self._client.messages.create(
-                    model=use_model,
-                    max_tokens=max_tokens,
-                    temperature=temperature,
-                    system=system_prompt,
-                    messages=messages,
-                    tools=tools,
-                )
-                text_parts = []
-                tool_calls = []
-                for block in response.content:
-                    if block.type == "text":
-                        text_parts.append(block.text)
-                    elif block.type == "tool_use":
-                        tool_calls.append({
-                            "name": block.name,
-                            "input": block.input,
-                            "id": block.id,
-                        })
-                return {
-                    "text": "\n".join(text_parts),
-                    "tool_calls": tool_calls,
-                    "stop_reason": response.stop_reason,
-                    "input_tokens": response.usage.input_tokens,
-                    "output_tokens": response.usage.output_tokens,
-                    "model": use_model,
-                }
-            except RateLimitError:
-                wait = 2 ** (attempt + 1)
-                logger.warning(f"Rate limited, retrying in {wait}s (attempt {attempt + 1})")
-                await asyncio.sleep(wait)
-            except APITimeoutError:
-                wait = 2 ** attempt
-                logger.warning(f"API timeout, retrying in {wait}s (attempt {attempt + 1})")
-                await asyncio.sleep(wait)
-            except APIError as e:
-                raise LLMError(f"Claude API error: {e}") from e
-
-        raise LLMError(f"Failed after {self.max_retries} retries")
+        params = _request_params(
+            use_model, max_tokens, temperature, system_prompt, messages, tools,
+            prompt_cache=self.enable_prompt_cache,
+        )
+        cache = None if no_cache else self.cache
+        cached = await _acached_result(cache, self.stats, params)
+        if cached is not None:
+            return cached
+        response = await self._send(params)
+        result = {
+            "text": _join_text([b.text for b in response.content if b.type == "text"]),
+            "tool_calls": [
+                {"name": b.name, "input": b.input, "id": b.id}
+                for b in response.content
+                if b.type == "tool_use"
+            ],
+            "stop_reason": response.stop_reason,
+            **_usage_fields(response.usage),
+            "model": use_model,
+        }
+        if cache is not None:
+            await cache.aput(params, result)
+        return result
 
     async def stream(
         self,
@@ -344,33 +1155,21 @@ class AsyncLLMClient:
         model: str | None = None,
     ) -> AsyncIterator[str]:
         """Stream a response, yielding text chunks."""
-        from anthropic import APIError, APITimeoutError, RateLimitError
-
         use_model = model or self.model
-        for attempt in range(self.max_retries):
-            try:
-                async with self._client.messages.stream(
-                    model=use_model,
-                    max_tokens=max_tokens,
-                    temperature=temperature,
-                    system=system_prompt,
-                    messages=messages,
-                ) as stream:
-                    async for text in stream.text_stream:
-                        yield text
+        params = _request_params(
+            use_model, max_tokens, temperature, system_prompt, messages,
+            prompt_cache=self.enable_prompt_cache,
+        )
+        stack, first, chunks = await self._open_text_stream(params)
+        async with stack:
+            if first is None:
                 return
-            except RateLimitError:
-                wait = 2 ** (attempt + 1)
-                logger.warning(f"Rate limited, retrying in {wait}s (attempt {attempt + 1})")
-                await asyncio.sleep(wait)
-            except APITimeoutError:
-                wait = 2 ** attempt
-                logger.warning(f"API timeout, retrying in {wait}s (attempt {attempt + 1})")
-                await asyncio.sleep(wait)
+            yield first
+            try:
+                async for text in chunks:
+                    yield text
             except APIError as e:
-                raise LLMError(f"Claude API error: {e}") from e
-
-        raise LLMError(f"Failed after {self.max_retries} retries")
+                raise LLMError(f"Claude API error mid-stream: {e}") from e
 
     @asynccontextmanager
     async def stream_with_tools(
@@ -394,63 +1193,249 @@ class AsyncLLMClient:
         Yields a ``ToolStreamResult`` whose ``.text_stream`` is an async
         iterator of text deltas and whose ``.result`` dict (populated after
         the caller finishes iterating) contains ``text``, ``tool_calls``,
-        ``stop_reason``, ``input_tokens``, ``output_tokens``, and ``model``.
-        """
-        from anthropic import APIError, APITimeoutError, RateLimitError
+        ``stop_reason``, ``input_tokens``, ``output_tokens``,
+        ``cache_creation_tokens``, ``cache_read_tokens``, and ``model``.
 
+        If the caller stops iterating ``text_stream`` early, the response is
+        aborted and ``.result`` stays empty.
+        """
         use_model = model or self.model
+        params = _request_params(
+            use_model, max_tokens, temperature, system_prompt, messages, tools,
+            prompt_cache=self.enable_prompt_cache,
+        )
 
-        for attempt in range(self.max_retries):
+        stack, raw_stream = await self._open_stream(params)
+        holder = ToolStreamResult()
+        holder._raw_stream = raw_stream
+        async with stack:
             try:
-                holder = ToolStreamResult()
-                async with self._client.messages.stream(
-                    model=use_model,
-                    max_tokens=max_tokens,
-                    temperature=temperature,
-                    system=system_prompt,
-                    messages=messages,
-                    tools=tools,
-                ) as raw_stream:
-                    holder._raw_stream = raw_stream
-                    yield holder
-                    # Caller has finished iterating text_stream.
-                    # Still inside the SDK stream context — extract final message.
-                    final = await raw_stream.get_final_message()
-
-                text_parts: list[str] = []
-                tool_calls: list[dict[str, Any]] = []
-                for block in final.content:
-                    if block.type == "text":
-                        text_parts.append(block.text)
-                    elif block.type == "tool_use":
-                        tool_calls.append({
-                            "name": block.name,
-                            "input": block.input,
-                            "id": block.id,
-                        })
-                # Update in-place so references captured before exit stay valid
-                holder.result.update({
-                    "text": "\n".join(text_parts),
-                    "tool_calls": tool_calls,
-                    "stop_reason": final.stop_reason,
-                    "input_tokens": final.usage.input_tokens,
-                    "output_tokens": final.usage.output_tokens,
-                    "model": use_model,
-                })
-                return  # success
-
-            except RateLimitError:
-                wait = 2 ** (attempt + 1)
-                logger.warning(f"Rate limited, retrying in {wait}s (attempt {attempt + 1})")
-                await asyncio.sleep(wait)
-            except APITimeoutError:
-                wait = 2 ** attempt
-                logger.warning(f"API timeout, retrying in {wait}s (attempt {attempt + 1})")
-                await asyncio.sleep(wait)
+                yield holder
+                if holder._events is not None and not holder._completed:
+                    # Caller broke out of text_stream: abandon the response
+                    # instead of draining tokens nobody will read.
+                    await holder._events.aclose()
+                    await raw_stream.close()
+                    return
+                # Caller never iterated; consume the stream so the
+                # result is still available.
+                async for _ in holder.text_stream:
+                    pass
             except APIError as e:
-                raise LLMError(f"Claude API error: {e}") from e
+                raise LLMError(f"Claude API error mid-stream: {e}") from e
 
-        raise LLMError(f"Failed after {self.max_retries} retries")
+        holder._finalize(use_model)
+
+    async def generate_coalesced(
+        self,
+        system_prompt: str,
+        user_content: str | list[dict],
+        **kwargs: Any,
+    ) -> dict:
+        """``generate`` via a shared ``BatchWorker`` for half-price bulk work.
+
+        Concurrent callers within a short window are submitted together as
+        one Message Batch; each call returns once that batch has ended, so
+        expect minutes rather than seconds.
+        """
+        if self._batch_worker is None:
+            self._batch_worker = BatchWorker(self)
+        return await self._batch_worker.submit(
+            {"system_prompt": system_prompt, "user_content": user_content, **kwargs}
+        )
+
+    async def generate_many(
+        self,
+        items: list[dict],
+        max_concurrent: int = 5,
+        return_exceptions: bool = True,
+        batch_size: int | None = None,
+        output_jsonl: str | Path | None = None,
+        track_cost: bool = False,
+    ) -> list[dict | BaseException]:
+        """Run many ``generate`` calls concurrently with at most ``max_concurrent`` in flight.
+
+        Args:
+            items: ``generate`` keyword-argument dicts.
+            return_exceptions: Return per-item failures (e.g. ``LLMError``) in
+                place rather than raising the first one, so one bad item does
+                not sink the whole run.
+            batch_size: If set, gather ``items`` in chunks of this size to bound
+                the number of pending coroutines for very large inputs.
+            output_jsonl: Checkpoint file. Each successful result is appended
+                as it completes, and items already recorded there are returned
+                without calling the API, so an interrupted job resumes.
+            track_cost: Log a running estimated USD cost.
+
+        Returns:
+            Results in input order.
+        """
+        sem = asyncio.Semaphore(max_concurrent)
+        checkpoint = JsonlCheckpoint(output_jsonl) if output_jsonl else None
+        done = checkpoint.load() if checkpoint else {}
+        cost = CostTracker() if track_cost else None
+
+        async def one(index: int, item: dict) -> dict:
+            if index in done:
+                return done[index]
+            async with sem:
+                result = await self.generate(**item)
+            # Synchronous append: no await between write and fsync, so
+            # concurrent tasks cannot interleave records.
+            if checkpoint:
+                checkpoint.write(index, result)
+            if cost:
+                cost.add(result)
+            return result
+
+        step = batch_size or len(items) or 1
+        results: list[dict | BaseException] = []
+        for start in range(0, len(items), step):
+            results.extend(await asyncio.gather(
+                *(one(start + i, item) for i, item in enumerate(items[start : start + step])),
+                return_exceptions=return_exceptions,
+            ))
+        if cost:
+            cost.log()
+        return results
+
+    async def generate_as_completed(
+        self,
+        items: list[dict],
+        max_concurrent: int = 5,
+        return_exceptions: bool = True,
+    ) -> AsyncIterator[tuple[int, dict | BaseException]]:
+        """Yield ``(index, result)`` for each ``generate`` call as soon as it finishes.
+
+        Unlike ``generate_many``, downstream work can start on early results
+        while slower calls are still in flight. Results arrive in *completion*
+        order; ``index`` is the position in ``items``. Pending calls are
+        cancelled if the caller stops iterating early.
+        """
+        sem = asyncio.Semaphore(max_concurrent)
+
+        async def one(index: int, item: dict) -> tuple[int, dict | BaseException]:
+            async with sem:
+                try:
+                    return index, await self.generate(**item)
+                except Exception as e:
+                    if not return_exceptions:
+                        raise
+                    return index, e
+
+        tasks = [asyncio.create_task(one(i, item)) for i, item in enumerate(items)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def generate_batch(
+        self,
+        requests: list[dict],
+        batch_size: int = 10_000,
+        poll_interval: float = 10.0,
+        max_poll_interval: float = 300.0,
+        min_batch_size: int = 0,
+        on_progress: Callable[[int, int], None] | None = None,
+        output_jsonl: str | Path | None = None,
+        track_cost: bool = False,
+    ) -> list[dict | LLMError]:
+        """Run many ``generate`` calls through the Message Batches API.
+
+        See ``LLMClient.generate_batch``; polling uses ``asyncio.sleep`` and
+        the small-input fallback goes through ``generate_many``.
+        """
+        all_params = [
+            _generate_params(self.model, **req, prompt_cache=self.enable_prompt_cache)
+            for req in requests
+        ]
+        checkpoint = JsonlCheckpoint(output_jsonl) if output_jsonl else None
+        done = checkpoint.load() if checkpoint else {}
+        cost = CostTracker(discount=0.5) if track_cost else None
+        results: list[dict | LLMError | None] = [None] * len(all_params)
+        pending = []
+        for i, params in enumerate(all_params):
+            results[i] = done.get(i) or await _acached_result(self.cache, self.stats, params)
+            if results[i] is None:
+                pending.append(i)
+        completed = len(results) - len(pending)
+
+        def record(i: int, result: dict | BaseException, custom_id: str | None = None) -> None:
+            nonlocal completed
+            results[i] = result
+            completed += 1
+            if isinstance(result, dict):
+                if checkpoint:
+                    checkpoint.write(i, result, custom_id=custom_id)
+                if cost:
+                    cost.add(result)
+            if on_progress:
+                on_progress(completed, len(results))
+
+        if pending and len(pending) < min_batch_size:
+            # As in LLMClient.generate_batch: misses were counted above.
+            fallback = await self.generate_many(
+                [{**requests[i], "no_cache": True} for i in pending]
+            )
+            for i, result in zip(pending, fallback):
+                if self.cache is not None and isinstance(result, dict):
+                    await self.cache.aput(all_params[i], result)
+                record(i, result)
+            pending = []
+
+        batches = []
+        for start in range(0, len(pending), batch_size):
+            batches.append(await self._with_retries(
+                self._client.messages.batches.create,
+                requests=[
+                    {"custom_id": f"req-{i}", "params": all_params[i]}
+                    for i in pending[start : start + batch_size]
+                ],
+            ))
+
+        for batch in batches:
+            wait = poll_interval
+            while batch.processing_status != "ended":
+                await asyncio.sleep(wait)
+                wait = min(wait * 2, max_poll_interval)
+                batch = await self._with_retries(
+                    self._client.messages.batches.retrieve, batch.id
+                )
+            entries = await self._with_retries(self._client.messages.batches.results, batch.id)
+            async for entry in entries:
+                i = int(entry.custom_id.removeprefix("req-"))
+                result = _batch_entry_result(entry, all_params[i])
+                if self.cache is not None and isinstance(result, dict):
+                    await self.cache.aput(all_params[i], result)
+                record(i, result, custom_id=entry.custom_id)
+
+        if cost:
+            cost.log()
+
+        return [
+            r if r is not None else LLMError(f"Batch request req-{i} returned no result")
+            for i, r in enumerate(results)
+        ]
+
+    async def _acquire(self, params: dict) -> None:
+        """Wait on the client-side rate limiter and ``qps`` pacing, if configured."""
+        if self._interval:
+            # Leaky bucket: each request claims the next free start slot.
+            # No lock needed; nothing awaits between the read and the write.
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self._interval
+            if start > now:
+                await asyncio.sleep(start - now)
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire_async(estimate_input_tokens(params))
+
+    @_retry_async
+    async def _with_retries(self, fn, *args, **kwargs):
+        """Await ``fn`` under the client's rate-limit/timeout retry policy."""
+        return await fn(*args, **kwargs)
 
 
 class ToolStreamResult:
@@ -458,21 +1443,104 @@ class ToolStreamResult:
 
     Attributes:
         text_stream: Async iterable of text chunks (reasoning text).
-            Proxies the underlying Anthropic SDK stream.
+            Reads the underlying Anthropic SDK event stream, accumulating
+            text blocks, tool calls, stop reason and usage as it goes.
         result: Dict with ``text``, ``tool_calls``, ``stop_reason``, etc.
-            Populated **after** the async context manager exits.
+            Populated **after** the async context manager exits, and left
+            empty if the caller abandoned ``text_stream`` part-way.
     """
 
+    __slots__ = (
+        "_raw_stream",
+        "_events",
+        "_completed",
+        "result",
+        "_text_blocks",
+        "_tool_blocks",
+        "_stop_reason",
+        "_usage",
+        "_output_tokens",
+    )
+
     def __init__(self):
         self._raw_stream = None
+        self._events: AsyncIterator[str] | None = None
+        self._completed = False
         self.result: dict[str, Any] = {}
+        # content block index -> text deltas / tool call being assembled
+        self._text_blocks: dict[int, list[str]] = {}
+        self._tool_blocks: dict[int, dict[str, Any]] = {}
+        self._stop_reason: str | None = None
+        self._usage: Any = None
+        self._output_tokens = 0
 
     @property
     def text_stream(self):
         """Async iterable over text deltas from the response."""
         if self._raw_stream is None:
             return _empty_async_iter()
-        return self._raw_stream.text_stream
+        if self._events is None:
+            self._events = self._consume()
+        return self._events
+
+    async def _consume(self) -> AsyncIterator[str]:
+        async for event in self._raw_stream:
+            text = self._record(event)
+            if text:
+                yield text
+        self._completed = True
+
+    def _record(self, event: Any) -> str | None:
+        """Fold one SDK stream event into the accumulated state; return any text delta."""
+        etype = event.type
+        if etype == "content_block_delta":
+            delta = event.delta
+            if delta.type == "text_delta":
+                self._text_blocks.setdefault(event.index, []).append(delta.text)
+                return delta.text
+            if delta.type == "input_json_delta" and event.index in self._tool_blocks:
+                self._tool_blocks[event.index]["input_json"].append(delta.partial_json)
+        elif etype == "content_block_start":
+            block = event.content_block
+            if block.type == "text":
+                self._text_blocks[event.index] = [block.text] if block.text else []
+            elif block.type == "tool_use":
+                self._tool_blocks[event.index] = {
+                    "name": block.name,
+                    "id": block.id,
+                    "input_json": [],
+                }
+        elif etype == "message_start":
+            self._usage = event.message.usage
+        elif etype == "message_delta":
+            self._stop_reason = event.delta.stop_reason
+            self._output_tokens = event.usage.output_tokens
+        return None
+
+    def _finalize(self, model: str) -> None:
+        """Build ``result`` from the accumulated stream state."""
+        text_parts = ["".join(self._text_blocks[i]) for i in sorted(self._text_blocks)]
+        tool_calls = []
+        for _, tool in sorted(self._tool_blocks.items()):
+            raw_input = "".join(tool["input_json"])
+            tool_calls.append({
+                "name": tool["name"],
+                "input": json.loads(raw_input) if raw_input else {},
+                "id": tool["id"],
+            })
+        if self._usage is not None:
+            usage = _usage_fields(self._usage)
+        else:
+            usage = {"input_tokens": 0, "cache_creation_tokens": 0, "cache_read_tokens": 0}
+        usage["output_tokens"] = self._output_tokens
+        # Update in-place so references captured before exit stay valid
+        self.result.update({
+            "text": _join_text(text_parts),
+            "tool_calls": tool_calls,
+            "stop_reason": self._stop_reason,
+            **usage,
+            "model": model,
+        })
 
 
 async def _empty_async_iter():
@@ -0,0 +1,114 @@
+"""Coalesce concurrent single-prompt calls into Message Batches submissions."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING
+
+from data_clients.exceptions import LLMError
+
+if TYPE_CHECKING:
+    from data_clients.llm.client import AsyncLLMClient
+
+logger = logging.getLogger(__name__)
+
+
+class BatchWorker:
+    """Background collector that turns many ``generate`` calls into one batch.
+
+    Requests submitted within ``max_wait_ms`` of the first queued one (up
+    to ``max_batch``) go out together through ``generate_batch``, and each
+    caller's future resolves with its own result. Batches take minutes or
+    longer to complete, so this suits offline fan-out where the 50% batch
+    discount matters more than latency. Later windows keep collecting
+    while earlier batches are still processing.
+
+    Args:
+        client: Client whose ``generate_batch`` submits the work.
+        max_batch: Most requests per submitted batch.
+        max_wait_ms: How long to hold the first request waiting for others.
+        poll_interval: Initial batch status polling interval in seconds.
+    """
+
+    def __init__(
+        self,
+        client: AsyncLLMClient,
+        max_batch: int = 1000,
+        max_wait_ms: float = 50.0,
+        poll_interval: float = 10.0,
+    ):
+        self.client = client
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.poll_interval = poll_interval
+        self._queue: asyncio.Queue[tuple[dict, asyncio.Future]] | None = None
+        self._task: asyncio.Task | None = None
+        self._flushes: set[asyncio.Task] = set()
+
+    async def submit(self, request: dict) -> dict:
+        """Queue one ``generate`` keyword-argument dict and await its result."""
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((request, future))
+        return await future
+
+    async def close(self) -> None:
+        """Stop collecting and fail any request that has not been submitted yet."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        while self._queue is not None and not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(LLMError("BatchWorker closed before submission"))
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            pending: list[tuple[dict, asyncio.Future]] = []
+            try:
+                pending.append(await self._queue.get())
+                deadline = loop.time() + self.max_wait
+                while len(pending) < self.max_batch:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        pending.append(await asyncio.wait_for(self._queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+            except asyncio.CancelledError:
+                # Closed mid-window: these were dequeued, so close() cannot see them.
+                for _, future in pending:
+                    if not future.done():
+                        future.set_exception(LLMError("BatchWorker closed before submission"))
+                raise
+            flush = asyncio.create_task(self._flush(pending))
+            self._flushes.add(flush)
+            flush.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, pending: list[tuple[dict, asyncio.Future]]) -> None:
+        logger.debug(f"Submitting coalesced batch of {len(pending)} requests")
+        try:
+            results = await self.client.generate_batch(
+                [request for request, _ in pending],
+                poll_interval=self.poll_interval,
+            )
+        except Exception as e:
+            results = [e] * len(pending)
+        for (_, future), result in zip(pending, results):
+            if future.done():  # caller went away
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
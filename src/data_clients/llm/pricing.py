@@ -0,0 +1,58 @@
+"""Approximate Claude token pricing for cost tracking on bulk jobs."""
+
+from __future__ import annotations
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+# USD per million (input, output) tokens, matched by longest model-name prefix.
+MODEL_PRICES: dict[str, tuple[float, float]] = {
+    "claude-opus-4-5": (5.0, 25.0),
+    "claude-opus-4": (15.0, 75.0),
+    "claude-sonnet-4": (3.0, 15.0),
+    "claude-haiku-4-5": (1.0, 5.0),
+    "claude-3-5-haiku": (0.8, 4.0),
+}
+
+# Prompt-cache writes and reads are billed relative to the input price.
+_CACHE_WRITE_MULTIPLIER = 1.25
+_CACHE_READ_MULTIPLIER = 0.1
+
+
+def estimate_cost(result: dict) -> float:
+    """Estimated USD cost of one ``generate``-style result (0.0 for unknown models)."""
+    model = result.get("model") or ""
+    prefix = max((p for p in MODEL_PRICES if model.startswith(p)), key=len, default=None)
+    if prefix is None:
+        return 0.0
+    input_price, output_price = MODEL_PRICES[prefix]
+    input_cost = (
+        result.get("input_tokens", 0)
+        + result.get("cache_creation_tokens", 0) * _CACHE_WRITE_MULTIPLIER
+        + result.get("cache_read_tokens", 0) * _CACHE_READ_MULTIPLIER
+    ) * input_price
+    return (input_cost + result.get("output_tokens", 0) * output_price) / 1_000_000
+
+
+class CostTracker:
+    """Running cost total for a bulk job, logged every ``log_every`` results.
+
+    Args:
+        discount: Price multiplier, e.g. ``0.5`` for Message Batches.
+    """
+
+    def __init__(self, discount: float = 1.0, log_every: int = 100):
+        self.discount = discount
+        self.log_every = log_every
+        self.total_usd = 0.0
+        self.count = 0
+
+    def add(self, result: dict) -> None:
+        self.total_usd += estimate_cost(result) * self.discount
+        self.count += 1
+        if self.count % self.log_every == 0:
+            self.log()
+
+    def log(self) -> None:
+        logger.info(f"LLM cost so far: ${self.total_usd:.4f} over {self.count} results")
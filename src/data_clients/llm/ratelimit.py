@@ -0,0 +1,91 @@
+"""Client-side token-bucket rate limiting for LLM requests."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+
+class LLMRateLimiter:
+    """Token buckets over requests per minute and input tokens per minute.
+
+    Acquiring before each request keeps traffic under the account's limits
+    instead of discovering them through 429 responses and backoff. Capacity
+    is reserved under a thread lock and the caller then sleeps outside it,
+    so one limiter can be shared by sync and async clients alike.
+
+    Args:
+        rpm: Requests per minute, or ``None`` for no request limit.
+        tpm: Input tokens per minute, or ``None`` for no token limit.
+    """
+
+    def __init__(self, rpm: int | None = None, tpm: int | None = None):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._requests = float(rpm or 0)
+        self._tokens = float(tpm or 0)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: int = 0) -> None:
+        """Block until one request carrying ``tokens`` input tokens may be sent."""
+        wait = self._reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: int = 0) -> None:
+        """Async variant of :meth:`acquire`."""
+        wait = self._reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def penalize(self) -> None:
+        """Drain both buckets after a server-side 429.
+
+        The server knows better than our estimate, so subsequent acquires
+        wait for a refill rather than immediately re-sending.
+        """
+        with self._lock:
+            self._refill()
+            self._requests = min(self._requests, 0.0)
+            self._tokens = min(self._tokens, 0.0)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        if self.rpm:
+            self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60)
+        if self.tpm:
+            self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60)
+
+    def _reserve(self, tokens: int) -> float:
+        """Take capacity from the buckets and return how long to wait for it."""
+        with self._lock:
+            self._refill()
+            wait = 0.0
+            if self.rpm:
+                self._requests -= 1
+                if self._requests < 0:
+                    wait = -self._requests * 60 / self.rpm
+            if self.tpm:
+                # A single request larger than the whole bucket could never fit.
+                self._tokens -= min(tokens, self.tpm)
+                if self._tokens < 0:
+                    wait = max(wait, -self._tokens * 60 / self.tpm)
+            return wait
+
+
+def estimate_input_tokens(params: dict) -> int:
+    """Cheap input-token estimate (~4 characters per token) for a request."""
+    chars = len(str(params.get("system") or ""))
+    for message in params.get("messages") or []:
+        content = message.get("content") if isinstance(message, dict) else None
+        if isinstance(content, str):
+            chars += len(content)
+        elif isinstance(content, list):
+            for block in content:
+                if isinstance(block, dict):
+                    chars += len(str(block.get("text") or block.get("content") or ""))
+    return chars // 4
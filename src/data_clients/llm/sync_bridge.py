@@ -0,0 +1,85 @@
+"""Blocking facade over ``AsyncLLMClient`` running on a shared background loop."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Any, Coroutine, Iterator
+
+from data_clients.llm.client import AsyncLLMClient
+
+_loop: asyncio.AbstractEventLoop | None = None
+_loop_lock = threading.Lock()
+
+
+def _background_loop() -> asyncio.AbstractEventLoop:
+    """Process-wide event loop on a daemon thread, started on first use."""
+    global _loop
+    with _loop_lock:
+        if _loop is None or _loop.is_closed():
+            _loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=_loop.run_forever, name="llm-shared-loop", daemon=True
+            ).start()
+        return _loop
+
+
+class SharedLoopLLMClient:
+    """Synchronous API that drives one ``AsyncLLMClient`` on a background loop.
+
+    Hybrid apps (an async server plus sync jobs or scripts) can share a
+    single async client, and so a single connection pool, instead of
+    warming a separate sync pool. Calls block the calling thread until the
+    coroutine finishes on the shared loop; do not call from inside that loop.
+
+    Args:
+        async_client: Client to drive. Built from ``**kwargs`` if omitted, in
+            which case ``close()`` closes it.
+        **kwargs: ``AsyncLLMClient`` constructor arguments.
+    """
+
+    def __init__(self, async_client: AsyncLLMClient | None = None, **kwargs: Any):
+        self._owns_client = async_client is None
+        self.async_client = async_client or AsyncLLMClient(**kwargs)
+
+    def _run(self, coro: Coroutine) -> Any:
+        return asyncio.run_coroutine_threadsafe(coro, _background_loop()).result()
+
+    def generate(self, *args: Any, **kwargs: Any) -> dict:
+        """Blocking ``AsyncLLMClient.generate``."""
+        return self._run(self.async_client.generate(*args, **kwargs))
+
+    def generate_with_tools(self, *args: Any, **kwargs: Any) -> dict:
+        """Blocking ``AsyncLLMClient.generate_with_tools``."""
+        return self._run(self.async_client.generate_with_tools(*args, **kwargs))
+
+    def generate_many(self, *args: Any, **kwargs: Any) -> list[dict | BaseException]:
+        """Blocking ``AsyncLLMClient.generate_many``."""
+        return self._run(self.async_client.generate_many(*args, **kwargs))
+
+    def generate_batch(self, *args: Any, **kwargs: Any) -> list:
+        """Blocking ``AsyncLLMClient.generate_batch``."""
+        return self._run(self.async_client.generate_batch(*args, **kwargs))
+
+    def stream(self, *args: Any, **kwargs: Any) -> Iterator[str]:
+        """Blocking iterator over ``AsyncLLMClient.stream`` text chunks."""
+        chunks = self.async_client.stream(*args, **kwargs)
+        try:
+            while True:
+                try:
+                    yield self._run(chunks.__anext__())
+                except StopAsyncIteration:
+                    return
+        finally:
+            self._run(chunks.aclose())
+
+    def close(self) -> None:
+        """Close the async client if this facade created it."""
+        if self._owns_client:
+            self._run(self.async_client.close())
+
+    def __enter__(self) -> SharedLoopLLMClient:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -1,6 +1,12 @@
 """Vector store backends with abstract base."""
 
-from data_clients.vectorstore.base import BaseVectorStore, AsyncBaseVectorStore, SearchResult
+from data_clients.vectorstore.base import (
+    AsyncBaseVectorStore,
+    BaseVectorStore,
+    Embedding,
+    EmbeddingMatrix,
+    SearchResult,
+)
 from data_clients.vectorstore.chroma import ChromaVectorStore
 from data_clients.vectorstore.qdrant import QdrantVectorStore, AsyncQdrantVectorStore
 
@@ -8,6 +14,8 @@ __all__ = [
     "BaseVectorStore",
     "AsyncBaseVectorStore",
     "SearchResult",
+    "Embedding",
+    "EmbeddingMatrix",
     "ChromaVectorStore",
     "QdrantVectorStore",
     "AsyncQdrantVectorStore",
@@ -2,13 +2,28 @@
 
 from __future__ import annotations
 
+import asyncio
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
+from typing import TYPE_CHECKING, Union
 
+if TYPE_CHECKING:
+    import numpy as np
 
-@dataclass
+# A vector is a float list or a float32 numpy array; batches may be an
+# ``(N, D)`` array. Backends hand arrays to their clients without a
+# per-element Python round-trip.
+Embedding = Union[list[float], "np.ndarray"]
+EmbeddingMatrix = Union[list[list[float]], "np.ndarray"]
+
+
+@dataclass(slots=True, frozen=True, eq=False)
 class SearchResult:
-    """A single search result from a vector store query."""
+    """A single search result from a vector store query.
+
+    Slotted and immutable: one is allocated per hit, so large result sets
+    skip a per-instance ``__dict__``.
+    """
 
     doc_id: str
     score: float
@@ -20,7 +35,7 @@ class BaseVectorStore(ABC):
     """Abstract interface for vector storage and retrieval."""
 
     @abstractmethod
-    def add(self, doc_id: str, text: str, embedding: list[float], metadata: dict) -> None:
+    def add(self, doc_id: str, text: str, embedding: Embedding, metadata: dict) -> None:
         """Upsert a single document."""
         ...
 
@@ -29,7 +44,7 @@ class BaseVectorStore(ABC):
         self,
         ids: list[str],
         texts: list[str],
-        embeddings: list[list[float]],
+        embeddings: EmbeddingMatrix,
         metadatas: list[dict],
     ) -> None:
         """Upsert multiple documents."""
@@ -38,13 +53,26 @@ class BaseVectorStore(ABC):
     @abstractmethod
     def search(
         self,
-        query_embedding: list[float],
+        query_embedding: Embedding,
         n_results: int = 10,
         filters: dict | None = None,
     ) -> list[SearchResult]:
         """Similarity search returning ranked results."""
         ...
 
+    def search_batch(
+        self,
+        query_embeddings: EmbeddingMatrix,
+        n_results: int = 10,
+        filters: dict | None = None,
+    ) -> list[list[SearchResult]]:
+        """Run several similarity searches, one result list per query.
+
+        Backends with a native batch query override this to make a single
+        round-trip; the default runs ``search`` once per query.
+        """
+        return [self.search(q, n_results, filters) for q in query_embeddings]
+
     @abstractmethod
     def delete(self, doc_id: str) -> None:
         """Remove a document by ID."""
@@ -65,7 +93,7 @@ class AsyncBaseVectorStore(ABC):
     """Abstract async interface for vector storage and retrieval."""
 
     @abstractmethod
-    async def add(self, doc_id: str, text: str, embedding: list[float], metadata: dict) -> None:
+    async def add(self, doc_id: str, text: str, embedding: Embedding, metadata: dict) -> None:
         ...
 
     @abstractmethod
@@ -73,7 +101,7 @@ class AsyncBaseVectorStore(ABC):
         self,
         ids: list[str],
         texts: list[str],
-        embeddings: list[list[float]],
+        embeddings: EmbeddingMatrix,
         metadatas: list[dict],
     ) -> None:
         ...
@@ -81,12 +109,23 @@ class AsyncBaseVectorStore(ABC):
     @abstractmethod
     async def search(
         self,
-        query_embedding: list[float],
+        query_embedding: Embedding,
         n_results: int = 10,
         filters: dict | None = None,
     ) -> list[SearchResult]:
         ...
 
+    async def search_batch(
+        self,
+        query_embeddings: EmbeddingMatrix,
+        n_results: int = 10,
+        filters: dict | None = None,
+    ) -> list[list[SearchResult]]:
+        """Run several similarity searches; the default issues them concurrently."""
+        return list(await asyncio.gather(
+            *(self.search(q, n_results, filters) for q in query_embeddings)
+        ))
+
     @abstractmethod
     async def delete(self, doc_id: str) -> None:
         ...
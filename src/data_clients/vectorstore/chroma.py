@@ -3,15 +3,25 @@
 from __future__ import annotations
 
 import logging
-from datetime import datetime
+from datetime import date
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 from data_clients.exceptions import VectorStoreError
-from data_clients.vectorstore.base import BaseVectorStore, SearchResult
+from data_clients.vectorstore.base import (
+    BaseVectorStore,
+    Embedding,
+    EmbeddingMatrix,
+    SearchResult,
+)
+
+if TYPE_CHECKING:
+    import numpy as np
 
 logger = logging.getLogger(__name__)
 
 COLLECTION_NAME = "assistant"
+_PRUNE_PAGE_SIZE = 10_000
 
 
 class ChromaVectorStore(BaseVectorStore):
@@ -36,11 +46,11 @@ class ChromaVectorStore(BaseVectorStore):
         except Exception as e:
             raise VectorStoreError(f"Failed to initialize ChromaDB: {e}") from e
 
-    def add(self, doc_id: str, text: str, embedding: list[float], metadata: dict) -> None:
+    def add(self, doc_id: str, text: str, embedding: Embedding, metadata: dict) -> None:
         self.collection.upsert(
             ids=[doc_id],
             documents=[text],
-            embeddings=[embedding],
+            embeddings=_as_float32([embedding]),
             metadatas=[metadata],
         )
 
@@ -48,9 +58,16 @@ class ChromaVectorStore(BaseVectorStore):
         self,
         ids: list[str],
         texts: list[str],
-        embeddings: list[list[float]],
+        embeddings: EmbeddingMatrix,
         metadatas: list[dict],
     ) -> None:
+        """Upsert in chunks of 5000.
+
+        Embeddings are converted once to a contiguous ``float32`` matrix, the
+        form Chroma stores, so each chunk is a zero-copy slice. Passing a
+        ``float32`` ``np.ndarray`` skips the conversion entirely.
+        """
+        embeddings = _as_float32(embeddings)
         batch_size = 5000
         for i in range(0, len(ids), batch_size):
             self.collection.upsert(
@@ -62,7 +79,7 @@ class ChromaVectorStore(BaseVectorStore):
 
     def search(
         self,
-        query_embedding: list[float],
+        query_embedding: Embedding,
         n_results: int = 10,
         filters: dict | None = None,
     ) -> list[SearchResult]:
@@ -77,23 +94,29 @@ class ChromaVectorStore(BaseVectorStore):
             raw = self.collection.query(**kwargs)
         except Exception as e:
             raise VectorStoreError(f"ChromaDB search failed: {e}") from e
+        return _parse_query(raw, 0)
 
-        results: list[SearchResult] = []
-        if raw["ids"] and raw["ids"][0]:
-            ids = raw["ids"][0]
-            distances = raw["distances"][0] if raw.get("distances") else [0.0] * len(ids)
-            documents = raw["documents"][0] if raw.get("documents") else [None] * len(ids)
-            metadatas = raw["metadatas"][0] if raw.get("metadatas") else [{}] * len(ids)
-
-            for doc_id, dist, doc, meta in zip(ids, distances, documents, metadatas):
-                results.append(SearchResult(
-                    doc_id=doc_id,
-                    score=1.0 - dist,  # ChromaDB returns distance; convert to similarity
-                    text=doc,
-                    metadata=meta or {},
-                ))
+    def search_batch(
+        self,
+        query_embeddings: EmbeddingMatrix,
+        n_results: int = 10,
+        filters: dict | None = None,
+    ) -> list[list[SearchResult]]:
+        """Run all queries in one ``collection.query`` call."""
+        if len(query_embeddings) == 0:
+            return []
+        kwargs: dict = {
+            "query_embeddings": query_embeddings,
+            "n_results": n_results,
+        }
+        if filters:
+            kwargs["where"] = filters
 
-        return results
+        try:
+            raw = self.collection.query(**kwargs)
+        except Exception as e:
+            raise VectorStoreError(f"ChromaDB batch search failed: {e}") from e
+        return [_parse_query(raw, i) for i in range(len(query_embeddings))]
 
     def delete(self, doc_id: str) -> None:
         self.collection.delete(ids=[doc_id])
@@ -129,48 +152,133 @@ class ChromaVectorStore(BaseVectorStore):
         if total == 0:
             return 0
 
-        all_docs = self.collection.get(include=["metadatas"])
-        ids_to_delete = []
-        now = datetime.now()
+        import numpy as np  # installed with chromadb
 
-        for doc_id, metadata in zip(all_docs["ids"], all_docs["metadatas"]):
-            if not metadata:
-                continue
+        tiers = _retention_tiers(retention_thresholds)
+        today = np.datetime64(date.today(), "D")
+        pruned = 0
+        offset = 0
+        # Scan a page at a time so memory stays bounded on large collections.
+        while True:
+            page = self.collection.get(
+                include=["metadatas"], limit=_PRUNE_PAGE_SIZE, offset=offset
+            )
+            if not page["ids"]:
+                break
+            ids_to_delete = _expired_ids(page["ids"], page["metadatas"], tiers, today)
+            self.delete_batch(ids_to_delete)
+            pruned += len(ids_to_delete)
+            # Deleted rows no longer occupy offsets, so only step past the survivors.
+            offset += len(page["ids"]) - len(ids_to_delete)
 
-            weight = metadata.get("search_weight", 0.0)
-            date_str = metadata.get("date", "")
+        if pruned:
+            logger.info(f"Pruned {pruned} expired documents")
 
-            if not date_str:
-                continue
+        return pruned
 
-            try:
-                doc_date = datetime.fromisoformat(date_str[:10])
-            except (ValueError, TypeError):
-                continue
 
-            max_days = 30
-            sorted_tiers = sorted(
-                retention_thresholds.values(),
-                key=lambda t: t["min_weight"],
-                reverse=True,
-            )
-            for tier in sorted_tiers:
-                if weight >= tier["min_weight"]:
-                    max_days = tier["days"]
-                    break
-
-            override_days = metadata.get("retention_days")
-            if override_days is not None:
-                try:
-                    max_days = min(max_days, int(override_days))
-                except (TypeError, ValueError):
-                    pass
-
-            if (now - doc_date).days > max_days:
-                ids_to_delete.append(doc_id)
-
-        if ids_to_delete:
-            self.delete_batch(ids_to_delete)
-            logger.info(f"Pruned {len(ids_to_delete)} expired documents")
+def _as_float32(embeddings: EmbeddingMatrix) -> np.ndarray:
+    """Embeddings as a C-contiguous ``float32`` matrix (no copy if already one)."""
+    import numpy as np  # installed with chromadb
+
+    return np.ascontiguousarray(embeddings, dtype=np.float32)
+
+
+def _retention_tiers(retention_thresholds: dict) -> tuple[np.ndarray, np.ndarray]:
+    """Retention tiers as ``(negated min_weights ascending, days)`` arrays.
+
+    ``days`` has one extra trailing entry, the 30-day default for weights
+    below every tier, so a ``searchsorted`` index past the last tier maps to it.
+    """
+    import numpy as np
+
+    tiers = sorted(retention_thresholds.values(), key=lambda t: t["min_weight"], reverse=True)
+    neg_weights = np.array([-t["min_weight"] for t in tiers], dtype=np.float64)
+    days = np.array([t["days"] for t in tiers] + [30], dtype=np.int64)
+    return neg_weights, days
+
+
+def _expired_ids(
+    ids: list[str],
+    metadatas: list[dict | None],
+    tiers: tuple[np.ndarray, np.ndarray],
+    today: np.datetime64,
+) -> list[str]:
+    """IDs whose ``date`` is older than their retention tier allows, computed with NumPy.
+
+    A document keeps the ``days`` of the highest tier whose ``min_weight`` its
+    ``search_weight`` reaches (30 days if none), capped by a per-document
+    ``retention_days`` override. Documents without metadata or a parseable
+    ``date`` are kept. ``tiers`` comes from ``_retention_tiers``.
+    """
+    import numpy as np
+
+    if not ids:
+        return []
+    neg_tier_weights, tier_days = tiers
+
+    # The date is the cheapest filter, so read it first and look at weights
+    # and overrides only for the documents that have one.
+    days = _as_days([m.get("date") if m else None for m in metadatas])
+    dated = np.flatnonzero(~np.isnat(days))
+    if not len(dated):
+        return []
+    dated_meta = [metadatas[i] for i in dated]
+    weights = np.fromiter(
+        (m.get("search_weight", 0.0) for m in dated_meta), dtype=np.float64, count=len(dated)
+    )
+    overrides = np.fromiter(
+        (_as_int(m.get("retention_days")) for m in dated_meta),
+        dtype=np.float64,
+        count=len(dated),
+    )
+
+    max_days = tier_days[np.searchsorted(neg_tier_weights, -weights, side="left")]
+    max_days = np.where(np.isnan(overrides), max_days, np.fmin(max_days, overrides))
+    ages = (today - days[dated]).astype(np.int64)
+    return [ids[i] for i in dated[ages > max_days]]
+
+
+def _as_days(values: list) -> np.ndarray:
+    """``datetime64[D]`` array of the leading ``YYYY-MM-DD`` of each value, NaT if missing."""
+    import numpy as np
+
+    heads = [v[:10] if isinstance(v, str) and v else "NaT" for v in values]
+    if all(len(head) == 10 or head == "NaT" for head in heads):
+        try:
+            return np.array(heads, dtype="datetime64[D]")
+        except ValueError:
+            pass  # some malformed date; parse one by one so only those become NaT
+    days = np.empty(len(heads), dtype="datetime64[D]")
+    for i, head in enumerate(heads):
+        try:
+            days[i] = date.fromisoformat(head)
+        except ValueError:
+            days[i] = np.datetime64("NaT")
+    return days
+
+
+def _as_int(value) -> float:
+    """``int(value)`` as a float, or NaN when absent or not an integer."""
+    if value is None:
+        return float("nan")
+    try:
+        return float(int(value))
+    except (TypeError, ValueError):
+        return float("nan")
+
 
-        return len(ids_to_delete)
+def _parse_query(raw: dict, index: int) -> list[SearchResult]:
+    """Convert the ``index``-th query of a ChromaDB query response to results."""
+    if not raw["ids"] or not raw["ids"][index]:
+        return []
+    ids = raw["ids"][index]
+    n = len(ids)
+    distances = raw["distances"][index] if raw.get("distances") else [0.0] * n
+    documents = raw["documents"][index] if raw.get("documents") else [None] * n
+    metadatas = raw["metadatas"][index] if raw.get("metadatas") else [{}] * n
+    # ChromaDB returns distance; convert to similarity
+    return [
+        SearchResult(doc_id=doc_id, score=1.0 - dist, text=doc, metadata=meta or {})
+        for doc_id, dist, doc, meta in zip(ids, distances, documents, metadatas)
+    ]
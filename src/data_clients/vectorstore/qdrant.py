@@ -2,49 +2,89 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
 
 from data_clients.exceptions import VectorStoreError
-from data_clients.vectorstore.base import AsyncBaseVectorStore, BaseVectorStore, SearchResult
+from data_clients.vectorstore.base import (
+    AsyncBaseVectorStore,
+    BaseVectorStore,
+    Embedding,
+    EmbeddingMatrix,
+    SearchResult,
+)
+
+if TYPE_CHECKING:
+    from qdrant_client.models import Batch
 
 logger = logging.getLogger(__name__)
 
+_UPSERT_BATCH_SIZE = 100
+# Upserts kept in flight at once by ``add_batch``.
+_UPSERT_CONCURRENCY = 8
+
 
 class QdrantVectorStore(BaseVectorStore):
-    """Qdrant vector store with sync client."""
+    """Qdrant vector store with sync client.
+
+    Args:
+        url: Qdrant REST URL; used for the gRPC host too.
+        collection_name: Collection to use, created if missing.
+        vector_size: Dimension of the collection's vectors.
+        prefer_grpc: Send requests over gRPC, which carries vectors as packed
+            floats instead of JSON.
+        grpc_port: Qdrant gRPC port.
+        hnsw_m: HNSW graph degree for a newly created collection.
+        hnsw_ef_construct: HNSW build-time candidate list size for a newly
+            created collection.
+        quantization: ``"scalar"`` stores an int8 copy of each vector in RAM
+            (4x smaller) for a newly created collection, with searches
+            oversampled and rescored against the originals. ``None`` keeps
+            float32 only.
+    """
 
     def __init__(
         self,
         url: str = "http://localhost:6333",
         collection_name: str = "default",
         vector_size: int = 768,
+        prefer_grpc: bool = True,
+        grpc_port: int = 6334,
+        hnsw_m: int = 16,
+        hnsw_ef_construct: int = 64,
+        quantization: str | None = "scalar",
     ):
         try:
             from qdrant_client import QdrantClient
-            from qdrant_client.models import Distance, VectorParams
+            from qdrant_client.models import Distance, HnswConfigDiff, VectorParams
         except ImportError:
             raise ImportError(
                 "qdrant-client is required for QdrantVectorStore. "
                 "Install with: pip install data-clients[vectorstore-qdrant]"
             )
         self.collection_name = collection_name
+        self.quantized = _check_quantization(quantization)
         try:
-            self.client = QdrantClient(url=url)
+            self.client = QdrantClient(url=url, prefer_grpc=prefer_grpc, grpc_port=grpc_port)
             # Ensure collection exists
             collections = [c.name for c in self.client.get_collections().collections]
             if collection_name not in collections:
                 self.client.create_collection(
                     collection_name=collection_name,
                     vectors_config=VectorParams(size=vector_size, distance=Distance.COSINE),
+                    hnsw_config=HnswConfigDiff(m=hnsw_m, ef_construct=hnsw_ef_construct),
+                    quantization_config=_quantization_config(quantization),
                 )
         except Exception as e:
             raise VectorStoreError(f"Failed to initialize Qdrant: {e}") from e
 
-    def add(self, doc_id: str, text: str, embedding: list[float], metadata: dict) -> None:
+    def add(self, doc_id: str, text: str, embedding: Embedding, metadata: dict) -> None:
         from qdrant_client.models import PointStruct
 
         payload = {**metadata, "_text": text}
-        point = PointStruct(id=doc_id, vector=embedding, payload=payload)
+        point = PointStruct(id=doc_id, vector=_as_list(embedding), payload=payload)
         try:
             self.client.upsert(collection_name=self.collection_name, points=[point])
         except Exception as e:
@@ -54,60 +94,80 @@ class QdrantVectorStore(BaseVectorStore):
         self,
         ids: list[str],
         texts: list[str],
-        embeddings: list[list[float]],
+        embeddings: EmbeddingMatrix,
         metadatas: list[dict],
     ) -> None:
-        from qdrant_client.models import PointStruct
+        """Upsert in batches of 100, up to 8 in flight on worker threads.
+
+        All but the last batch are sent concurrently without waiting for the
+        write to be applied. The last is sent once they are acknowledged and
+        waits: Qdrant applies a collection's updates in order, so its ack
+        covers the earlier ones. Order among concurrent batches is not
+        defined, so an ID repeated across batches may keep either version.
+        """
+        batches = _point_batches(ids, texts, embeddings, metadatas)
+        if not batches:
+            return
 
-        batch_size = 100
-        for i in range(0, len(ids), batch_size):
-            points = []
-            for j in range(i, min(i + batch_size, len(ids))):
-                payload = {**metadatas[j], "_text": texts[j]}
-                points.append(PointStruct(id=ids[j], vector=embeddings[j], payload=payload))
+        def upsert(points: Batch, wait: bool = False) -> None:
             try:
-                self.client.upsert(collection_name=self.collection_name, points=points)
+                self.client.upsert(
+                    collection_name=self.collection_name, points=points, wait=wait
+                )
             except Exception as e:
                 raise VectorStoreError(f"Qdrant batch upsert failed: {e}") from e
 
+        if len(batches) > 1:
+            with ThreadPoolExecutor(max_workers=_UPSERT_CONCURRENCY) as pool:
+                list(pool.map(upsert, batches[:-1]))
+        upsert(batches[-1], wait=True)
+
     def search(
         self,
-        query_embedding: list[float],
+        query_embedding: Embedding,
         n_results: int = 10,
         filters: dict | None = None,
+        ef_search: int | None = None,
+        exact: bool = False,
     ) -> list[SearchResult]:
-        from qdrant_client.models import Filter, FieldCondition, MatchValue
-
-        qdrant_filter = None
-        if filters:
-            conditions = []
-            for key, value in filters.items():
-                conditions.append(FieldCondition(key=key, match=MatchValue(value=value)))
-            qdrant_filter = Filter(must=conditions)
+        """Nearest neighbours of ``query_embedding``.
 
+        Args:
+            ef_search: HNSW candidate list size for this query; higher trades
+                latency for recall. ``None`` uses the collection default.
+            exact: Scan all vectors instead of using the index.
+        """
         try:
-            hits = self.client.search(
+            results = self.client.query_points(
                 collection_name=self.collection_name,
-                query_vector=query_embedding,
+                query=_as_list(query_embedding),
                 limit=n_results,
-                query_filter=qdrant_filter,
+                query_filter=_build_filter(filters),
+                search_params=_search_params(ef_search, exact, self.quantized),
+                with_payload=True,
             )
         except Exception as e:
             raise VectorStoreError(f"Qdrant search failed: {e}") from e
 
-        results: list[SearchResult] = []
-        for hit in hits:
-            payload = hit.payload or {}
-            text = payload.get("_text")
-            metadata = {k: v for k, v in payload.items() if k != "_text"}
-            results.append(SearchResult(
-                doc_id=str(hit.id),
-                score=hit.score,
-                text=text,
-                metadata=metadata,
-            ))
+        return _to_search_results(results.points)
 
-        return results
+    def search_batch(
+        self,
+        query_embeddings: EmbeddingMatrix,
+        n_results: int = 10,
+        filters: dict | None = None,
+    ) -> list[list[SearchResult]]:
+        """Run all queries in one ``query_batch_points`` round-trip."""
+        if len(query_embeddings) == 0:
+            return []
+        try:
+            responses = self.client.query_batch_points(
+                collection_name=self.collection_name,
+                requests=_batch_requests(query_embeddings, n_results, filters, self.quantized),
+            )
+        except Exception as e:
+            raise VectorStoreError(f"Qdrant batch search failed: {e}") from e
+        return [_to_search_results(r.points) for r in responses]
 
     def delete(self, doc_id: str) -> None:
         from qdrant_client.models import PointIdsList
@@ -158,11 +218,19 @@ class AsyncQdrantVectorStore(AsyncBaseVectorStore):
         url: str = "http://localhost:6333",
         collection_name: str = "default",
         vector_size: int = 768,
+        prefer_grpc: bool = True,
+        grpc_port: int = 6334,
+        hnsw_m: int = 16,
+        hnsw_ef_construct: int = 64,
+        quantization: str | None = "scalar",
     ) -> "AsyncQdrantVectorStore":
-        """Async factory for creating an AsyncQdrantVectorStore."""
+        """Async factory for creating an AsyncQdrantVectorStore.
+
+        Arguments match ``QdrantVectorStore``.
+        """
         try:
             from qdrant_client import AsyncQdrantClient
-            from qdrant_client.models import Distance, VectorParams
+            from qdrant_client.models import Distance, HnswConfigDiff, VectorParams
         except ImportError:
             raise ImportError(
                 "qdrant-client is required for AsyncQdrantVectorStore. "
@@ -170,23 +238,28 @@ class AsyncQdrantVectorStore(AsyncBaseVectorStore):
             )
         instance = object.__new__(cls)
         instance.collection_name = collection_name
+        instance.quantized = _check_quantization(quantization)
         try:
-            instance.client = AsyncQdrantClient(url=url)
+            instance.client = AsyncQdrantClient(
+                url=url, prefer_grpc=prefer_grpc, grpc_port=grpc_port
+            )
             collections = [c.name for c in (await instance.client.get_collections()).collections]
             if collection_name not in collections:
                 await instance.client.create_collection(
                     collection_name=collection_name,
                     vectors_config=VectorParams(size=vector_size, distance=Distance.COSINE),
+                    hnsw_config=HnswConfigDiff(m=hnsw_m, ef_construct=hnsw_ef_construct),
+                    quantization_config=_quantization_config(quantization),
                 )
         except Exception as e:
             raise VectorStoreError(f"Failed to initialize async Qdrant: {e}") from e
         return instance
 
-    async def add(self, doc_id: str, text: str, embedding: list[float], metadata: dict) -> None:
+    async def add(self, doc_id: str, text: str, embedding: Embedding, metadata: dict) -> None:
         from qdrant_client.models import PointStruct
 
         payload = {**metadata, "_text": text}
-        point = PointStruct(id=doc_id, vector=embedding, payload=payload)
+        point = PointStruct(id=doc_id, vector=_as_list(embedding), payload=payload)
         try:
             await self.client.upsert(collection_name=self.collection_name, points=[point])
         except Exception as e:
@@ -196,61 +269,68 @@ class AsyncQdrantVectorStore(AsyncBaseVectorStore):
         self,
         ids: list[str],
         texts: list[str],
-        embeddings: list[list[float]],
+        embeddings: EmbeddingMatrix,
         metadatas: list[dict],
     ) -> None:
-        from qdrant_client.models import PointStruct
+        """Upsert in batches of 100, up to 8 in flight; see ``QdrantVectorStore.add_batch``."""
+        batches = _point_batches(ids, texts, embeddings, metadatas)
+        if not batches:
+            return
+        semaphore = asyncio.Semaphore(_UPSERT_CONCURRENCY)
 
-        batch_size = 100
-        for i in range(0, len(ids), batch_size):
-            points = []
-            for j in range(i, min(i + batch_size, len(ids))):
-                payload = {**metadatas[j], "_text": texts[j]}
-                points.append(PointStruct(id=ids[j], vector=embeddings[j], payload=payload))
-            try:
-                await self.client.upsert(collection_name=self.collection_name, points=points)
-            except Exception as e:
-                raise VectorStoreError(f"Async Qdrant batch upsert failed: {e}") from e
+        async def upsert(points: Batch, wait: bool = False) -> None:
+            async with semaphore:
+                try:
+                    await self.client.upsert(
+                        collection_name=self.collection_name, points=points, wait=wait
+                    )
+                except Exception as e:
+                    raise VectorStoreError(f"Async Qdrant batch upsert failed: {e}") from e
+
+        await asyncio.gather(*(upsert(points) for points in batches[:-1]))
+        await upsert(batches[-1], wait=True)
 
     async def search(
         self,
-        query_embedding: list[float],
+        query_embedding: Embedding,
         n_results: int = 10,
         filters: dict | None = None,
+        ef_search: int | None = None,
+        exact: bool = False,
     ) -> list[SearchResult]:
-        from qdrant_client.models import Filter, FieldCondition, MatchValue
-
-        qdrant_filter = None
-        if filters:
-            conditions = []
-            for key, value in filters.items():
-                conditions.append(FieldCondition(key=key, match=MatchValue(value=value)))
-            qdrant_filter = Filter(must=conditions)
-
+        """Nearest neighbours; see ``QdrantVectorStore.search``."""
         try:
             results = await self.client.query_points(
                 collection_name=self.collection_name,
-                query=query_embedding,
+                query=_as_list(query_embedding),
                 limit=n_results,
-                query_filter=qdrant_filter,
+                query_filter=_build_filter(filters),
+                search_params=_search_params(ef_search, exact, self.quantized),
                 with_payload=True,
             )
             points = results.points
         except Exception as e:
             raise VectorStoreError(f"Async Qdrant search failed: {e}") from e
 
-        search_results: list[SearchResult] = []
-        for hit in points:
-            payload = hit.payload or {}
-            text = payload.get("_text")
-            metadata = {k: v for k, v in payload.items() if k != "_text"}
-            search_results.append(SearchResult(
-                doc_id=str(hit.id),
-                score=hit.score,
-                text=text,
-                metadata=metadata,
-            ))
-        return search_results
+        return _to_search_results(points)
+
+    async def search_batch(
+        self,
+        query_embeddings: EmbeddingMatrix,
+        n_results: int = 10,
+        filters: dict | None = None,
+    ) -> list[list[SearchResult]]:
+        """Run all queries in one ``query_batch_points`` round-trip."""
+        if len(query_embeddings) == 0:
+            return []
+        try:
+            responses = await self.client.query_batch_points(
+                collection_name=self.collection_name,
+                requests=_batch_requests(query_embeddings, n_results, filters, self.quantized),
+            )
+        except Exception as e:
+            raise VectorStoreError(f"Async Qdrant batch search failed: {e}") from e
+        return [_to_search_results(r.points) for r in responses]
 
     async def delete(self, doc_id: str) -> None:
         from qdrant_client.models import PointIdsList
@@ -286,3 +366,110 @@ class AsyncQdrantVectorStore(AsyncBaseVectorStore):
     async def close(self) -> None:
         """Close the async client connection."""
         await self.client.close()
+
+
+def _as_list(embedding: Embedding | EmbeddingMatrix) -> list:
+    """Convert a numpy vector/matrix to nested lists in one C-level pass."""
+    return embedding.tolist() if hasattr(embedding, "tolist") else embedding
+
+
+def _point_batches(
+    ids: list[str],
+    texts: list[str],
+    embeddings: EmbeddingMatrix,
+    metadatas: list[dict],
+) -> list[Batch]:
+    """Split documents into columnar ``Batch`` upserts of ``_UPSERT_BATCH_SIZE``.
+
+    ``Batch`` carries parallel id/vector/payload lists, so no per-point model
+    objects are built or validated.
+    """
+    from qdrant_client.models import Batch
+
+    batches = []
+    for i in range(0, len(ids), _UPSERT_BATCH_SIZE):
+        end = i + _UPSERT_BATCH_SIZE
+        batches.append(Batch(
+            ids=ids[i:end],
+            vectors=_as_list(embeddings[i:end]),
+            payloads=[
+                {**metadata, "_text": text}
+                for metadata, text in zip(metadatas[i:end], texts[i:end])
+            ],
+        ))
+    return batches
+
+
+def _build_filter(filters: dict | None):
+    """Translate ``{key: value}`` equality filters to a Qdrant ``Filter``."""
+    if not filters:
+        return None
+    from qdrant_client.models import Filter, FieldCondition, MatchValue
+
+    return Filter(must=[
+        FieldCondition(key=key, match=MatchValue(value=value))
+        for key, value in filters.items()
+    ])
+
+
+def _check_quantization(quantization: str | None) -> bool:
+    if quantization not in (None, "scalar"):
+        raise VectorStoreError(
+            f"Unsupported Qdrant quantization: {quantization!r} (use 'scalar' or None)"
+        )
+    return quantization is not None
+
+
+def _quantization_config(quantization: str | None):
+    if quantization is None:
+        return None
+    from qdrant_client.models import ScalarQuantization, ScalarQuantizationConfig, ScalarType
+
+    return ScalarQuantization(
+        scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True)
+    )
+
+
+def _search_params(ef_search: int | None, exact: bool, quantized: bool = False):
+    """Per-query ``SearchParams``, or ``None`` to use the collection defaults.
+
+    Quantized stores oversample 2x on the int8 vectors and rescore the
+    candidates with the originals, keeping top-k recall close to float32.
+    """
+    if ef_search is None and not exact and not quantized:
+        return None
+    from qdrant_client.models import QuantizationSearchParams, SearchParams
+
+    quantization = QuantizationSearchParams(rescore=True, oversampling=2.0) if quantized else None
+    return SearchParams(hnsw_ef=ef_search, exact=exact, quantization=quantization)
+
+
+def _batch_requests(
+    query_embeddings: EmbeddingMatrix,
+    n_results: int,
+    filters: dict | None,
+    quantized: bool = False,
+):
+    from qdrant_client.models import QueryRequest
+
+    qdrant_filter = _build_filter(filters)
+    params = _search_params(None, False, quantized)
+    return [
+        QueryRequest(
+            query=q, limit=n_results, filter=qdrant_filter, params=params, with_payload=True
+        )
+        for q in query_embeddings
+    ]
+
+
+def _to_search_results(hits) -> list[SearchResult]:
+    """Convert Qdrant scored points to ``SearchResult``s, splitting out ``_text``."""
+    return [_to_search_result(hit) for hit in hits]
+
+
+def _to_search_result(hit) -> SearchResult:
+    # Both the remote and local clients return a fresh payload per hit, so
+    # ``_text`` is popped in place and the rest becomes the metadata as-is.
+    metadata = hit.payload if hit.payload is not None else {}
+    text = metadata.pop("_text", None)
+    return SearchResult(doc_id=str(hit.id), score=hit.score, text=text, metadata=metadata)
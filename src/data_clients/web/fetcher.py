@@ -2,15 +2,47 @@
 
 from __future__ import annotations
 
+import asyncio
+import bisect
+import functools
+import http.cookiejar
+import importlib.util
 import ipaddress
 import logging
+import re
 import socket
-from urllib.parse import urlparse
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterator
+from urllib.parse import ParseResult, urlparse
 
 from data_clients.exceptions import WebFetchError
 
+try:
+    import httpx
+    from bs4 import BeautifulSoup
+except ImportError:  # reported when a WebFetcher is constructed
+    httpx = None
+    BeautifulSoup = None
+
+try:
+    # Lexbor backend: selectolax 1.0 removed the older ``selectolax.parser`` one
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+except ImportError:  # optional C parser; falls back to BeautifulSoup
+    HTMLParser = None
+
 logger = logging.getLogger(__name__)
 
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+# BeautifulSoup backend when selectolax is missing: lxml (C) if present.
+_BS4_PARSER = "lxml" if importlib.util.find_spec("lxml") is not None else "html.parser"
+_STRIP_TAGS = ["script", "style", "nav", "footer", "header"]
+# Body starts with markup; scans only the leading whitespace instead of stripping a copy.
+_MARKUP_START = re.compile(r"\s*<")
+# Seconds a hostname's resolved addresses are reused before looking up again.
+_DNS_TTL = 30.0
+
 _ALLOWED_SCHEMES = {"http", "https"}
 
 _BLOCKED_NETWORKS = [
@@ -26,42 +58,285 @@ _BLOCKED_NETWORKS = [
 ]
 
 
-def _validate_url(url: str) -> tuple[bool, str | None, str | None]:
-    """Validate a URL for safety. Returns (is_safe, error_message, resolved_ip)."""
+def _blocked_ranges(version: int) -> tuple[list[int], list[int]]:
+    """Collapsed blocked networks of one IP version as sorted (starts, ends) lists."""
+    networks = ipaddress.collapse_addresses(
+        n for n in _BLOCKED_NETWORKS if n.version == version
+    )
+    ranges = [(int(n.network_address), int(n.broadcast_address)) for n in networks]
+    return [start for start, _ in ranges], [end for _, end in ranges]
+
+
+# IP version -> non-overlapping ranges, so one bisect finds the only candidate.
+_BLOCKED_RANGES = {4: _blocked_ranges(4), 6: _blocked_ranges(6)}
+
+
+def _is_blocked(ip: ipaddress.IPv4Address | ipaddress.IPv6Address) -> bool:
+    starts, ends = _BLOCKED_RANGES[ip.version]
+    value = int(ip)
+    i = bisect.bisect_right(starts, value) - 1
+    return i >= 0 and value <= ends[i]
+
+
+def _client_options() -> dict:
+    """Shared ``httpx`` client settings: pooled keep-alive, HTTP/2 when ``h2`` is installed.
+
+    The clients live as long as the fetcher, so their cookie jar refuses
+    every cookie: a ``Set-Cookie`` from one untrusted page must not be
+    replayed on later fetches or redirects.
+    """
+    return {
+        "cookies": http.cookiejar.CookieJar(
+            policy=http.cookiejar.DefaultCookiePolicy(allowed_domains=[])
+        ),
+        "timeout": 10.0,
+        "follow_redirects": False,
+        "max_redirects": 0,
+        "http2": _HTTP2_AVAILABLE,
+        "limits": httpx.Limits(max_keepalive_connections=50, max_connections=100),
+    }
+
+
+def _extract_text(html: str, max_length: int) -> str:
+    """First ``max_length`` characters of an HTML document's visible text.
+
+    Scripts, styles and page chrome are dropped. Both backends yield the
+    same output: the stripped, non-empty text nodes joined by newlines,
+    stopping once ``max_length`` is reached instead of materializing the
+    text of the whole page.
+    """
+    if HTMLParser is not None:
+        tree = HTMLParser(html)
+        tree.strip_tags(_STRIP_TAGS)
+        root = tree.root
+        if root is None:
+            return ""
+        texts = (
+            node.text_content.strip()
+            for node in root.traverse(include_text=True)
+            if node.is_text_node
+        )
+        return _join_texts((text for text in texts if text), max_length)
+    soup = BeautifulSoup(html, _BS4_PARSER)
+    # One tree walk collects every match before any is removed.
+    for element in soup(_STRIP_TAGS):
+        element.decompose()
+    return _join_texts(soup.stripped_strings, max_length)
+
+
+def _join_texts(texts: Iterator[str], max_length: int) -> str:
+    """Newline-join ``texts``, consuming only as many as ``max_length`` needs."""
+    parts: list[str] = []
+    size = 0
+    for text in texts:
+        parts.append(text)
+        size += len(text) + 1
+        if size > max_length:
+            break
+    return "\n".join(parts)[:max_length]
+
+
+def _too_large(limit: int) -> WebFetchError:
+    return WebFetchError(f"Response too large (>{limit} bytes)")
+
+
+def _declared_too_large(response: httpx.Response, limit: int) -> bool:
+    length = response.headers.get("content-length", "")
+    return length.isdigit() and int(length) > limit
+
+
+def _read_capped(response: httpx.Response, limit: int) -> bytes:
+    """Read a streamed body, aborting as soon as it exceeds ``limit`` bytes."""
+    if _declared_too_large(response, limit):
+        raise _too_large(limit)
+    chunks: list[bytes] = []
+    total = 0
+    for chunk in response.iter_bytes(chunk_size=65536):
+        total += len(chunk)
+        if total > limit:
+            raise _too_large(limit)
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+async def _aread_capped(response: httpx.Response, limit: int) -> bytes:
+    """Async ``_read_capped``."""
+    if _declared_too_large(response, limit):
+        raise _too_large(limit)
+    chunks: list[bytes] = []
+    total = 0
+    async for chunk in response.aiter_bytes(chunk_size=65536):
+        total += len(chunk)
+        if total > limit:
+            raise _too_large(limit)
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def _buffered(response: httpx.Response, body: bytes) -> httpx.Response:
+    """In-memory copy of a streamed response carrying its already-decoded ``body``."""
+    headers = response.headers.copy()
+    # The body is already decompressed; don't let the copy decode it again.
+    headers.pop("content-encoding", None)
+    return httpx.Response(
+        response.status_code,
+        headers=headers,
+        content=body,
+        request=response.request,
+        extensions=response.extensions,
+    )
+
+
+def _decode_head(response: httpx.Response, max_length: int) -> str:
+    """The first ``max_length`` characters of the body, decoding only the bytes needed.
+
+    UTF-8 and the common single- and double-byte charsets use at most 4 bytes
+    per character, so the first ``4 * max_length`` bytes hold them.
+    """
+    head = response.content[: max_length * 4]
+    return head.decode(response.encoding or "utf-8", errors="replace")[:max_length]
+
+
+def _extract_links(html: str) -> list[dict]:
+    """``{"href", "text"}`` for every anchor with an ``href``, in document order."""
+    if HTMLParser is not None:
+        return [
+            # A valueless ``<a href>`` has a None attribute here; BeautifulSoup gives ""
+            {"href": node.attributes["href"] or "", "text": node.text(strip=True)[:100]}
+            for node in HTMLParser(html).css("a[href]")
+        ]
+    soup = BeautifulSoup(html, _BS4_PARSER)
+    return [
+        {"href": a_tag["href"], "text": a_tag.get_text(strip=True)[:100]}
+        for a_tag in soup.find_all("a", href=True)
+    ]
+
+
+# hostname -> (expiry on the monotonic clock, resolved addresses)
+_dns_cache: OrderedDict[str, tuple[float, tuple[str, ...]]] = OrderedDict()
+_dns_cache_lock = threading.Lock()
+
+
+def _cached_addresses(hostname: str) -> tuple[str, ...] | None:
+    with _dns_cache_lock:
+        entry = _dns_cache.get(hostname)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        _dns_cache.move_to_end(hostname)
+        return entry[1]
+
+
+def _store_addresses(hostname: str, addr_infos: list) -> tuple[str, ...]:
+    addresses = tuple(info[4][0] for info in addr_infos)
+    with _dns_cache_lock:
+        _dns_cache[hostname] = (time.monotonic() + _DNS_TTL, addresses)
+        _dns_cache.move_to_end(hostname)
+        if len(_dns_cache) > 1024:
+            _dns_cache.popitem(last=False)
+    return addresses
+
+
+def _resolve(hostname: str) -> tuple[str, ...]:
+    """Resolved addresses for ``hostname``, memoized for up to ``_DNS_TTL`` seconds.
+
+    Failed lookups raise and are not cached.
+    """
+    addresses = _cached_addresses(hostname)
+    if addresses is None:
+        addresses = _store_addresses(hostname, socket.getaddrinfo(hostname, None))
+    return addresses
+
+
+async def _resolve_async(hostname: str) -> tuple[str, ...]:
+    """``_resolve`` that runs the lookup off the event loop on a cache miss."""
+    addresses = _cached_addresses(hostname)
+    if addresses is None:
+        addr_infos = await asyncio.get_running_loop().getaddrinfo(hostname, None)
+        addresses = _store_addresses(hostname, addr_infos)
+    return addresses
+
+
+@functools.lru_cache(maxsize=2048)
+def _precheck_url(url: str) -> tuple[str | None, ParseResult | None]:
+    """Checks that need no DNS lookup. Returns (error_message, parsed_url).
+
+    Memoized: the result depends only on the URL string. DNS answers are
+    cached separately, with a TTL, by ``_resolve``.
+    """
     try:
         parsed = urlparse(url)
     except Exception:
-        return False, "Invalid URL format", None
+        return "Invalid URL format", None
 
     if parsed.scheme not in _ALLOWED_SCHEMES:
-        return False, f"Blocked URL scheme: {parsed.scheme}. Only http/https allowed.", None
+        return f"Blocked URL scheme: {parsed.scheme}. Only http/https allowed.", None
+
+    if not parsed.hostname:
+        return "URL has no hostname", None
+
+    if parsed.hostname in ("localhost", "0.0.0.0"):
+        return "Blocked: localhost access not allowed", None
 
-    hostname = parsed.hostname
-    if not hostname:
-        return False, "URL has no hostname", None
+    return None, parsed
 
-    if hostname in ("localhost", "0.0.0.0"):
-        return False, "Blocked: localhost access not allowed", None
 
+def _check_addresses(addresses: tuple[str, ...]) -> tuple[str | None, str | None]:
+    """Reject private/internal addresses. Returns (error_message, first_ip)."""
     resolved_ip = None
+    for address in addresses:
+        ip = ipaddress.ip_address(address)
+        if _is_blocked(ip):
+            return f"Blocked: URL resolves to private/internal IP ({ip})", None
+        if resolved_ip is None:
+            resolved_ip = str(ip)
+    return None, resolved_ip
+
+
+def _check_url(url: str) -> tuple[bool, str | None, str | None, ParseResult | None]:
+    """``_validate_url`` plus the parsed URL, so callers need not parse it again."""
+    error, parsed = _precheck_url(url)
+    if error:
+        return False, error, None, None
     try:
-        addr_infos = socket.getaddrinfo(hostname, None)
-        for addr_info in addr_infos:
-            ip = ipaddress.ip_address(addr_info[4][0])
-            for network in _BLOCKED_NETWORKS:
-                if ip in network:
-                    return False, f"Blocked: URL resolves to private/internal IP ({ip})", None
-            if resolved_ip is None:
-                resolved_ip = str(ip)
+        addresses = _resolve(parsed.hostname)
     except socket.gaierror:
-        return False, f"Cannot resolve hostname: {hostname}", None
+        return False, f"Cannot resolve hostname: {parsed.hostname}", None, None
+    error, resolved_ip = _check_addresses(addresses)
+    if error:
+        return False, error, None, None
+    return True, None, resolved_ip, parsed
+
+
+async def _check_url_async(url: str) -> tuple[bool, str | None, str | None, ParseResult | None]:
+    """``_check_url`` that resolves the hostname without blocking the event loop."""
+    error, parsed = _precheck_url(url)
+    if error:
+        return False, error, None, None
+    try:
+        addresses = await _resolve_async(parsed.hostname)
+    except socket.gaierror:
+        return False, f"Cannot resolve hostname: {parsed.hostname}", None, None
+    error, resolved_ip = _check_addresses(addresses)
+    if error:
+        return False, error, None, None
+    return True, None, resolved_ip, parsed
+
 
-    return True, None, resolved_ip
+def _validate_url(url: str) -> tuple[bool, str | None, str | None]:
+    """Validate a URL for safety. Returns (is_safe, error_message, resolved_ip)."""
+    is_safe, error, resolved_ip, _ = _check_url(url)
+    return is_safe, error, resolved_ip
 
 
 class WebFetcher:
     """SSRF-safe URL fetcher with content extraction.
 
+    HTTP clients are created on first use and reused across fetches, so
+    repeat requests to a host skip the TCP/TLS handshake. The async client is
+    bound to the event loop it was created on and is rebuilt if used from a
+    different one. Call ``close()`` / ``aclose()`` (or use the fetcher as a
+    context manager) to release pooled connections.
+
     Args:
         max_response_bytes: Maximum response size in bytes (default 1MB).
         max_redirects: Maximum number of redirects to follow (default 5).
@@ -72,8 +347,55 @@ class WebFetcher:
         max_response_bytes: int = 1_048_576,
         max_redirects: int = 5,
     ):
+        if httpx is None or BeautifulSoup is None:
+            raise ImportError(
+                "httpx and beautifulsoup4 are required for WebFetcher. "
+                "Install with: pip install data-clients[web]"
+            )
         self.max_response_bytes = max_response_bytes
         self.max_redirects = max_redirects
+        self._sync_client: httpx.Client | None = None
+        self._async_client: httpx.AsyncClient | None = None
+        self._async_client_loop: asyncio.AbstractEventLoop | None = None
+
+    def _get_sync_client(self) -> httpx.Client:
+        if self._sync_client is None or self._sync_client.is_closed:
+            self._sync_client = httpx.Client(**_client_options())
+        return self._sync_client
+
+    def _get_async_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        client = self._async_client
+        if client is None or client.is_closed or self._async_client_loop is not loop:
+            self._async_client = httpx.AsyncClient(**_client_options())
+            self._async_client_loop = loop
+        return self._async_client
+
+    def close(self) -> None:
+        """Close the pooled sync client."""
+        if self._sync_client is not None:
+            self._sync_client.close()
+            self._sync_client = None
+
+    async def aclose(self) -> None:
+        """Close the pooled async and sync clients."""
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+            self._async_client_loop = None
+        self.close()
+
+    def __enter__(self) -> WebFetcher:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    async def __aenter__(self) -> WebFetcher:
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
 
     async def fetch(
         self,
@@ -91,78 +413,64 @@ class WebFetcher:
         Returns:
             Dict with url, content/links, status_code, content_type.
         """
-        try:
-            import httpx
-            from bs4 import BeautifulSoup
-        except ImportError:
-            raise ImportError(
-                "httpx and beautifulsoup4 are required for WebFetcher. "
-                "Install with: pip install data-clients[web]"
-            )
-
-        is_safe, error, resolved_ip = _validate_url(url)
+        is_safe, error, resolved_ip, parsed = await _check_url_async(url)
         if not is_safe:
             raise WebFetchError(error)
 
         try:
-            async with httpx.AsyncClient(
-                timeout=10.0,
-                follow_redirects=False,
-                max_redirects=0,
-            ) as client:
-                current_url = url
-                response = None
-                for _ in range(self.max_redirects):
-                    response = await client.get(
-                        current_url,
-                        headers={
-                            "User-Agent": "DataClients/1.0",
-                            "Host": urlparse(current_url).hostname or "",
-                        },
-                    )
-                    if response.is_redirect and response.has_redirect_location:
-                        redirect_url = (
-                            str(response.next_request.url)
-                            if response.next_request
-                            else None
-                        )
-                        if redirect_url is None:
-                            break
-                        redir_safe, redir_err, _ = _validate_url(redirect_url)
-                        if not redir_safe:
-                            raise WebFetchError(f"Redirect blocked: {redir_err}")
-                        current_url = redirect_url
-                    else:
+            client = self._get_async_client()
+            current_url = url
+            current_host = parsed.hostname
+            response = None
+            for _ in range(self.max_redirects):
+                async with client.stream(
+                    "GET",
+                    current_url,
+                    headers={
+                        "User-Agent": "DataClients/1.0",
+                        "Host": current_host,
+                    },
+                ) as response:
+                    # Only the final response's body is read, and never past the cap.
+                    if not (response.is_redirect and response.has_redirect_location):
+                        body = await _aread_capped(response, self.max_response_bytes)
+                        response = _buffered(response, body)
                         break
-
-                if response is None:
-                    raise WebFetchError("No response received")
-
-                if len(response.content) > self.max_response_bytes:
-                    raise WebFetchError(
-                        f"Response too large (>{self.max_response_bytes} bytes)"
-                    )
-
-                response.raise_for_status()
+                redirect_url = (
+                    str(response.next_request.url)
+                    if response.next_request
+                    else None
+                )
+                if redirect_url is None:
+                    break
+                redir_safe, redir_err, _, redirect_parsed = await _check_url_async(
+                    redirect_url
+                )
+                if not redir_safe:
+                    raise WebFetchError(f"Redirect blocked: {redir_err}")
+                current_url = redirect_url
+                current_host = redirect_parsed.hostname
+
+            if response is None:
+                raise WebFetchError("No response received")
+
+            response.raise_for_status()
 
             content_type = response.headers.get("content-type", "")
-            raw_text = response.text
 
             if extract_mode == "raw":
+                content = _decode_head(response, max_length)
                 return {
                     "url": str(response.url),
-                    "content": raw_text[:max_length],
-                    "content_length": len(raw_text[:max_length]),
+                    "content": content,
+                    "content_length": len(content),
                     "status_code": response.status_code,
                     "content_type": content_type,
                 }
-            elif extract_mode == "links":
-                soup = BeautifulSoup(raw_text, "html.parser")
-                links = []
-                for a_tag in soup.find_all("a", href=True):
-                    href = a_tag["href"]
-                    text = a_tag.get_text(strip=True)
-                    links.append({"href": href, "text": text[:100]})
+
+            raw_text = response.text
+            if extract_mode == "links":
+                links = _extract_links(raw_text)
                 return {
                     "url": str(response.url),
                     "links": links[:100],
@@ -170,13 +478,8 @@ class WebFetcher:
                     "status_code": response.status_code,
                 }
             else:
-                if "html" in content_type or raw_text.strip().startswith("<"):
-                    soup = BeautifulSoup(raw_text, "html.parser")
-                    for element in soup(
-                        ["script", "style", "nav", "footer", "header"]
-                    ):
-                        element.decompose()
-                    extracted = soup.get_text(separator="\n", strip=True)
+                if "html" in content_type or _MARKUP_START.match(raw_text):
+                    extracted = _extract_text(raw_text, max_length)
                 else:
                     extracted = raw_text
                 extracted = extracted[:max_length]
@@ -199,78 +502,62 @@ class WebFetcher:
         max_length: int = 5000,
     ) -> dict:
         """Synchronous fetch and extract content from a URL."""
-        try:
-            import httpx
-            from bs4 import BeautifulSoup
-        except ImportError:
-            raise ImportError(
-                "httpx and beautifulsoup4 are required for WebFetcher. "
-                "Install with: pip install data-clients[web]"
-            )
-
-        is_safe, error, resolved_ip = _validate_url(url)
+        is_safe, error, resolved_ip, parsed = _check_url(url)
         if not is_safe:
             raise WebFetchError(error)
 
         try:
-            with httpx.Client(
-                timeout=10.0,
-                follow_redirects=False,
-                max_redirects=0,
-            ) as client:
-                current_url = url
-                response = None
-                for _ in range(self.max_redirects):
-                    response = client.get(
-                        current_url,
-                        headers={
-                            "User-Agent": "DataClients/1.0",
-                            "Host": urlparse(current_url).hostname or "",
-                        },
-                    )
-                    if response.is_redirect and response.has_redirect_location:
-                        redirect_url = (
-                            str(response.next_request.url)
-                            if response.next_request
-                            else None
-                        )
-                        if redirect_url is None:
-                            break
-                        redir_safe, redir_err, _ = _validate_url(redirect_url)
-                        if not redir_safe:
-                            raise WebFetchError(f"Redirect blocked: {redir_err}")
-                        current_url = redirect_url
-                    else:
+            client = self._get_sync_client()
+            current_url = url
+            current_host = parsed.hostname
+            response = None
+            for _ in range(self.max_redirects):
+                with client.stream(
+                    "GET",
+                    current_url,
+                    headers={
+                        "User-Agent": "DataClients/1.0",
+                        "Host": current_host,
+                    },
+                ) as response:
+                    # Only the final response's body is read, and never past the cap.
+                    if not (response.is_redirect and response.has_redirect_location):
+                        body = _read_capped(response, self.max_response_bytes)
+                        response = _buffered(response, body)
                         break
-
-                if response is None:
-                    raise WebFetchError("No response received")
-
-                if len(response.content) > self.max_response_bytes:
-                    raise WebFetchError(
-                        f"Response too large (>{self.max_response_bytes} bytes)"
-                    )
-
-                response.raise_for_status()
+                redirect_url = (
+                    str(response.next_request.url)
+                    if response.next_request
+                    else None
+                )
+                if redirect_url is None:
+                    break
+                redir_safe, redir_err, _, redirect_parsed = _check_url(redirect_url)
+                if not redir_safe:
+                    raise WebFetchError(f"Redirect blocked: {redir_err}")
+                current_url = redirect_url
+                current_host = redirect_parsed.hostname
+
+            if response is None:
+                raise WebFetchError("No response received")
+
+            response.raise_for_status()
 
             content_type = response.headers.get("content-type", "")
-            raw_text = response.text
 
             if extract_mode == "raw":
+                content = _decode_head(response, max_length)
                 return {
                     "url": str(response.url),
-                    "content": raw_text[:max_length],
-                    "content_length": len(raw_text[:max_length]),
+                    "content": content,
+                    "content_length": len(content),
                     "status_code": response.status_code,
                     "content_type": content_type,
                 }
-            elif extract_mode == "links":
-                soup = BeautifulSoup(raw_text, "html.parser")
-                links = []
-                for a_tag in soup.find_all("a", href=True):
-                    href = a_tag["href"]
-                    text = a_tag.get_text(strip=True)
-                    links.append({"href": href, "text": text[:100]})
+
+            raw_text = response.text
+            if extract_mode == "links":
+                links = _extract_links(raw_text)
                 return {
                     "url": str(response.url),
                     "links": links[:100],
@@ -278,13 +565,8 @@ class WebFetcher:
                     "status_code": response.status_code,
                 }
             else:
-                if "html" in content_type or raw_text.strip().startswith("<"):
-                    soup = BeautifulSoup(raw_text, "html.parser")
-                    for element in soup(
-                        ["script", "style", "nav", "footer", "header"]
-                    ):
-                        element.decompose()
-                    extracted = soup.get_text(separator="\n", strip=True)
+                if "html" in content_type or _MARKUP_START.match(raw_text):
+                    extracted = _extract_text(raw_text, max_length)
                 else:
                     extracted = raw_text
                 extracted = extracted[:max_length]
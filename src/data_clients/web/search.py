@@ -2,89 +2,423 @@
 
 from __future__ import annotations
 
+import asyncio
+import importlib.util
+import json
 import logging
+import threading
+import time
+from collections import OrderedDict, deque
 
 from data_clients.exceptions import WebSearchError
 
+try:
+    import httpx
+except ImportError:  # reported when a BraveSearchClient is constructed
+    httpx = None
+
+try:
+    import ijson
+except ImportError:  # optional; without it the whole response is parsed
+    ijson = None
+
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+BRAVE_SEARCH_URL = "https://api.search.brave.com/res/v1/web/search"
+
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Responses declaring at most this many bytes are read whole and parsed in one
+# call; larger or undeclared ones are parsed incrementally with ijson.
+_SMALL_RESPONSE_BYTES = 64 * 1024
+
+# AIMD concurrency: searches faster than the target latency widen the window
+# additively, 429s and 5xx responses halve it.
+_TARGET_LATENCY = 1.0
+_AIMD_INCREASE = 0.5
+_AIMD_DECREASE = 0.5
+
 
 class BraveSearchClient:
     """Brave Search API client.
 
+    HTTP clients are created on first use and reused across searches so
+    repeat queries skip the TCP/TLS handshake. The async client is bound to
+    the event loop it was created on and is rebuilt if used from another.
+    Call ``close()`` / ``aclose()`` (or use the client as a context manager)
+    to release pooled connections. One instance is safe to share across
+    coroutines; concurrent searches multiplex over HTTP/2 when ``h2`` is
+    installed.
+
+    Searches are throttled before they reach the API: Brave's
+    ``X-RateLimit-*`` and ``Retry-After`` headers pause further requests
+    when the quota is nearly used up, ``requests_per_minute`` adds a sliding
+    window of your own, and async searches run under an AIMD concurrency
+    limit that grows while the API answers quickly and halves on 429 or 5xx.
+
+    Results are cached in memory per ``(query, num_results)``, with queries
+    compared case- and whitespace-insensitively, so a repeated search within
+    ``cache_ttl`` seconds makes no request at all.
+
     Args:
         api_key: Brave Search API subscription token.
+        pool_limits: Connection pool limits. Defaults to 1000 connections,
+            100 kept alive for 30 seconds.
+        requests_per_minute: Plan quota to stay under proactively (e.g. 60
+            for the free plan). None relies on the response headers alone.
+        max_concurrency: Upper bound for concurrent async searches.
+        cache_ttl: Seconds a cached result list stays valid.
+        cache_size: Maximum number of cached searches (least recently used
+            evicted). 0 disables the cache.
     """
 
-    def __init__(self, api_key: str):
+    def __init__(
+        self,
+        api_key: str,
+        pool_limits: httpx.Limits | None = None,
+        requests_per_minute: int | None = None,
+        max_concurrency: int = 16,
+        cache_ttl: float = 300.0,
+        cache_size: int = 512,
+    ):
         if not api_key:
             raise WebSearchError(
                 "Brave Search API key is required. "
                 "Pass it directly or set BRAVE_SEARCH_API_KEY in your environment."
             )
-        try:
-            import httpx  # noqa: F401
-        except ImportError:
+        if httpx is None:
             raise ImportError(
                 "httpx is required for BraveSearchClient. "
                 "Install with: pip install data-clients[web]"
             )
         self.api_key = api_key
+        self._headers = {
+            "Accept": "application/json",
+            "Accept-Encoding": "gzip",
+            "X-Subscription-Token": api_key,
+        }
+        self._pool_limits = pool_limits or httpx.Limits(
+            max_connections=1000, max_keepalive_connections=100, keepalive_expiry=30.0
+        )
+        self._sync_client: httpx.Client | None = None
+        self._async_client: httpx.AsyncClient | None = None
+        self._async_client_loop: asyncio.AbstractEventLoop | None = None
+        self._limiter = _RateLimiter(requests_per_minute)
+        self._concurrency = _Concurrency(max_concurrency)
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        # (normalized query, num_results) -> (expiry on the monotonic clock, results)
+        self._cache: OrderedDict[tuple[str, int], tuple[float, list[dict]]] = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    def _client_options(self) -> dict:
+        return {
+            "timeout": 10.0,
+            "headers": self._headers,
+            "limits": self._pool_limits,
+            "http2": _HTTP2_AVAILABLE,
+        }
+
+    def _get_sync_client(self) -> httpx.Client:
+        if self._sync_client is None or self._sync_client.is_closed:
+            self._sync_client = httpx.Client(**self._client_options())
+        return self._sync_client
+
+    def _get_async_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        client = self._async_client
+        if client is None or client.is_closed or self._async_client_loop is not loop:
+            self._async_client = httpx.AsyncClient(**self._client_options())
+            self._async_client_loop = loop
+        return self._async_client
+
+    def close(self) -> None:
+        """Close the pooled sync client."""
+        if self._sync_client is not None:
+            self._sync_client.close()
+            self._sync_client = None
+
+    async def aclose(self) -> None:
+        """Close the pooled async and sync clients."""
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+            self._async_client_loop = None
+        self.close()
+
+    def __enter__(self) -> BraveSearchClient:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    async def __aenter__(self) -> BraveSearchClient:
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    def _cached(self, key: tuple[str, int]) -> list[dict] | None:
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            expires, results = entry
+            if time.monotonic() >= expires:
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+            return [dict(r) for r in results]
+
+    def _store(self, key: tuple[str, int], results: list[dict]) -> list[dict]:
+        if self.cache_size > 0:
+            with self._cache_lock:
+                self._cache[key] = (
+                    time.monotonic() + self.cache_ttl,
+                    [dict(r) for r in results],
+                )
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return results
+
+    def clear_cache(self) -> None:
+        """Drop all cached search results."""
+        with self._cache_lock:
+            self._cache.clear()
 
     async def search(self, query: str, num_results: int = 5) -> list[dict]:
         """Async web search via Brave Search API."""
-        import httpx
+        key = _cache_key(query, num_results)
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+        return self._store(key, await self._search(query, num_results))
 
-        try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(
-                    "https://api.search.brave.com/res/v1/web/search",
-                    params={"q": query, "count": num_results},
-                    headers={
-                        "Accept": "application/json",
-                        "Accept-Encoding": "gzip",
-                        "X-Subscription-Token": self.api_key,
-                    },
-                )
-                response.raise_for_status()
-                data = response.json()
-
-            results = []
-            for item in data.get("web", {}).get("results", [])[:num_results]:
-                results.append({
-                    "title": item.get("title", ""),
-                    "url": item.get("url", ""),
-                    "description": item.get("description", ""),
-                })
-            return results
-        except Exception as e:
-            raise WebSearchError(f"Web search failed: {e}") from e
+    async def _search(self, query: str, num_results: int) -> list[dict]:
+        async with self._concurrency:
+            await self._limiter.wait()
+            start = time.monotonic()
+            status = None
+            try:
+                client = self._get_async_client()
+                params = {"q": query, "count": num_results}
+                async with client.stream("GET", BRAVE_SEARCH_URL, params=params) as response:
+                    status = response.status_code
+                    self._limiter.update(response.headers)
+                    response.raise_for_status()
+                    if _read_whole(response):
+                        body = await response.aread()
+                        return _parse_results(_loads(body), num_results)
+                    parser = _ResultStream(num_results)
+                    async for chunk in response.aiter_bytes():
+                        if parser.feed(chunk):
+                            break
+                    return parser.results()
+            except Exception as e:
+                raise WebSearchError(f"Web search failed: {e}") from e
+            finally:
+                self._concurrency.record(status, time.monotonic() - start)
 
     def search_sync(self, query: str, num_results: int = 5) -> list[dict]:
         """Synchronous web search via Brave Search API."""
-        import httpx
+        key = _cache_key(query, num_results)
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+        return self._store(key, self._search_sync(query, num_results))
 
+    def _search_sync(self, query: str, num_results: int) -> list[dict]:
+        self._limiter.wait_sync()
         try:
-            with httpx.Client(timeout=10.0) as client:
-                response = client.get(
-                    "https://api.search.brave.com/res/v1/web/search",
-                    params={"q": query, "count": num_results},
-                    headers={
-                        "Accept": "application/json",
-                        "Accept-Encoding": "gzip",
-                        "X-Subscription-Token": self.api_key,
-                    },
-                )
+            client = self._get_sync_client()
+            params = {"q": query, "count": num_results}
+            with client.stream("GET", BRAVE_SEARCH_URL, params=params) as response:
+                self._limiter.update(response.headers)
                 response.raise_for_status()
-                data = response.json()
-
-            results = []
-            for item in data.get("web", {}).get("results", [])[:num_results]:
-                results.append({
-                    "title": item.get("title", ""),
-                    "url": item.get("url", ""),
-                    "description": item.get("description", ""),
-                })
-            return results
+                if _read_whole(response):
+                    body = response.read()
+                    return _parse_results(_loads(body), num_results)
+                parser = _ResultStream(num_results)
+                for chunk in response.iter_bytes():
+                    if parser.feed(chunk):
+                        break
+                return parser.results()
         except Exception as e:
             raise WebSearchError(f"Web search failed: {e}") from e
+
+
+def _cache_key(query: str, num_results: int) -> tuple[str, int]:
+    return " ".join(query.split()).lower(), num_results
+
+
+def _read_whole(response: httpx.Response) -> bool:
+    """Whether to parse the body in one go rather than streaming it through ijson."""
+    if ijson is None:
+        return True
+    declared = response.headers.get("Content-Length", "")
+    return declared.isdigit() and int(declared) <= _SMALL_RESPONSE_BYTES
+
+
+def _loads(body: bytes) -> dict:
+    return orjson.loads(body) if orjson is not None else json.loads(body)
+
+
+def _parse_results(data: dict, num_results: int) -> list[dict]:
+    """Title, URL and description of the first ``num_results`` web results."""
+    return [_result(item) for item in data.get("web", {}).get("results", [])[:num_results]]
+
+
+def _result(item: dict) -> dict:
+    return {
+        "title": item.get("title", ""),
+        "url": item.get("url", ""),
+        "description": item.get("description", ""),
+    }
+
+
+class _ResultStream:
+    """Incremental ``ijson`` parse of ``web.results`` items from body chunks.
+
+    Only the result items are materialized, and the caller can stop reading
+    the body once ``num_results`` of them have arrived.
+    """
+
+    def __init__(self, num_results: int):
+        self.num_results = num_results
+        self._found: list[dict] = []
+        self._items = ijson.sendable_list()
+        self._parser = ijson.items_coro(self._items, "web.results.item")
+        self._done = False
+
+    def feed(self, chunk: bytes) -> bool:
+        """Parse one chunk; return True once enough results have been seen."""
+        self._parser.send(chunk)
+        self._found.extend(_result(item) for item in self._items)
+        del self._items[:]
+        self._done = len(self._found) >= self.num_results
+        return self._done
+
+    def results(self) -> list[dict]:
+        if not self._done:
+            self._parser.close()  # end of body: flush and check the JSON is complete
+            self._found.extend(_result(item) for item in self._items)
+        return self._found[: self.num_results]
+
+
+class _RateLimiter:
+    """Client-side throttle shared by sync and async searches.
+
+    Two levels: a proactive sliding window of request timestamps capped at
+    ``requests_per_minute``, and a reactive pause set from the rate-limit
+    headers of each response. The lock only guards bookkeeping; callers
+    sleep outside it and try again.
+    """
+
+    def __init__(self, requests_per_minute: int | None = None):
+        self.requests_per_minute = requests_per_minute
+        self._sent: deque[float] = deque()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Claim a request slot and return 0, or return how long to wait first."""
+        with self._lock:
+            now = time.monotonic()
+            if self._paused_until > now:
+                return self._paused_until - now
+            if self.requests_per_minute:
+                while self._sent and now - self._sent[0] >= 60.0:
+                    self._sent.popleft()
+                if len(self._sent) >= self.requests_per_minute:
+                    return 60.0 - (now - self._sent[0])
+                self._sent.append(now)
+            return 0.0
+
+    def wait_sync(self) -> None:
+        while (delay := self._reserve()) > 0:
+            time.sleep(delay)
+
+    async def wait(self) -> None:
+        while (delay := self._reserve()) > 0:
+            await asyncio.sleep(delay)
+
+    def update(self, headers: httpx.Headers) -> None:
+        """Pause further requests if the response says the quota is (nearly) spent.
+
+        Brave sends comma-separated per-window values, shortest window first;
+        only the first one matters for pacing.
+        """
+        retry_after = _first_number(headers.get("Retry-After"))
+        if retry_after is None:
+            limit = _first_number(headers.get("X-RateLimit-Limit"))
+            remaining = _first_number(headers.get("X-RateLimit-Remaining"))
+            if remaining is None or limit is None:
+                return
+            if remaining > 2 and remaining >= 0.1 * limit:
+                return
+            retry_after = _first_number(headers.get("X-RateLimit-Reset"))
+            if retry_after is None:
+                return
+        if retry_after > 0:
+            logger.debug(f"Brave Search quota nearly spent; pausing {retry_after:.1f}s")
+            with self._lock:
+                self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+
+
+def _first_number(value: str | None) -> float | None:
+    if not value:
+        return None
+    try:
+        return float(value.split(",")[0])
+    except ValueError:
+        return None
+
+
+class _Concurrency:
+    """AIMD limit on in-flight async searches (``async with`` to hold a slot).
+
+    ``record`` adds ``_AIMD_INCREASE`` to the limit after a successful search
+    under ``_TARGET_LATENCY`` and multiplies it by ``_AIMD_DECREASE`` after a
+    429 or 5xx, keeping it between 1 and ``maximum``. The condition is bound
+    to the event loop it was created on and is rebuilt for a new loop.
+    """
+
+    def __init__(self, maximum: int, initial: int = 4):
+        self.maximum = maximum
+        self.limit = float(min(initial, maximum))
+        self._in_flight = 0
+        self._condition: asyncio.Condition | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def _get_condition(self) -> asyncio.Condition:
+        loop = asyncio.get_running_loop()
+        if self._condition is None or self._loop is not loop:
+            self._condition = asyncio.Condition()
+            self._loop = loop
+            self._in_flight = 0
+        return self._condition
+
+    async def __aenter__(self) -> None:
+        condition = self._get_condition()
+        async with condition:
+            await condition.wait_for(lambda: self._in_flight < int(self.limit))
+            self._in_flight += 1
+
+    async def __aexit__(self, *exc_info) -> None:
+        condition = self._get_condition()
+        async with condition:
+            self._in_flight -= 1
+            condition.notify_all()
+
+    def record(self, status: int | None, latency: float) -> None:
+        """Adjust the limit from one search's status code and latency."""
+        if status is not None and (status == 429 or status >= 500):
+            self.limit = max(1.0, self.limit * _AIMD_DECREASE)
+        elif status is not None and status < 300 and latency <= _TARGET_LATENCY:
+            self.limit = min(float(self.maximum), self.limit + _AIMD_INCREASE)
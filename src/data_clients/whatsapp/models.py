@@ -5,7 +5,7 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 
 
-@dataclass
+@dataclass(slots=True)
 class ParsedMessage:
     """A single parsed WhatsApp message from ChatStorage.sqlite."""
 
@@ -20,7 +20,7 @@ class ParsedMessage:
     account_id: str
 
 
-@dataclass
+@dataclass(slots=True)
 class Conversation:
     """A WhatsApp chat session from ChatStorage.sqlite."""
 
@@ -2,9 +2,14 @@
 
 from __future__ import annotations
 
+import asyncio
+import functools
 import logging
+import os
 import sqlite3
-from datetime import datetime, timedelta
+import threading
+import time
+from datetime import datetime
 from pathlib import Path
 
 from data_clients.exceptions import WhatsAppAccountNotFoundError, WhatsAppReadError
@@ -31,9 +36,76 @@ WHATSAPP_MOBILE_DOCUMENTS = (
 # Core Data epoch (2001-01-01) — same offset as iMessage
 APPLE_EPOCH_OFFSET = 978307200
 
+# 2100-01-01: message dates between the Unix epoch and this convert unchecked
+_MAX_UNIX_TS = 4102444800.0
+
+# How many directory levels below WHATSAPP_MOBILE_DOCUMENTS to search
+_MOBILE_DOCUMENTS_DEPTH = 3
+
 # WhatsApp "status" session type — not a real chat
 _STATUS_SESSION_TYPE = 3
 
+# Applied to every cached connection: never write, memory-map up to 1 GiB of
+# the database and keep up to 64 MiB of pages in SQLite's own cache.
+_CONNECTION_PRAGMAS = (
+    "PRAGMA query_only = ON",
+    "PRAGMA mmap_size = 1073741824",
+    "PRAGMA cache_size = -65536",
+    "PRAGMA temp_store = MEMORY",
+)
+
+# Fixed query texts, built once so SQLite's per-connection statement cache
+# (keyed on the SQL text) reuses the compiled statements across calls.
+# A correlated MAX per session lets SQLite seek the ZCHATSESSION index for
+# each chat instead of joining and grouping every recent message.
+_CONVERSATIONS_SQL = """
+    SELECT
+        s.Z_PK          AS session_pk,
+        s.ZPARTNERNAME  AS partner_name,
+        s.ZSESSIONTYPE  AS session_type,
+        s.ZCONTACTJID   AS contact_jid,
+        (
+            SELECT MAX(m.ZMESSAGEDATE)
+            FROM ZWAMESSAGE m
+            WHERE m.ZCHATSESSION = s.Z_PK
+              AND m.ZMESSAGEDATE > ?
+        ) AS latest_date
+    FROM ZWACHATSESSION s
+    WHERE s.ZSESSIONTYPE != ?
+      AND latest_date IS NOT NULL{exclusions}
+    ORDER BY latest_date DESC
+    LIMIT ?
+"""
+
+# NULLs are coalesced in SQL so message rows map to dicts without fix-ups.
+_MESSAGES_SQL = """
+    SELECT
+        m.Z_PK                          AS row_pk,
+        COALESCE(m.ZTEXT, '')           AS text,
+        m.ZMESSAGEDATE                  AS msg_date,
+        COALESCE(m.ZISFROMME, 0) != 0   AS is_from_me,
+        COALESCE(m.ZFROMJID, '')        AS from_jid,
+        COALESCE(m.ZMESSAGETYPE, 0)     AS message_type,
+        COALESCE(m.ZPUSHNAME, '')       AS push_name
+    FROM ZWAMESSAGE m
+    WHERE m.ZCHATSESSION = ?
+      AND m.ZMESSAGEDATE > ?
+    ORDER BY m.ZMESSAGEDATE ASC
+    LIMIT ?
+"""
+
+_SESSION_PK_SQL = "SELECT Z_PK FROM ZWACHATSESSION WHERE ZCONTACTJID = ?"
+
+
+@functools.lru_cache(maxsize=64)
+def _conversations_sql(lower_functions: tuple[str, ...]) -> str:
+    """Conversations query with one exclusion condition per lowercasing function."""
+    exclusions = "".join(
+        f"\n      AND instr({lower}(COALESCE(s.ZPARTNERNAME, '')), ?) = 0"
+        for lower in lower_functions
+    )
+    return _CONVERSATIONS_SQL.format(exclusions=exclusions)
+
 
 def _find_db_paths() -> list[Path]:
     """Auto-discover ChatStorage.sqlite locations on this Mac."""
@@ -44,26 +116,99 @@ def _find_db_paths() -> list[Path]:
         paths.append(WHATSAPP_GROUP_CONTAINER)
 
     # Fallback: iCloud Mobile Documents (older installs)
-    if WHATSAPP_MOBILE_DOCUMENTS.exists():
-        for account_dir in WHATSAPP_MOBILE_DOCUMENTS.glob("**/ChatStorage.sqlite"):
-            if account_dir not in paths:
-                paths.append(account_dir)
+    for db_path in _scan_for_chat_storage(str(WHATSAPP_MOBILE_DOCUMENTS), _MOBILE_DOCUMENTS_DEPTH):
+        if db_path not in paths:
+            paths.append(db_path)
 
     return paths
 
 
+def _scan_for_chat_storage(root: str, depth: int) -> list[Path]:
+    """ChatStorage.sqlite files at most ``depth`` directories below ``root``.
+
+    A bounded ``os.scandir`` walk: the databases sit one or two levels deep,
+    so there is no need to recurse through the whole iCloud container.
+    """
+    found: list[Path] = []
+    try:
+        entries = list(os.scandir(root))
+    except OSError:
+        return found
+    for entry in entries:
+        try:
+            if entry.name == "ChatStorage.sqlite" and entry.is_file():
+                found.append(Path(entry.path))
+            elif depth > 0 and entry.is_dir(follow_symlinks=False):
+                found.extend(_scan_for_chat_storage(entry.path, depth - 1))
+        except OSError:
+            continue
+    return found
+
+
+def _unix_ts_to_iso_checked(unix_ts: float) -> str:
+    """ISO string for an out-of-range timestamp, or "" if the platform rejects it."""
+    try:
+        return datetime.fromtimestamp(unix_ts).isoformat()
+    except (OSError, ValueError, OverflowError):
+        return ""
+
+
+def _casefold(value: str | None) -> str:
+    """SQL function: Unicode ``str.casefold()`` (SQLite's LOWER() is ASCII-only)."""
+    return value.casefold() if value else ""
+
+
 class WhatsAppDBReader:
-    """Read-only access to WhatsApp ChatStorage.sqlite on macOS."""
+    """Read-only access to WhatsApp ChatStorage.sqlite on macOS.
+
+    One read-only connection per database file and thread is opened on first
+    use and reused by later fetches, so repeat calls skip reopening the file
+    and keep its pages mapped, and threads read concurrently instead of
+    queueing on a shared connection. Connections run in autocommit mode, so
+    every query sees the latest data WhatsApp has written. Call ``close()``
+    (or use the reader as a context manager) to release them.
+    """
 
     def __init__(self, db_path: Path | None = None):
         self.db_path = db_path
+        # Per-thread {db_path: connection}; _open_conns tracks them all for close()
+        self._local = threading.local()
+        self._open_conns: list[sqlite3.Connection] = []
+        self._conns_lock = threading.Lock()
+        self._generation = 0
+        # (db_path it was resolved for, resolved path)
+        self._resolved_db_path: tuple[Path | None, Path] | None = None
+        # ZCONTACTJID -> ZWACHATSESSION.Z_PK in the resolved database
+        self._session_pk_cache: dict[str, int] = {}
+
+    def close(self) -> None:
+        """Close all cached database connections, in every thread."""
+        with self._conns_lock:
+            conns, self._open_conns = self._open_conns, []
+            self._generation += 1  # threads drop their stale per-thread caches
+        for conn in conns:
+            conn.close()
+
+    def __enter__(self) -> WhatsAppDBReader:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
 
     # ------------------------------------------------------------------
     # Public API
     # ------------------------------------------------------------------
 
     def _resolve_db_path(self) -> Path:
-        """Find the ChatStorage.sqlite to use."""
+        """Find the ChatStorage.sqlite to use (memoized until ``db_path`` changes)."""
+        if self._resolved_db_path is not None and self._resolved_db_path[0] == self.db_path:
+            return self._resolved_db_path[1]
+        resolved = self._find_db_path()
+        self._resolved_db_path = (self.db_path, resolved)
+        self._session_pk_cache.clear()
+        return resolved
+
+    def _find_db_path(self) -> Path:
         if self.db_path:
             if not self.db_path.exists():
                 raise WhatsAppReadError(
@@ -105,66 +250,53 @@ class WhatsAppDBReader:
         db_path = self._resolve_db_path()
         account_id = db_path.parent.name
         conn = self._connect(db_path)
-        try:
-            since_apple = self._datetime_to_apple_ts(
-                datetime.now() - timedelta(days=days)
-            )
-            rows = conn.execute(
-                """
-                SELECT
-                    s.Z_PK          AS session_pk,
-                    s.ZPARTNERNAME  AS partner_name,
-                    s.ZSESSIONTYPE  AS session_type,
-                    s.ZCONTACTJID   AS contact_jid,
-                    MAX(m.ZMESSAGEDATE) AS latest_date
-                FROM ZWACHATSESSION s
-                JOIN ZWAMESSAGE m ON m.ZCHATSESSION = s.Z_PK
-                WHERE m.ZMESSAGEDATE > ?
-                  AND s.ZSESSIONTYPE != ?
-                GROUP BY s.Z_PK
-                ORDER BY latest_date DESC
-                LIMIT ?
-                """,
-                (since_apple, _STATUS_SESSION_TYPE, limit),
-            ).fetchall()
+        since_apple = self._apple_ts_since(days)
+        params: list = [since_apple, _STATUS_SESSION_TYPE]
+        # Filter excluded contacts in SQL so LIMIT counts only kept sessions.
+        # ASCII exclusions use SQLite's LOWER(); others are casefolded in
+        # Python on both sides, so e.g. "STRAẞE" also excludes "Straße".
+        lower_functions = []
+        for exc in excluded_contacts or []:
+            if exc.isascii():
+                lower_functions.append("LOWER")
+                params.append(exc.lower())
+            else:
+                lower_functions.append("casefold")
+                params.append(exc.casefold())
+        params.append(limit)
+        rows = conn.execute(_conversations_sql(tuple(lower_functions)), params).fetchall()
+
+        participants_by_pk = self._get_group_participants(
+            conn, [session_pk for session_pk, _, session_type, _, _ in rows if session_type == 1]
+        )
+
+        to_iso = self._apple_ts_to_iso
+        conversations = []
+        for session_pk, partner_name, session_type, contact_jid, latest_date in rows:
+            partner_name = partner_name or ""
+            contact_jid = contact_jid or ""
+            if contact_jid:
+                # Lets a following fetch_messages skip the JID lookup query
+                self._session_pk_cache.setdefault(contact_jid, session_pk)
+            session_type = session_type or 0
+            is_group = session_type == 1
+            # Use ZCONTACTJID as stable identifier (survives renames)
+            chat_guid = f"whatsapp:{contact_jid}" if contact_jid else f"whatsapp:pk:{session_pk}"
+
+            participant_ids = participants_by_pk.get(session_pk, []) if is_group else []
+
+            conversations.append({
+                "chat_guid": chat_guid,
+                "chat_identifier": contact_jid or partner_name,
+                "display_name": partner_name,
+                "is_group": is_group,
+                "session_type": session_type,
+                "account_id": account_id,
+                "participant_ids": participant_ids,
+                "last_message_date": to_iso(latest_date),
+            })
 
-            conversations = []
-            for row in rows:
-                partner_name = row["partner_name"] or ""
-
-                if excluded_contacts and any(
-                    exc.lower() in partner_name.lower()
-                    for exc in excluded_contacts
-                ):
-                    continue
-
-                session_pk = row["session_pk"]
-                contact_jid = row["contact_jid"] or ""
-                session_type = row["session_type"] or 0
-                is_group = session_type == 1
-                # Use ZCONTACTJID as stable identifier (survives renames)
-                chat_guid = f"whatsapp:{contact_jid}" if contact_jid else f"whatsapp:pk:{session_pk}"
-
-                participant_ids = []
-                if is_group:
-                    participant_ids = self._get_group_participants(
-                        conn, session_pk
-                    )
-
-                conversations.append({
-                    "chat_guid": chat_guid,
-                    "chat_identifier": contact_jid or partner_name,
-                    "display_name": partner_name,
-                    "is_group": is_group,
-                    "session_type": session_type,
-                    "account_id": account_id,
-                    "participant_ids": participant_ids,
-                    "last_message_date": self._apple_ts_to_iso(row["latest_date"]),
-                })
-
-            return conversations
-        finally:
-            conn.close()
+        return conversations
 
     def fetch_messages(
         self,
@@ -180,67 +312,82 @@ class WhatsAppDBReader:
         db_path = self._resolve_db_path()
         account_id = db_path.parent.name
         conn = self._connect(db_path)
-        try:
-            # Resolve to session PK
-            session_pk = self._resolve_session_pk(conn, jid_or_pk)
-
-            since_apple = self._datetime_to_apple_ts(
-                datetime.now() - timedelta(days=days)
-            )
-            rows = conn.execute(
-                """
-                SELECT
-                    m.Z_PK          AS row_pk,
-                    m.ZTEXT         AS text,
-                    m.ZMESSAGEDATE  AS msg_date,
-                    m.ZISFROMME     AS is_from_me,
-                    m.ZFROMJID      AS from_jid,
-                    m.ZTOJID        AS to_jid,
-                    m.ZMESSAGETYPE  AS message_type,
-                    m.ZPUSHNAME     AS push_name
-                FROM ZWAMESSAGE m
-                WHERE m.ZCHATSESSION = ?
-                  AND m.ZMESSAGEDATE > ?
-                ORDER BY m.ZMESSAGEDATE ASC
-                LIMIT ?
-                """,
-                (session_pk, since_apple, limit),
-            ).fetchall()
-        finally:
-            conn.close()
-
-        messages = []
-        for row in rows:
-            msg_guid = f"{account_id}:{row['row_pk']}"
-            is_from_me = bool(row["is_from_me"])
-            sender_id = "me" if is_from_me else (row["from_jid"] or "")
-            message_type = row["message_type"] or 0
-            messages.append({
-                "message_guid": msg_guid,
-                "sender_id": sender_id,
-                "sender_is_me": is_from_me,
-                "sender_push_name": row["push_name"] or "",
-                "text": row["text"] or "",
-                "date": self._apple_ts_to_iso(row["msg_date"]),
+        # Resolve to session PK
+        session_pk = self._resolve_session_pk(conn, jid_or_pk)
+
+        since_apple = self._apple_ts_since(days)
+        rows = conn.execute(_MESSAGES_SQL, (session_pk, since_apple, limit)).fetchall()
+
+        to_iso = self._apple_ts_to_iso
+        return [
+            {
+                "message_guid": f"{account_id}:{row_pk}",
+                "sender_id": "me" if is_from_me else from_jid,
+                "sender_is_me": is_from_me == 1,
+                "sender_push_name": push_name,
+                "text": text,
+                "date": to_iso(msg_date),
                 "message_type": message_type,
                 "has_media": message_type != 0,
                 "account_id": account_id,
-            })
-        return messages
+            }
+            for row_pk, text, msg_date, is_from_me, from_jid, message_type, push_name in rows
+        ]
+
+    async def fetch_all_messages(
+        self,
+        chat_guids: list[str],
+        days: int = 1,
+        limit: int = 500,
+        concurrency: int = 8,
+    ) -> dict[str, list[dict]]:
+        """Fetch messages for many conversations concurrently.
+
+        Each ``fetch_messages`` call runs in a worker thread with its own
+        read-only connection, at most ``concurrency`` at a time.
+
+        Returns:
+            Mapping of chat_guid to its messages, in ``chat_guids`` order.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch_one(chat_guid: str) -> tuple[str, list[dict]]:
+            async with semaphore:
+                return chat_guid, await asyncio.to_thread(
+                    self.fetch_messages, chat_guid, days, limit
+                )
+
+        return dict(await asyncio.gather(*(fetch_one(g) for g in chat_guids)))
 
     # ------------------------------------------------------------------
     # Private helpers
     # ------------------------------------------------------------------
 
     def _connect(self, db_path: Path) -> sqlite3.Connection:
+        """Return the cached read-only connection for ``db_path``, opening it if needed.
+
+        Rows come back as plain tuples and are unpacked positionally, in the
+        column order of each query.
+        """
+        conns = self._thread_conns()
+        conn = conns.get(db_path)
+        if conn is not None:
+            return conn
         if not db_path.exists():
             raise WhatsAppReadError(
                 f"ChatStorage.sqlite not found at {db_path}."
             )
         try:
             uri = f"file:{db_path}?mode=ro"
-            conn = sqlite3.connect(uri, uri=True)
-            conn.row_factory = sqlite3.Row
+            conn = sqlite3.connect(
+                uri, uri=True, check_same_thread=False, isolation_level=None
+            )
+            conn.create_function("casefold", 1, _casefold, deterministic=True)
+            for pragma in _CONNECTION_PRAGMAS:
+                conn.execute(pragma)
+            conns[db_path] = conn
+            with self._conns_lock:
+                self._open_conns.append(conn)
             return conn
         except (sqlite3.OperationalError, sqlite3.DatabaseError) as e:
             err = str(e).lower()
@@ -254,46 +401,70 @@ class WhatsAppDBReader:
                 f"Failed to open ChatStorage.sqlite: {e}"
             ) from e
 
+    def _thread_conns(self) -> dict[Path, sqlite3.Connection]:
+        """This thread's connection cache, reset after ``close()``."""
+        local = self._local
+        if getattr(local, "generation", None) != self._generation:
+            local.conns = {}
+            local.generation = self._generation
+        return local.conns
+
     def _resolve_session_pk(self, conn: sqlite3.Connection, jid_or_pk: str) -> int:
         """Resolve a JID or raw PK string to a ZWACHATSESSION.Z_PK."""
         if jid_or_pk.startswith("pk:"):
             return int(jid_or_pk[3:])
+        session_pk = self._session_pk_cache.get(jid_or_pk)
+        if session_pk is not None:
+            return session_pk
         # Look up by ZCONTACTJID
-        row = conn.execute(
-            "SELECT Z_PK FROM ZWACHATSESSION WHERE ZCONTACTJID = ?",
-            (jid_or_pk,),
-        ).fetchone()
+        row = conn.execute(_SESSION_PK_SQL, (jid_or_pk,)).fetchone()
         if not row:
             raise WhatsAppReadError(
                 f"No WhatsApp session found for JID '{jid_or_pk}'."
             )
-        return row["Z_PK"]
+        self._session_pk_cache[jid_or_pk] = row[0]
+        return row[0]
 
     def _get_group_participants(
-        self, conn: sqlite3.Connection, session_pk: int
-    ) -> list[str]:
+        self, conn: sqlite3.Connection, session_pks: list[int]
+    ) -> dict[int, list[str]]:
+        """Member JIDs of each group session, fetched in a single query."""
+        if not session_pks:
+            return {}
+        placeholders = ",".join("?" * len(session_pks))
         try:
             rows = conn.execute(
-                "SELECT ZMEMBERJID FROM ZWAGROUPMEMBER WHERE ZCHATSESSION = ?",
-                (session_pk,),
+                "SELECT ZCHATSESSION AS pk, ZMEMBERJID AS jid FROM ZWAGROUPMEMBER "
+                f"WHERE ZCHATSESSION IN ({placeholders}) AND ZMEMBERJID IS NOT NULL",
+                session_pks,
             ).fetchall()
-            return [r["ZMEMBERJID"] for r in rows if r["ZMEMBERJID"]]
         except sqlite3.OperationalError:
-            return []
+            return {}
+        by_pk: dict[int, list[str]] = {}
+        for pk, jid in rows:
+            if jid:
+                by_pk.setdefault(pk, []).append(jid)
+        return by_pk
 
     @staticmethod
     def _apple_ts_to_iso(apple_ts: float | int | None) -> str:
-        if apple_ts is None or apple_ts == 0:
+        if not apple_ts:
             return ""
-        try:
-            unix_ts = float(apple_ts) + APPLE_EPOCH_OFFSET
+        unix_ts = apple_ts + APPLE_EPOCH_OFFSET
+        # Range check first so well-formed dates never reach the error handling
+        if 0.0 <= unix_ts < _MAX_UNIX_TS:
             return datetime.fromtimestamp(unix_ts).isoformat()
-        except (OSError, ValueError, OverflowError):
-            return ""
+        return _unix_ts_to_iso_checked(unix_ts)
 
     @staticmethod
-    def _datetime_to_apple_ts(dt: datetime) -> float:
-        return dt.timestamp() - APPLE_EPOCH_OFFSET
+    def _apple_ts_since(days: int) -> int:
+        """Apple timestamp for ``days`` ago, for ``ZMESSAGEDATE > ?`` cutoffs.
+
+        Works from ``time.time()`` directly rather than building a datetime
+        and round-tripping it through ``.timestamp()``. Whole seconds are
+        plenty for a day-granular window and bind as a plain integer.
+        """
+        return int(time.time() - days * 86400 - APPLE_EPOCH_OFFSET)
 
     @staticmethod
     def _parse_chat_guid(chat_guid: str) -> str:
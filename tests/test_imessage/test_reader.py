@@ -1,100 +1,135 @@
 """Tests for iMessage reader."""
 
+import shutil
 import sqlite3
 import tempfile
-from datetime import datetime
+import time
+from contextlib import closing
 from pathlib import Path
-from unittest.mock import patch
 
 import pytest
 
-from data_clients.imessage.reader import ChatDBReader, APPLE_EPOCH_OFFSET
+from data_clients.imessage.reader import ChatDBReader, APPLE_EPOCH_OFFSET, _RECENT_MESSAGES_SQL
 from data_clients.exceptions import IMessageReadError
 
 
-@pytest.fixture
-def chat_db(tmp_path):
-    """Create a minimal chat.db for testing."""
-    db_path = tmp_path / "chat.db"
-    conn = sqlite3.connect(str(db_path))
-    conn.execute("""
-        CREATE TABLE message (
-            ROWID INTEGER PRIMARY KEY,
-            guid TEXT,
-            text TEXT,
-            date INTEGER,
-            is_from_me INTEGER DEFAULT 0,
-            is_read INTEGER DEFAULT 0,
-            service TEXT,
-            cache_has_attachments INTEGER DEFAULT 0,
-            associated_message_type INTEGER DEFAULT 0,
-            associated_message_guid TEXT,
-            thread_originator_guid TEXT,
-            handle_id INTEGER
-        )
-    """)
-    conn.execute("""
-        CREATE TABLE handle (
-            ROWID INTEGER PRIMARY KEY,
-            id TEXT
-        )
-    """)
-    conn.execute("""
-        CREATE TABLE chat (
-            ROWID INTEGER PRIMARY KEY,
-            guid TEXT,
-            chat_identifier TEXT,
-            display_name TEXT,
-            service_name TEXT
-        )
-    """)
-    conn.execute("""
-        CREATE TABLE chat_message_join (
-            chat_id INTEGER,
-            message_id INTEGER
-        )
-    """)
-    conn.execute("""
-        CREATE TABLE chat_handle_join (
-            chat_id INTEGER,
-            handle_id INTEGER
-        )
-    """)
+# Date of the seeded message: "now" as of module import, fixed for the run
+APPLE_TS_SEED = int(time.time() - APPLE_EPOCH_OFFSET)
+
+# Schema and seed rows for the test chat.db, run as one transaction.
+# {apple_ts} is filled in with APPLE_TS_SEED when the fixture runs.
+SCHEMA_SQL = """
+    BEGIN;
+    CREATE TABLE message (
+        ROWID INTEGER PRIMARY KEY,
+        guid TEXT,
+        text TEXT,
+        date INTEGER,
+        is_from_me INTEGER DEFAULT 0,
+        is_read INTEGER DEFAULT 0,
+        service TEXT,
+        cache_has_attachments INTEGER DEFAULT 0,
+        associated_message_type INTEGER DEFAULT 0,
+        associated_message_guid TEXT,
+        thread_originator_guid TEXT,
+        handle_id INTEGER,
+        attributedBody BLOB
+    );
+    CREATE TABLE handle (
+        ROWID INTEGER PRIMARY KEY,
+        id TEXT
+    );
+    CREATE TABLE chat (
+        ROWID INTEGER PRIMARY KEY,
+        guid TEXT,
+        chat_identifier TEXT,
+        display_name TEXT,
+        service_name TEXT
+    );
+    -- Join tables are keyed on both columns, as in the real chat.db; the
+    -- composite key doubles as the (chat_id, message_id) index
+    CREATE TABLE chat_message_join (
+        chat_id INTEGER,
+        message_id INTEGER,
+        PRIMARY KEY (chat_id, message_id)
+    ) WITHOUT ROWID;
+    CREATE TABLE chat_handle_join (
+        chat_id INTEGER,
+        handle_id INTEGER,
+        PRIMARY KEY (chat_id, handle_id)
+    ) WITHOUT ROWID;
+    -- Index matching the one macOS ships, so query plans resemble production
+    CREATE INDEX IF NOT EXISTS msg_date ON message(date);
+    INSERT INTO handle VALUES (1, '+15551234567');
+    INSERT INTO chat VALUES (1, 'iMessage;+15551234567', '+15551234567', '', 'iMessage');
+    INSERT INTO message VALUES
+        (1, 'msg-guid-1', 'Hello!', {apple_ts}, 0, 1, 'iMessage', 0, 0, '', '', 1, NULL);
+    INSERT INTO chat_message_join VALUES (1, 1);
+    INSERT INTO chat_handle_join VALUES (1, 1);
+    COMMIT;
+"""
+
+
+# RAM-backed directory for the test databases when the OS provides one
+SHM_DIR = Path("/dev/shm")
+
+
+@pytest.fixture(scope="session")
+def db_dir(tmp_path_factory):
+    """Directory for test databases: tmpfs (/dev/shm) if available, else pytest's tmp."""
+    if not SHM_DIR.is_dir():
+        yield tmp_path_factory.mktemp("imessage")
+        return
+    with tempfile.TemporaryDirectory(dir=SHM_DIR, prefix="imessage-") as path:
+        yield Path(path)
+
+
+@pytest.fixture(scope="session")
+def chat_db_template(db_dir):
+    """Build a minimal chat.db once per session.
+
+    Tests that only read can use it directly; tests that modify the
+    database use ``chat_db``, a per-test copy.
+    """
+    db_path = db_dir / "chat.db"
+    # closing() because sqlite3's own context manager only commits
+    with closing(sqlite3.connect(str(db_path))) as conn:
+        # Throwaway test data: skip the on-disk journal and fsyncs while seeding
+        conn.execute("PRAGMA journal_mode=MEMORY")
+        conn.execute("PRAGMA synchronous=OFF")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.executescript(SCHEMA_SQL.format(apple_ts=APPLE_TS_SEED))
+    return db_path
 
-    # Insert test data
-    now = datetime.now()
-    apple_ts = int(now.timestamp() - APPLE_EPOCH_OFFSET)
 
-    conn.execute("INSERT INTO handle VALUES (1, '+15551234567')")
-    conn.execute("INSERT INTO chat VALUES (1, 'iMessage;+15551234567', '+15551234567', '', 'iMessage')")
-    conn.execute(
-        "INSERT INTO message VALUES (1, 'msg-guid-1', 'Hello!', ?, 0, 1, 'iMessage', 0, 0, '', '', 1)",
-        (apple_ts,),
-    )
-    conn.execute("INSERT INTO chat_message_join VALUES (1, 1)")
-    conn.execute("INSERT INTO chat_handle_join VALUES (1, 1)")
-    conn.commit()
-    conn.close()
+@pytest.fixture
+def chat_db(db_dir, chat_db_template):
+    """A private copy of the template chat.db that the test may modify."""
+    db_path = Path(tempfile.mkdtemp(dir=db_dir)) / "chat.db"
+    shutil.copyfile(chat_db_template, db_path)
     return db_path
 
 
-def test_fetch_messages(chat_db):
-    reader = ChatDBReader(db_path=chat_db)
+@pytest.fixture(scope="session")
+def reader(chat_db_template):
+    """One reader over the template chat.db, shared by read-only tests."""
+    return ChatDBReader(db_path=chat_db_template)
+
+
+def test_fetch_messages(reader):
     messages = reader.fetch_messages(days=1)
     assert len(messages) >= 1
     assert messages[0]["text"] == "Hello!"
     assert messages[0]["handle_id"] == "+15551234567"
 
 
-def test_fetch_conversations(chat_db):
-    reader = ChatDBReader(db_path=chat_db)
+def test_fetch_conversations(reader):
     convos = reader.fetch_conversations(days=1)
     assert len(convos) >= 1
     assert convos[0]["chat_identifier"] == "+15551234567"
 
 
-def test_get_message_count(chat_db):
-    reader = ChatDBReader(db_path=chat_db)
+def test_get_message_count(reader):
     count = reader.get_message_count(days=1)
     assert count >= 1
 
@@ -105,7 +140,110 @@ def test_missing_db():
         reader.fetch_messages()
 
 
-def test_excluded_contacts(chat_db):
-    reader = ChatDBReader(db_path=chat_db)
+def test_excluded_contacts(chat_db_template):
+    reader = ChatDBReader(db_path=chat_db_template)
     convos = reader.fetch_conversations(days=1, excluded_contacts=["+15551234567"])
     assert len(convos) == 0
+
+
+def test_fetch_messages_result_shape(reader):
+    msg = reader.fetch_messages(days=1)[0]
+    assert msg["rowid"] == 1
+    assert msg["is_read"] is True
+    assert msg["is_from_me"] is False
+    assert msg["service"] == "iMessage"
+    assert msg["associated_message_type"] == 0
+
+
+def test_fetch_messages_coalesces_nulls(chat_db):
+    conn = sqlite3.connect(str(chat_db))
+    conn.execute(
+        "UPDATE message SET service = NULL, associated_message_type = NULL, "
+        "thread_originator_guid = NULL, handle_id = NULL"
+    )
+    conn.commit()
+    conn.close()
+
+    msg = ChatDBReader(db_path=chat_db).fetch_messages(days=1)[0]
+    assert msg["service"] == ""
+    assert msg["associated_message_type"] == 0
+    assert msg["thread_originator_guid"] == ""
+    assert msg["handle_id"] == ""
+
+
+def test_detect_timestamp_format(chat_db):
+    reader = ChatDBReader(db_path=chat_db)
+    conn = reader._connect()
+    try:
+        assert reader._detect_timestamp_format(conn) is False
+    finally:
+        conn.close()
+
+    conn = sqlite3.connect(str(chat_db))
+    conn.execute("UPDATE message SET date = date * 1000000000")
+    conn.commit()
+    conn.close()
+
+    reader = ChatDBReader(db_path=chat_db)
+    messages = reader.fetch_messages(days=1)
+    assert reader._nanoseconds is True
+    assert messages[0]["text"] == "Hello!"
+
+
+def test_fetch_messages_for_chats(reader):
+    results = reader.fetch_messages_for_chats(
+        ["iMessage;+15551234567", "iMessage;unknown"], days=1
+    )
+    assert [m["text"] for m in results["iMessage;+15551234567"]] == ["Hello!"]
+    assert results["iMessage;unknown"] == []
+
+
+def test_get_message_counts_by_chat(reader):
+    assert reader.get_message_counts_by_chat(days=1) == {"iMessage;+15551234567": 1}
+
+
+def test_fetch_messages_limit_keeps_most_recent(chat_db):
+    conn = sqlite3.connect(str(chat_db))
+    base = conn.execute("SELECT date FROM message").fetchone()[0]
+    conn.executemany(
+        "INSERT INTO message (ROWID, guid, text, date, handle_id) VALUES (?, ?, ?, ?, 1)",
+        [(i, f"msg-guid-{i}", f"msg {i}", base - 100 * i) for i in (2, 3)],
+    )
+    conn.commit()
+    conn.close()
+
+    messages = ChatDBReader(db_path=chat_db).fetch_messages(days=1, limit=2)
+    assert [m["guid"] for m in messages] == ["msg-guid-2", "msg-guid-1"]
+
+
+def test_recent_messages_query_uses_date_index(chat_db_template):
+    with closing(sqlite3.connect(str(chat_db_template))) as conn:
+        plan = [
+            row[3]
+            for row in conn.execute(f"EXPLAIN QUERY PLAN {_RECENT_MESSAGES_SQL}", (0, 10))
+        ]
+    assert any(
+        step.startswith("SEARCH m USING") and "INDEX msg_date" in step for step in plan
+    ), plan
+    assert not any(step.startswith("SCAN m") for step in plan), plan
+
+
+def test_excluded_contacts_filtered_before_limit(chat_db):
+    conn = sqlite3.connect(str(chat_db))
+    date = conn.execute("SELECT date FROM message").fetchone()[0]
+    conn.executescript(f"""
+        INSERT INTO handle VALUES (2, 'friend@example.com');
+        INSERT INTO chat VALUES (2, 'iMessage;;chat-group', 'chat-group', 'Group', 'iMessage');
+        INSERT INTO message (ROWID, guid, text, date, handle_id)
+            VALUES (2, 'msg-guid-2', 'Hi all', {date + 10}, 2);
+        INSERT INTO chat_message_join VALUES (2, 2);
+        INSERT INTO chat_handle_join VALUES (2, 2);
+        INSERT INTO chat_handle_join VALUES (2, 1);
+    """)
+    conn.close()
+
+    reader = ChatDBReader(db_path=chat_db)
+    # The group contains the excluded handle, so nothing is left
+    assert reader.fetch_conversations(days=1, excluded_contacts=["5551234567"]) == []
+    convos = reader.fetch_conversations(days=1, limit=1, excluded_contacts=["chat-group"])
+    assert [c["chat_identifier"] for c in convos] == ["+15551234567"]
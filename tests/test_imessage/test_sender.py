@@ -1,39 +1,46 @@
 """Tests for iMessage sender."""
 
-from unittest.mock import patch, MagicMock
-import subprocess
+from unittest.mock import MagicMock
 
 import pytest
 
+from data_clients.imessage import sender
 from data_clients.imessage.sender import send_message, send_to_group, send_attachment, _sanitize_applescript
 from data_clients.exceptions import IMessageSendError
 
 
+@pytest.fixture
+def mock_run(monkeypatch):
+    """Replace ``_run_applescript`` with a mock that reports success."""
+    mock = MagicMock(return_value=MagicMock(returncode=0))
+    monkeypatch.setattr(sender, "_run_applescript", mock)
+    return mock
+
+
 def test_sanitize_applescript():
     assert _sanitize_applescript('hello "world"') == 'hello \\"world\\"'
     assert _sanitize_applescript("back\\slash") == "back\\\\slash"
+    assert _sanitize_applescript('mixed\\"') == 'mixed\\\\\\"'
+    safe = "nothing to escape"
+    assert _sanitize_applescript(safe) is safe
 
 
-@patch("data_clients.imessage.sender._run_applescript")
 def test_send_message_success(mock_run):
-    mock_run.return_value = MagicMock(returncode=0)
     result = send_message("+15551234567", "Hello!")
     assert result is True
     mock_run.assert_called_once()
 
 
-@patch("data_clients.imessage.sender._run_applescript")
 def test_send_message_failure(mock_run):
     mock_run.return_value = MagicMock(returncode=1, stderr="error")
     with pytest.raises(IMessageSendError):
         send_message("+15551234567", "Hello!")
 
 
-@patch("data_clients.imessage.sender._run_applescript")
 def test_send_to_group(mock_run):
-    mock_run.return_value = MagicMock(returncode=0)
     result = send_to_group("chat123", "Hello group!")
     assert result is True
+    mock_run.assert_called_once()
 
 
 def test_send_attachment_missing_file():
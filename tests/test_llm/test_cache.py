@@ -0,0 +1,120 @@
+"""Tests for the LLM response cache."""
+
+import json
+
+import pytest
+
+from data_clients.llm.cache import LLMCache
+from data_clients.exceptions import LLMError
+
+
+def _params(content="hi", temperature=0.0):
+    return {
+        "model": "m",
+        "max_tokens": 10,
+        "temperature": temperature,
+        "system": "sys",
+        "messages": [{"role": "user", "content": content}],
+    }
+
+
+class _FakeEmbedder:
+    """Embeds text by vowel counts so near-identical strings are similar."""
+
+    def embed_query(self, text):
+        return [float(text.count(v)) + 1.0 for v in "aeiou"]
+
+
+def test_exact_hit_and_miss():
+    cache = LLMCache()
+    cache.put(_params(), {"text": "ok"})
+    assert cache.get(_params()) == {"text": "ok"}
+    assert cache.get(_params("other")) is None
+
+
+def test_sampled_requests_not_cached_in_exact_mode():
+    cache = LLMCache()
+    assert cache.cache_key(_params(temperature=0.5)) is None
+    cache.put(_params(temperature=0.5), {"text": "ok"})
+    assert len(cache) == 0
+
+
+def test_lru_eviction():
+    cache = LLMCache(maxsize=2)
+    for i in range(3):
+        cache.put(_params(str(i)), {"text": str(i)})
+    assert cache.get(_params("0")) is None
+    assert cache.get(_params("2")) == {"text": "2"}
+
+
+def test_semantic_hit():
+    cache = LLMCache(semantic_threshold=0.99, embedder=_FakeEmbedder())
+    cache.put(_params("what is the capital of france", temperature=0.3), {"text": "Paris"})
+    hit = cache.get(_params("what is the capital of France?", temperature=0.3))
+    assert hit == {"text": "Paris"}
+
+
+def test_semantic_requires_embedder():
+    with pytest.raises(LLMError, match="embedder"):
+        LLMCache(semantic_threshold=0.9)
+
+
+def test_dumps_matches_stdlib_fallback(monkeypatch):
+    from data_clients.llm import cache as cache_module
+
+    payload = {"b": [1, "x"], "a": {"z": None, "y": 2.5}}
+    fast = cache_module._dumps(payload, sort_keys=True)
+    monkeypatch.setattr(cache_module, "orjson", None)
+    slow = cache_module._dumps(payload, sort_keys=True)
+    assert json.loads(fast) == json.loads(slow) == payload
+
+
+def test_ttl_expires_entries(monkeypatch):
+    from data_clients.llm import cache as cache_module
+
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    cache = LLMCache(ttl=60)
+    cache.put(_params("hi"), {"text": "hello"})
+    now[0] += 59
+    assert cache.get(_params("hi")) == {"text": "hello"}
+    now[0] += 2
+    assert cache.get(_params("hi")) is None
+    assert len(cache) == 0
+
+
+def test_max_temperature_allows_near_deterministic():
+    cache = LLMCache(max_temperature=0.2)
+    cache.put(_params("hi", temperature=0.2), {"text": "hello"})
+    assert cache.get(_params("hi", temperature=0.2)) == {"text": "hello"}
+    assert cache.cache_key(_params("hi", temperature=0.3)) is None
+
+
+def test_cache_key_digests_system_prompt_text():
+    cache = LLMCache()
+    prompt = "You are terse. " * 200
+    block = [{"type": "text", "text": prompt, "cache_control": {"type": "ephemeral"}}]
+    as_block = {**_params(), "system": block}
+    assert cache.cache_key(as_block) == cache.cache_key({**as_block, "system": list(block)})
+    assert cache.cache_key(as_block) != cache.cache_key({**as_block, "system": prompt})
+    other = [{**block[0], "text": prompt + "!"}]
+    assert cache.cache_key(as_block) != cache.cache_key({**as_block, "system": other})
+    assert block[0]["text"] == prompt
+
+
+async def test_async_semantic_lookup_embeds_off_the_event_loop():
+    import threading
+
+    threads = []
+
+    class RecordingEmbedder(_FakeEmbedder):
+        def embed_query(self, text):
+            threads.append(threading.current_thread())
+            return super().embed_query(text)
+
+    cache = LLMCache(semantic_threshold=0.99, embedder=RecordingEmbedder())
+    await cache.aput(_params("what is the capital of france", temperature=0.3), {"text": "Paris"})
+    hit = await cache.aget(_params("what is the capital of France?", temperature=0.3))
+    assert hit == {"text": "Paris"}
+    assert len(threads) == 2
+    assert threading.main_thread() not in threads
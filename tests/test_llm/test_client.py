@@ -2,37 +2,712 @@
 
 import pytest
 
+pytest.importorskip("anthropic")
+
 from data_clients.llm.client import LLMClient, AsyncLLMClient
 from data_clients.exceptions import LLMError
 
 
-def test_init_requires_api_key():
-    with pytest.raises(LLMError, match="API key is required"):
-        LLMClient(api_key="")
+@pytest.fixture(scope="module", autouse=True)
+def _api_key_env():
+    """Provide ANTHROPIC_API_KEY for the whole module; tests that need it unset delete it."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("ANTHROPIC_API_KEY", "test-key")
+        yield
 
 
-def test_async_init_requires_api_key():
+@pytest.mark.parametrize("api_key", ["", None])
+@pytest.mark.parametrize("cls", [LLMClient, AsyncLLMClient])
+def test_init_requires_api_key(monkeypatch, cls, api_key):
+    monkeypatch.delenv("ANTHROPIC_API_KEY", raising=False)
     with pytest.raises(LLMError, match="API key is required"):
-        AsyncLLMClient(api_key="")
+        cls(api_key=api_key)
 
 
-def test_init_accepts_none_api_key_with_env(monkeypatch):
-    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key-123")
+def test_init_accepts_none_api_key_with_env():
     client = LLMClient(api_key=None)
     assert client.model == "claude-haiku-4-5-20251001"
 
-def test_init_accepts_none_api_key_without_env_raises(monkeypatch):
-    monkeypatch.delenv("ANTHROPIC_API_KEY", raising=False)
-    with pytest.raises(LLMError, match="API key is required"):
-        LLMClient(api_key=None)
-
-def test_async_init_accepts_none_api_key_with_env(monkeypatch):
-    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key-123")
+def test_async_init_accepts_none_api_key_with_env():
     client = AsyncLLMClient(api_key=None)
     assert client.model == "claude-haiku-4-5-20251001"
 
 def test_client_property():
-    import os
-    os.environ.setdefault("ANTHROPIC_API_KEY", "test-key")
     client = LLMClient()
     assert client.client is client._client
+
+def test_generate_uses_cache():
+    from unittest.mock import MagicMock
+    from data_clients.llm.cache import LLMCache
+
+    client = LLMClient(cache=LLMCache())
+    response = MagicMock()
+    response.content = [MagicMock(text="4")]
+    response.usage.input_tokens = 10
+    response.usage.output_tokens = 1
+    client._client = MagicMock()
+    client._client.messages.create.return_value = response
+
+    first = client.generate("sys", "2+2?", temperature=0)
+    second = client.generate("sys", "2+2?", temperature=0)
+    assert first["text"] == second["text"] == "4"
+    assert second["cached"] is True
+    assert second["output_tokens"] == 0
+    assert client._client.messages.create.call_count == 1
+    assert client.stats == {"hits": 1, "misses": 1}
+
+    client.generate("sys", "2+2?", temperature=0, no_cache=True)
+    assert client._client.messages.create.call_count == 2
+    assert client.stats == {"hits": 1, "misses": 1}
+
+
+def test_cache_true_builds_default_cache():
+    assert LLMClient(cache=True).cache.ttl == 3600
+    assert AsyncLLMClient(cache=False).cache is None
+
+def test_generate_batch_maps_results_by_custom_id():
+    from types import SimpleNamespace
+    from unittest.mock import MagicMock
+
+    client = LLMClient()
+    client._client = MagicMock()
+    batches = client._client.messages.batches
+    batches.create.return_value = SimpleNamespace(id="b1", processing_status="in_progress")
+    batches.retrieve.return_value = SimpleNamespace(id="b1", processing_status="ended")
+
+    def ok(custom_id, text):
+        message = SimpleNamespace(
+            content=[SimpleNamespace(text=text)],
+            usage=SimpleNamespace(input_tokens=3, output_tokens=2),
+        )
+        return SimpleNamespace(
+            custom_id=custom_id, result=SimpleNamespace(type="succeeded", message=message)
+        )
+
+    batches.results.return_value = iter([
+        SimpleNamespace(custom_id="req-1", result=SimpleNamespace(type="expired")),
+        ok("req-0", "first"),
+    ])
+
+    results = client.generate_batch(
+        [{"system_prompt": "s", "user_content": "a"}, {"system_prompt": "s", "user_content": "b"}],
+        poll_interval=0,
+    )
+    assert results[0]["text"] == "first"
+    assert isinstance(results[1], LLMError)
+    sent = batches.create.call_args.kwargs["requests"]
+    assert [r["custom_id"] for r in sent] == ["req-0", "req-1"]
+
+
+def test_generate_batch_small_input_uses_realtime_path(monkeypatch):
+    from unittest.mock import MagicMock
+
+    client = LLMClient()
+    client._client = MagicMock()
+    monkeypatch.setattr(
+        client, "generate", lambda system_prompt, user_content, **kwargs: {"text": user_content}
+    )
+    progress = []
+
+    results = client.generate_batch(
+        [{"system_prompt": "s", "user_content": "a"}, {"system_prompt": "s", "user_content": "b"}],
+        min_batch_size=10,
+        on_progress=lambda done, total: progress.append((done, total)),
+    )
+    assert [r["text"] for r in results] == ["a", "b"]
+    assert progress == [(1, 2), (2, 2)]
+    client._client.messages.batches.create.assert_not_called()
+
+
+def test_generate_batch_fallback_counts_each_cache_miss_once():
+    from unittest.mock import MagicMock
+
+    client = LLMClient(cache=True)
+    response = MagicMock()
+    response.content = [MagicMock(text="ok")]
+    response.usage.input_tokens = 10
+    response.usage.output_tokens = 1
+    client._client = MagicMock()
+    client._client.messages.create.return_value = response
+    requests = [{"system_prompt": "s", "user_content": c, "temperature": 0} for c in "ab"]
+
+    client.generate_batch(requests, min_batch_size=10)
+    assert client.stats == {"hits": 0, "misses": 2}
+    results = client.generate_batch(requests, min_batch_size=10)
+    assert all(r["cached"] for r in results)
+    assert client.stats == {"hits": 2, "misses": 2}
+    assert client._client.messages.create.call_count == 2
+
+
+async def test_async_generate_batch_fallback_counts_each_cache_miss_once():
+    from unittest.mock import AsyncMock, MagicMock
+
+    client = AsyncLLMClient(cache=True)
+    response = MagicMock()
+    response.content = [MagicMock(text="ok")]
+    response.usage.input_tokens = 10
+    response.usage.output_tokens = 1
+    client._client = MagicMock()
+    client._client.messages.create = AsyncMock(return_value=response)
+    requests = [{"system_prompt": "s", "user_content": c, "temperature": 0} for c in "ab"]
+
+    await client.generate_batch(requests, min_batch_size=10)
+    assert client.stats == {"hits": 0, "misses": 2}
+    results = await client.generate_batch(requests, min_batch_size=10)
+    assert all(r["cached"] for r in results)
+    assert client.stats == {"hits": 2, "misses": 2}
+
+async def test_generate_many_bounds_concurrency(monkeypatch):
+    import asyncio
+
+    client = AsyncLLMClient()
+    in_flight = 0
+    peak = 0
+
+    async def fake_generate(system_prompt, user_content, **kwargs):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        if user_content == "bad":
+            raise LLMError("boom")
+        return {"text": user_content}
+
+    monkeypatch.setattr(client, "generate", fake_generate)
+    items = [{"system_prompt": "s", "user_content": str(i)} for i in range(6)]
+    items.append({"system_prompt": "s", "user_content": "bad"})
+
+    results = await client.generate_many(items, max_concurrent=2)
+    assert peak == 2
+    assert [r["text"] for r in results[:6]] == [str(i) for i in range(6)]
+    assert isinstance(results[6], LLMError)
+
+def test_backoff_is_jittered_and_capped():
+    from data_clients.llm.client import _backoff
+
+    delays = [_backoff(10, cap=5.0) for _ in range(50)]
+    assert all(0 <= d <= 5.0 for d in delays)
+    assert len(set(delays)) > 1
+
+
+def test_rate_limit_delay_prefers_retry_after():
+    from types import SimpleNamespace
+    from data_clients.llm.client import _rate_limit_delay
+
+    error = SimpleNamespace(response=SimpleNamespace(headers={"retry-after": "7"}))
+    assert _rate_limit_delay(error, 0) == 7.0
+    assert 0 <= _rate_limit_delay(SimpleNamespace(response=None), 0) <= 2.0
+
+
+def test_rate_limit_delay_parses_reset_headers():
+    import time
+    from datetime import datetime, timedelta, timezone
+    from email.utils import format_datetime
+    from types import SimpleNamespace
+    from data_clients.llm.client import _rate_limit_delay
+
+    def error(headers):
+        return SimpleNamespace(response=SimpleNamespace(headers=headers))
+
+    soon = datetime.now(timezone.utc) + timedelta(seconds=20)
+    http_date = format_datetime(soon, usegmt=True)
+    assert 15 <= _rate_limit_delay(error({"retry-after": http_date}), 0) <= 20
+
+    headers = {
+        "anthropic-ratelimit-requests-reset": (soon - timedelta(seconds=10)).isoformat(),
+        "anthropic-ratelimit-tokens-reset": soon.isoformat().replace("+00:00", "Z"),
+    }
+    assert 15 <= _rate_limit_delay(error(headers), 0) <= 20
+
+    past = datetime.fromtimestamp(time.time() - 5, timezone.utc).isoformat()
+    assert _rate_limit_delay(error({"anthropic-ratelimit-requests-reset": past}), 0) == 0.0
+
+
+def test_rate_limit_delay_only_waits_on_exhausted_buckets():
+    from datetime import datetime, timedelta, timezone
+    from types import SimpleNamespace
+    from data_clients.llm.client import _rate_limit_delay
+
+    now = datetime.now(timezone.utc)
+    headers = {
+        "anthropic-ratelimit-requests-remaining": "0",
+        "anthropic-ratelimit-requests-reset": (now + timedelta(seconds=5)).isoformat(),
+        "anthropic-ratelimit-tokens-remaining": "12000",
+        "anthropic-ratelimit-tokens-reset": (now + timedelta(seconds=50)).isoformat(),
+    }
+    error = SimpleNamespace(response=SimpleNamespace(headers=headers))
+    assert 0 < _rate_limit_delay(error, 0) <= 5
+
+    error = SimpleNamespace(response=SimpleNamespace(headers={"retry-after-ms": "250"}))
+    assert _rate_limit_delay(error, 0) == 0.25
+
+def test_sync_clients_share_http_pool():
+    a, b = LLMClient(), LLMClient()
+    assert a.client._client is b.client._client
+
+
+def test_sync_sdk_clients_cached_by_key_and_base_url():
+    assert LLMClient().client is LLMClient(api_key="test-key").client
+    assert LLMClient().client is not LLMClient(api_key="other-key").client
+    assert LLMClient().client is not LLMClient(base_url="https://gateway.example").client
+
+
+def test_sync_clients_cache_is_bounded(monkeypatch):
+    from data_clients.llm import client as client_module
+
+    monkeypatch.setattr(client_module, "_sync_clients", client_module.OrderedDict())
+    monkeypatch.setattr(client_module, "_SYNC_CLIENTS_MAX", 2)
+    first = LLMClient(api_key="k1").client
+    LLMClient(api_key="k2")
+    assert LLMClient(api_key="k1").client is first  # refreshes k1
+    LLMClient(api_key="k3")
+    assert [api_key for api_key, _ in client_module._sync_clients] == ["k1", "k3"]
+    assert LLMClient(api_key="k1").client is first
+
+
+def test_sync_clients_rebuilt_after_shared_pool_closes():
+    from data_clients.llm import client as client_module
+
+    before = LLMClient().client
+    client_module._close_shared_http_client()
+    after = LLMClient().client
+    assert after is not before
+    pool, _ = client_module._sync_clients[("test-key", None)]
+    assert pool is client_module._get_shared_http_client()
+
+
+def test_http_options_only_tighten_connect_timeout():
+    from anthropic import DEFAULT_TIMEOUT
+    from data_clients.llm.client import _get_shared_http_client
+
+    timeout = LLMClient().client.timeout
+    assert timeout.connect == 10.0
+    assert (timeout.read, timeout.write, timeout.pool) == (
+        DEFAULT_TIMEOUT.read,
+        DEFAULT_TIMEOUT.write,
+        DEFAULT_TIMEOUT.pool,
+    )
+    assert _get_shared_http_client().timeout.read == DEFAULT_TIMEOUT.read
+
+
+def test_http_options_scale_pool_and_detect_http2(monkeypatch):
+    from data_clients.llm import client as client_module
+    from data_clients.llm.client import _http_options
+
+    options = _http_options(250)
+    assert options["limits"].max_connections == 250
+    assert options["limits"].keepalive_expiry == 60.0
+    assert options["timeout"].connect == 10.0
+    monkeypatch.setattr(client_module, "_HTTP2_AVAILABLE", False)
+    assert _http_options()["http2"] is False
+
+
+async def test_async_client_closes_owned_pool():
+    async with AsyncLLMClient() as client:
+        pool = client.client._client
+    assert pool.is_closed
+
+async def test_async_client_aclose_alias():
+    client = AsyncLLMClient()
+    await client.aclose()
+    assert client.client._client.is_closed
+
+
+def test_shared_pool_closed_at_exit():
+    from data_clients.llm import client as client_module
+
+    pool = LLMClient().client._client
+    client_module._close_shared_http_client()
+    assert pool.is_closed
+    assert LLMClient().client._client is not pool
+
+def test_request_params_marks_prompt_cache_breakpoints():
+    from data_clients.llm.client import _request_params
+
+    long_system = "x" * 2000
+    tools = [{"name": "a"}, {"name": "b"}]
+    params = _request_params(
+        "m", 10, 0.0, long_system, [], tools=tools, prompt_cache=True
+    )
+    assert params["system"] == [
+        {"type": "text", "text": long_system, "cache_control": {"type": "ephemeral"}}
+    ]
+    assert params["tools"][-1]["cache_control"] == {"type": "ephemeral"}
+    assert "cache_control" not in tools[-1]
+
+    short = _request_params("m", 10, 0.0, "short", [], prompt_cache=True)
+    assert short["system"] == "short"
+    assert _request_params("m", 10, 0.0, long_system, [])["system"] == long_system
+
+
+def test_request_params_reuses_fixed_prompt_cache_blocks():
+    from data_clients.llm.client import _request_params
+
+    system = "y" * 2000
+    first = _request_params("m", 10, 0.0, system, [], prompt_cache=True)
+    second = _request_params("m", 10, 0.0, system, [], prompt_cache=True)
+    assert first["system"] is second["system"]
+
+
+def test_request_params_sees_tools_appended_to_a_reused_list():
+    from data_clients.llm.client import _request_params
+
+    tools = [{"name": "a"}]
+    first = _request_params("m", 10, 0.0, "s", [], tools=tools, prompt_cache=True)
+    tools.append({"name": "b"})
+    second = _request_params("m", 10, 0.0, "s", [], tools=tools, prompt_cache=True)
+    assert [t["name"] for t in first["tools"]] == ["a"]
+    assert second["tools"] == [{"name": "a"}, {"name": "b", "cache_control": {"type": "ephemeral"}}]
+    assert "cache_control" not in tools[-1]
+
+
+def _fake_tool_stream_events():
+    from types import SimpleNamespace as NS
+
+    usage = NS(input_tokens=12, output_tokens=1)
+    return [
+        NS(type="message_start", message=NS(usage=usage)),
+        NS(type="content_block_start", index=0, content_block=NS(type="text", text="")),
+        NS(type="content_block_delta", index=0, delta=NS(type="text_delta", text="Let me ")),
+        NS(type="content_block_delta", index=0, delta=NS(type="text_delta", text="check.")),
+        NS(type="content_block_start", index=1,
+           content_block=NS(type="tool_use", name="lookup", id="tool-1")),
+        NS(type="content_block_delta", index=1,
+           delta=NS(type="input_json_delta", partial_json='{"q": ')),
+        NS(type="content_block_delta", index=1,
+           delta=NS(type="input_json_delta", partial_json='"x"}')),
+        NS(type="message_delta", delta=NS(stop_reason="tool_use"), usage=NS(output_tokens=9)),
+    ]
+
+
+class _FakeRawStream:
+    def __init__(self, events):
+        self._events = events
+        self.consumed = 0
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def __aiter__(self):
+        for event in self._events:
+            self.consumed += 1
+            yield event
+
+
+async def test_stream_with_tools_accumulates_events():
+    from unittest.mock import MagicMock
+
+    client = AsyncLLMClient()
+    client._client = MagicMock()
+    client._client.messages.stream.return_value = _FakeRawStream(_fake_tool_stream_events())
+
+    async with client.stream_with_tools("sys", [], [{"name": "lookup"}]) as stream:
+        chunks = [chunk async for chunk in stream.text_stream]
+    assert chunks == ["Let me ", "check."]
+    assert stream.result["text"] == "Let me check."
+    assert stream.result["tool_calls"] == [{"name": "lookup", "input": {"q": "x"}, "id": "tool-1"}]
+    assert stream.result["stop_reason"] == "tool_use"
+    assert stream.result["input_tokens"] == 12
+    assert stream.result["output_tokens"] == 9
+
+
+async def test_stream_with_tools_aborts_on_early_exit():
+    from unittest.mock import MagicMock
+
+    client = AsyncLLMClient()
+    client._client = MagicMock()
+    raw = _FakeRawStream(_fake_tool_stream_events())
+    client._client.messages.stream.return_value = raw
+
+    async with client.stream_with_tools("sys", [], [{"name": "lookup"}]) as stream:
+        async for chunk in stream.text_stream:
+            break
+    assert raw.closed
+    assert raw.consumed < len(raw._events)
+    assert stream.result == {}
+
+
+async def test_generate_as_completed_yields_in_completion_order(monkeypatch):
+    import asyncio
+
+    client = AsyncLLMClient()
+
+    async def fake_generate(system_prompt, user_content, **kwargs):
+        await asyncio.sleep(float(user_content))
+        return {"text": user_content}
+
+    monkeypatch.setattr(client, "generate", fake_generate)
+    items = [{"system_prompt": "s", "user_content": d} for d in ("0.03", "0.01", "0.02")]
+    order = [index async for index, _ in client.generate_as_completed(items)]
+    assert order == [1, 2, 0]
+
+async def test_generate_many_resumes_from_checkpoint(monkeypatch, tmp_path):
+    client = AsyncLLMClient()
+    calls = []
+
+    async def fake_generate(system_prompt, user_content, **kwargs):
+        calls.append(user_content)
+        return {"text": user_content}
+
+    monkeypatch.setattr(client, "generate", fake_generate)
+    items = [{"system_prompt": "s", "user_content": str(i)} for i in range(3)]
+    path = tmp_path / "out.jsonl"
+
+    await client.generate_many(items[:2], output_jsonl=path)
+    calls.clear()
+    results = await client.generate_many(items, output_jsonl=path)
+
+    assert calls == ["2"]
+    assert [r["text"] for r in results] == ["0", "1", "2"]
+    assert len(path.read_text().splitlines()) == 3
+
+def test_join_text():
+    from data_clients.llm.client import _join_text
+
+    single = "only block"
+    assert _join_text([]) == ""
+    assert _join_text([single]) is single
+    assert _join_text(["a", "b"]) == "a\nb"
+
+async def test_endpoint_pool_fails_over_on_server_error(monkeypatch):
+    from unittest.mock import AsyncMock, MagicMock
+    import httpx
+    from anthropic import InternalServerError
+
+    client = AsyncLLMClient(endpoints=[
+        {"api_key": "key-a", "base_url": "https://a.example"},
+        {"api_key": "key-b", "base_url": "https://b.example", "concurrency_limit": 2},
+    ])
+    first, second = (ep.client for ep in client._pool.endpoints)
+    request = httpx.Request("POST", "https://a.example/v1/messages")
+    error = InternalServerError("boom", response=httpx.Response(500, request=request), body=None)
+    response = MagicMock()
+    response.content = [MagicMock(text="ok")]
+    response.usage = MagicMock(
+        input_tokens=1, output_tokens=1,
+        cache_creation_input_tokens=0, cache_read_input_tokens=0,
+    )
+    monkeypatch.setattr(first.messages, "create", AsyncMock(side_effect=error))
+    monkeypatch.setattr(second.messages, "create", AsyncMock(return_value=response))
+
+    result = await client.generate("s", "hi")
+    assert result["text"] == "ok"
+    assert all(ep.in_flight == 0 for ep in client._pool.endpoints)
+    await client.close()
+
+
+def test_endpoint_pool_ranks_by_load():
+    from data_clients.llm.client import _Endpoint, _EndpointPool
+
+    busy = _Endpoint(client=None, name="busy", concurrency_limit=4)
+    idle = _Endpoint(client=None, name="idle", concurrency_limit=2)
+    busy.in_flight = 2
+    idle.in_flight = 0
+    assert [ep.name for ep in _EndpointPool([busy, idle]).ranked()] == ["idle", "busy"]
+
+async def test_client_max_concurrency_and_qps():
+    import asyncio
+    import time
+
+    client = AsyncLLMClient(max_concurrency=2, qps=50)
+    in_flight = 0
+    peak = 0
+    starts = []
+
+    class _Messages:
+        async def create(self, **params):
+            nonlocal in_flight, peak
+            starts.append(time.monotonic())
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return params
+
+    client._client.messages = _Messages()
+
+    async def call():
+        await client._acquire({})
+        return await client._create({})
+
+    await asyncio.gather(*(call() for _ in range(6)))
+    assert peak <= 2
+    gaps = [b - a for a, b in zip(starts, starts[1:])]
+    assert min(gaps) >= 0.015
+
+def test_generate_retries_through_shared_policy(monkeypatch):
+    from unittest.mock import MagicMock
+    import httpx
+    from anthropic import APITimeoutError, BadRequestError
+    from data_clients.llm import client as client_module
+
+    monkeypatch.setattr(client_module.time, "sleep", lambda _: None)
+    client = LLMClient()
+    client._client = MagicMock()
+    request = httpx.Request("POST", "https://api.anthropic.com/v1/messages")
+    response = MagicMock()
+    response.content = [MagicMock(text="ok")]
+    client._client.messages.create.side_effect = [APITimeoutError(request), response]
+    assert client.generate("s", "hi")["text"] == "ok"
+
+    bad = BadRequestError("bad", response=httpx.Response(400, request=request), body=None)
+    client._client.messages.create.side_effect = bad
+    with pytest.raises(LLMError, match="Claude API error"):
+        client.generate("s", "hi")
+
+def test_stream_retries_open_but_not_mid_stream(monkeypatch):
+    from unittest.mock import MagicMock
+    import httpx
+    from anthropic import APITimeoutError
+    from data_clients.llm import client as client_module
+
+    monkeypatch.setattr(client_module.time, "sleep", lambda _: None)
+    request = httpx.Request("POST", "https://api.anthropic.com/v1/messages")
+
+    class _Stream:
+        def __init__(self, chunks):
+            self.text_stream = chunks
+            self.exited = False
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc_info):
+            self.exited = True
+
+    def broken():
+        yield "partial"
+        raise APITimeoutError(request)
+
+    opened = _Stream(broken())
+    client = LLMClient()
+    client._client = MagicMock()
+    client._client.messages.stream.side_effect = [APITimeoutError(request), opened]
+
+    received = []
+    with pytest.raises(LLMError, match="mid-stream"):
+        for text in client.stream("s", [{"role": "user", "content": "hi"}]):
+            received.append(text)
+    assert received == ["partial"]
+    assert client._client.messages.stream.call_count == 2
+    assert opened.exited
+
+def test_stream_retries_failure_before_first_token(monkeypatch):
+    from unittest.mock import MagicMock
+    import httpx
+    from anthropic import APITimeoutError
+    from data_clients.llm import client as client_module
+
+    monkeypatch.setattr(client_module.time, "sleep", lambda _: None)
+    request = httpx.Request("POST", "https://api.anthropic.com/v1/messages")
+
+    class _Stream:
+        def __init__(self, chunks):
+            self.text_stream = chunks
+            self.exited = False
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc_info):
+            self.exited = True
+
+    def stalled():
+        raise APITimeoutError(request)
+        yield
+
+    failed = _Stream(stalled())
+    client = LLMClient()
+    client._client = MagicMock()
+    client._client.messages.stream.side_effect = [failed, _Stream(iter(["Hel", "lo"]))]
+
+    assert list(client.stream("s", [{"role": "user", "content": "hi"}])) == ["Hel", "lo"]
+    assert client._client.messages.stream.call_count == 2
+    assert failed.exited
+
+async def test_generate_stream_first_reports_first_token():
+    from types import SimpleNamespace
+    from unittest.mock import MagicMock
+
+
+    class _Stream:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc_info):
+            return False
+
+        @property
+        async def text_stream(self):
+            for chunk in ("Hel", "lo"):
+                yield chunk
+
+        async def get_final_message(self):
+            return SimpleNamespace(usage=SimpleNamespace(input_tokens=4, output_tokens=2))
+
+    client = AsyncLLMClient()
+    client._client = MagicMock()
+    client._client.messages.stream.return_value = _Stream()
+    first = []
+
+    result = await client.generate_stream_first("s", "hi", first_token_cb=first.append)
+    assert first == ["Hel"]
+    assert result["text"] == "Hello"
+    assert result["output_tokens"] == 2
+    assert result["ttft_ms"] >= 0
+
+def test_generate_with_tools_splits_text_and_tool_blocks():
+    from types import SimpleNamespace as NS
+    from unittest.mock import MagicMock
+
+    client = LLMClient()
+    client._client = MagicMock()
+    client._client.messages.create.return_value = NS(
+        content=[
+            NS(type="text", text="Looking it up."),
+            NS(type="tool_use", name="lookup", input={"q": "x"}, id="t1"),
+        ],
+        stop_reason="tool_use",
+        usage=NS(input_tokens=5, output_tokens=3),
+    )
+    result = client.generate_with_tools("s", [{"role": "user", "content": "hi"}], [])
+    assert result["text"] == "Looking it up."
+    assert result["tool_calls"] == [{"name": "lookup", "input": {"q": "x"}, "id": "t1"}]
+    assert result["stop_reason"] == "tool_use"
+
+def test_rpm_tpm_build_rate_limiter():
+    from data_clients.llm.ratelimit import LLMRateLimiter
+
+    limiter = AsyncLLMClient(rpm=50, tpm=40_000).rate_limiter
+    assert (limiter.rpm, limiter.tpm) == (50, 40_000)
+    assert LLMClient().rate_limiter is None
+    with pytest.raises(LLMError):
+        LLMClient(rate_limiter=LLMRateLimiter(rpm=1), rpm=5)
+
+def test_install_orjson_serializer(monkeypatch):
+    import json
+    from anthropic import _base_client
+    from pydantic import BaseModel
+    from data_clients.llm.client import install_orjson_serializer
+
+    pytest.importorskip("orjson")
+    monkeypatch.setattr(_base_client, "openapi_dumps", _base_client.openapi_dumps)
+    assert install_orjson_serializer()
+    assert install_orjson_serializer()  # idempotent
+
+    dumps = _base_client.openapi_dumps
+    body = {"model": "m", "messages": [{"role": "user", "content": "héllo"}]}
+    assert json.loads(dumps(body)) == body
+
+    class Block(BaseModel):
+        type: str
+
+    assert json.loads(dumps({"content": [Block(type="text")]})) == {"content": [{"type": "text"}]}
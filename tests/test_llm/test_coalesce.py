@@ -0,0 +1,76 @@
+"""Tests for the Message Batches coalescer."""
+
+import asyncio
+
+import pytest
+
+from data_clients.exceptions import LLMError
+from data_clients.llm.coalesce import BatchWorker
+
+
+class _FakeClient:
+    def __init__(self):
+        self.batches = []
+
+    async def generate_batch(self, requests, poll_interval=10.0):
+        self.batches.append([r["user_content"] for r in requests])
+        await asyncio.sleep(0)
+        return [
+            LLMError("expired") if r["user_content"] == "bad" else {"text": r["user_content"]}
+            for r in requests
+        ]
+
+
+async def test_concurrent_submits_share_one_batch():
+    client = _FakeClient()
+    worker = BatchWorker(client, max_wait_ms=20)
+    results = await asyncio.gather(
+        *(worker.submit({"system_prompt": "s", "user_content": str(i)}) for i in range(5)),
+        worker.submit({"system_prompt": "s", "user_content": "bad"}),
+        return_exceptions=True,
+    )
+    assert [r["text"] for r in results[:5]] == ["0", "1", "2", "3", "4"]
+    assert isinstance(results[5], LLMError)
+    assert client.batches == [["0", "1", "2", "3", "4", "bad"]]
+    await worker.close()
+
+
+async def test_max_batch_splits_submissions():
+    client = _FakeClient()
+    worker = BatchWorker(client, max_batch=2, max_wait_ms=20)
+    await asyncio.gather(
+        *(worker.submit({"system_prompt": "s", "user_content": str(i)}) for i in range(5))
+    )
+    assert sorted(len(b) for b in client.batches) == [1, 2, 2]
+    await worker.close()
+
+
+async def test_close_during_wait_window_fails_collected_requests():
+    client = _FakeClient()
+    worker = BatchWorker(client, max_wait_ms=5000)
+    submitted = asyncio.create_task(worker.submit({"system_prompt": "s", "user_content": "x"}))
+    for _ in range(3):
+        await asyncio.sleep(0)
+    assert worker._queue.empty()  # the collector is holding it in its window
+    await worker.close()
+    with pytest.raises(LLMError, match="closed before submission"):
+        await asyncio.wait_for(submitted, 1)
+    assert client.batches == []
+
+
+async def test_generate_coalesced_routes_through_worker(monkeypatch):
+    from data_clients.llm.client import AsyncLLMClient
+
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+    client = AsyncLLMClient()
+    seen = []
+
+    async def fake_batch(requests, poll_interval=10.0):
+        seen.append(requests)
+        return [{"text": "ok"} for _ in requests]
+
+    monkeypatch.setattr(client, "generate_batch", fake_batch)
+    result = await client.generate_coalesced("s", "hi", max_tokens=10)
+    assert result == {"text": "ok"}
+    assert seen == [[{"system_prompt": "s", "user_content": "hi", "max_tokens": 10}]]
+    await client.close()
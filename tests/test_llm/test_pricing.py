@@ -0,0 +1,39 @@
+import pytest
+
+from data_clients.llm.checkpoint import JsonlCheckpoint
+from data_clients.llm.pricing import CostTracker, estimate_cost
+
+
+def test_estimate_cost_matches_longest_prefix():
+    result = {"model": "claude-opus-4-5-20251101", "input_tokens": 1_000_000, "output_tokens": 0}
+    assert estimate_cost(result) == pytest.approx(5.0)
+
+
+def test_estimate_cost_prices_cache_tokens():
+    result = {
+        "model": "claude-sonnet-4-20250514",
+        "input_tokens": 0,
+        "output_tokens": 0,
+        "cache_creation_tokens": 1_000_000,
+        "cache_read_tokens": 1_000_000,
+    }
+    assert estimate_cost(result) == pytest.approx(3.0 * 1.25 + 3.0 * 0.1)
+
+
+def test_estimate_cost_unknown_model_is_free():
+    assert estimate_cost({"model": "other", "input_tokens": 10}) == 0.0
+
+
+def test_cost_tracker_applies_discount():
+    tracker = CostTracker(discount=0.5)
+    tracker.add({"model": "claude-haiku-4-5", "input_tokens": 0, "output_tokens": 1_000_000})
+    assert tracker.total_usd == pytest.approx(2.5)
+    assert tracker.count == 1
+
+
+def test_checkpoint_skips_torn_line(tmp_path):
+    checkpoint = JsonlCheckpoint(tmp_path / "out.jsonl")
+    checkpoint.write(0, {"text": "a"}, custom_id="req-0")
+    with checkpoint.path.open("a") as f:
+        f.write('{"index": 1, "res')
+    assert checkpoint.load() == {0: {"text": "a"}}
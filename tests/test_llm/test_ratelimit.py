@@ -0,0 +1,40 @@
+"""Tests for the client-side LLM rate limiter."""
+
+from data_clients.llm.ratelimit import LLMRateLimiter, estimate_input_tokens
+
+
+def test_no_wait_within_budget():
+    limiter = LLMRateLimiter(rpm=60, tpm=1000)
+    assert limiter._reserve(100) == 0.0
+
+
+def test_request_bucket_exhaustion_waits():
+    limiter = LLMRateLimiter(rpm=60)
+    for _ in range(60):
+        limiter._reserve(0)
+    wait = limiter._reserve(0)
+    assert 0.9 < wait <= 1.0
+
+
+def test_token_bucket_exhaustion_waits():
+    limiter = LLMRateLimiter(tpm=600)
+    assert limiter._reserve(600) == 0.0
+    wait = limiter._reserve(60)
+    assert 5.9 < wait <= 6.0
+
+
+def test_penalize_drains_buckets():
+    limiter = LLMRateLimiter(rpm=60)
+    limiter.penalize()
+    assert limiter._reserve(0) > 0
+
+
+def test_estimate_input_tokens():
+    params = {
+        "system": "x" * 40,
+        "messages": [
+            {"role": "user", "content": "y" * 40},
+            {"role": "user", "content": [{"type": "text", "text": "z" * 40}]},
+        ],
+    }
+    assert estimate_input_tokens(params) == 30
@@ -0,0 +1,48 @@
+"""Tests for the blocking facade over AsyncLLMClient."""
+
+import threading
+
+import pytest
+
+from data_clients.exceptions import LLMError
+from data_clients.llm.sync_bridge import SharedLoopLLMClient
+
+
+def test_generate_runs_on_shared_loop_thread(monkeypatch):
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+    llm = SharedLoopLLMClient()
+    seen = []
+
+    async def fake_generate(system_prompt, user_content, **kwargs):
+        seen.append(threading.current_thread().name)
+        return {"text": user_content.upper()}
+
+    monkeypatch.setattr(llm.async_client, "generate", fake_generate)
+    assert llm.generate("s", "hi") == {"text": "HI"}
+    assert SharedLoopLLMClient(llm.async_client).generate("s", "yo") == {"text": "YO"}
+    assert seen == ["llm-shared-loop", "llm-shared-loop"]
+    llm.close()
+
+
+def test_stream_bridges_async_generator(monkeypatch):
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+    llm = SharedLoopLLMClient()
+
+    async def fake_stream(system_prompt, messages, **kwargs):
+        for chunk in ("a", "b", "c"):
+            yield chunk
+
+    monkeypatch.setattr(llm.async_client, "stream", fake_stream)
+    assert list(llm.stream("s", [])) == ["a", "b", "c"]
+
+
+def test_errors_propagate(monkeypatch):
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+    llm = SharedLoopLLMClient()
+
+    async def failing(*args, **kwargs):
+        raise LLMError("boom")
+
+    monkeypatch.setattr(llm.async_client, "generate", failing)
+    with pytest.raises(LLMError, match="boom"):
+        llm.generate("s", "hi")
@@ -2,18 +2,13 @@
 
 import pytest
 
-from data_clients.vectorstore.base import BaseVectorStore, SearchResult
+from data_clients.vectorstore.base import AsyncBaseVectorStore, BaseVectorStore, SearchResult
 
 
-def test_base_vectorstore_is_abstract():
+@pytest.mark.parametrize("cls", [BaseVectorStore, AsyncBaseVectorStore])
+def test_base_vectorstore_is_abstract(cls):
     with pytest.raises(TypeError):
-        BaseVectorStore()
-
-
-def test_async_base_vectorstore_is_abstract():
-    from data_clients.vectorstore.base import AsyncBaseVectorStore
-    with pytest.raises(TypeError):
-        AsyncBaseVectorStore()
+        cls()
 
 
 def test_search_result_dataclass():
@@ -26,3 +21,44 @@ def test_search_result_dataclass():
     assert result.doc_id == "doc1"
     assert result.score == 0.95
     assert result.text == "Hello world"
+
+
+def test_search_result_is_slotted_and_frozen():
+    import dataclasses
+
+    result = SearchResult(doc_id="doc1", score=0.5, text=None, metadata={})
+    assert not hasattr(result, "__dict__")
+    assert SearchResult.__slots__ == ("doc_id", "score", "text", "metadata")
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        result.score = 1.0
+
+
+class _ListStore(BaseVectorStore):
+    def __init__(self):
+        self.queries = []
+
+    def add(self, doc_id, text, embedding, metadata):
+        pass
+
+    def add_batch(self, ids, texts, embeddings, metadatas):
+        pass
+
+    def search(self, query_embedding, n_results=10, filters=None):
+        self.queries.append(query_embedding)
+        return [SearchResult(doc_id=str(query_embedding[0]), score=1.0, text=None, metadata={})]
+
+    def delete(self, doc_id):
+        pass
+
+    def delete_batch(self, doc_ids):
+        pass
+
+    def count(self):
+        return 0
+
+
+def test_search_batch_default_runs_each_query():
+    store = _ListStore()
+    results = store.search_batch([[1.0], [2.0]], n_results=1)
+    assert [[r.doc_id for r in rs] for rs in results] == [["1.0"], ["2.0"]]
+    assert store.queries == [[1.0], [2.0]]
@@ -0,0 +1,117 @@
+"""Tests for ChromaDB store helpers."""
+
+import numpy as np
+
+from data_clients.vectorstore.chroma import _expired_ids, _retention_tiers
+
+TIERS = _retention_tiers({
+    "high": {"min_weight": 0.8, "days": 365},
+    "medium": {"min_weight": 0.4, "days": 90},
+    "low": {"min_weight": 0.0, "days": 30},
+})
+TODAY = np.datetime64("2024-06-30")
+
+
+def test_expired_ids_uses_weight_tiers():
+    ids = ["high-old", "high-new", "medium-old", "low-edge", "low-over"]
+    metadatas = [
+        {"search_weight": 0.9, "date": "2023-06-01"},
+        {"search_weight": 0.9, "date": "2024-01-01"},
+        {"search_weight": 0.4, "date": "2024-03-01T08:00:00"},
+        {"search_weight": 0.1, "date": "2024-05-31"},
+        {"date": "2024-05-30"},
+    ]
+    assert _expired_ids(ids, metadatas, TIERS, TODAY) == ["high-old", "medium-old", "low-over"]
+
+
+def test_expired_ids_override_and_unparseable_dates():
+    ids = ["override", "no-meta", "no-date", "bad-date", "compact"]
+    metadatas = [
+        {"search_weight": 0.9, "date": "2024-06-01", "retention_days": "7"},
+        None,
+        {"search_weight": 0.1},
+        {"search_weight": 0.1, "date": "not-a-date"},
+        {"search_weight": 0.1, "date": "20240101"},
+    ]
+    assert _expired_ids(ids, metadatas, TIERS, TODAY) == ["override", "compact"]
+    assert _expired_ids([], [], TIERS, TODAY) == []
+
+
+def test_retention_tiers_sorted_once_with_default():
+    neg_weights, days = TIERS
+    assert neg_weights.tolist() == [-0.8, -0.4, -0.0]
+    assert days.tolist() == [365, 90, 30, 30]
+
+
+class _FakeCollection:
+    def __init__(self, docs):
+        self.docs = docs  # list of (id, metadata), insertion order
+        self.pages = 0
+
+    def count(self):
+        return len(self.docs)
+
+    def get(self, include, limit, offset):
+        self.pages += 1
+        page = self.docs[offset : offset + limit]
+        return {"ids": [d[0] for d in page], "metadatas": [d[1] for d in page]}
+
+    def delete(self, ids):
+        doomed = set(ids)
+        self.docs = [d for d in self.docs if d[0] not in doomed]
+
+
+def test_prune_pages_through_collection(monkeypatch):
+    from data_clients.vectorstore import chroma
+
+    monkeypatch.setattr(chroma, "_PRUNE_PAGE_SIZE", 3)
+    docs = [
+        (f"doc-{i}", {"search_weight": 0.1, "date": "2000-01-01" if i % 2 else "2999-01-01"})
+        for i in range(10)
+    ]
+    store = object.__new__(chroma.ChromaVectorStore)
+    store.collection = _FakeCollection(docs)
+    thresholds = {"low": {"min_weight": 0.0, "days": 30}}
+    assert store.prune(thresholds) == 5
+    assert [d[0] for d in store.collection.docs] == [f"doc-{i}" for i in range(0, 10, 2)]
+    assert store.collection.pages > 1
+
+
+def test_add_batch_sends_float32_slices():
+    from data_clients.vectorstore import chroma
+
+    upserts = []
+
+    class _Collection:
+        def upsert(self, **kwargs):
+            upserts.append(kwargs)
+
+    store = object.__new__(chroma.ChromaVectorStore)
+    store.collection = _Collection()
+    store.add_batch(["a", "b"], ["x", "y"], [[1.0, 0.0], [0.0, 1.0]], [{}, {}])
+    store.add("c", "z", [0.5, 0.5], {})
+    embeddings = upserts[0]["embeddings"]
+    assert embeddings.dtype == np.float32 and embeddings.flags["C_CONTIGUOUS"]
+    assert embeddings.tolist() == [[1.0, 0.0], [0.0, 1.0]]
+    assert upserts[1]["embeddings"].shape == (1, 2)
+
+    matrix = np.ones((3, 2), dtype=np.float32)
+    assert chroma._as_float32(matrix) is matrix
+
+
+def test_parse_query_converts_distances():
+    from data_clients.vectorstore.chroma import _parse_query
+
+    raw = {
+        "ids": [["a", "b"], []],
+        "distances": [[0.25, 0.5], []],
+        "documents": [["doc a", "doc b"], []],
+        "metadatas": [[{"k": 1}, None], []],
+    }
+    results = _parse_query(raw, 0)
+    assert [(r.doc_id, r.score, r.text, r.metadata) for r in results] == [
+        ("a", 0.75, "doc a", {"k": 1}),
+        ("b", 0.5, "doc b", {}),
+    ]
+    assert _parse_query(raw, 1) == []
+    assert _parse_query({"ids": [["c"]]}, 0)[0].metadata == {}
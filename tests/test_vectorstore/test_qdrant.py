@@ -0,0 +1,155 @@
+"""Tests for the Qdrant backend against an in-memory Qdrant."""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("qdrant_client")
+
+from qdrant_client import QdrantClient
+from qdrant_client.models import Distance, VectorParams
+
+from data_clients.vectorstore.qdrant import QdrantVectorStore
+
+
+@pytest.fixture
+def store():
+    instance = object.__new__(QdrantVectorStore)
+    instance.collection_name = "test"
+    instance.quantized = False
+    instance.client = QdrantClient(":memory:")
+    instance.client.create_collection(
+        collection_name="test",
+        vectors_config=VectorParams(size=2, distance=Distance.COSINE),
+    )
+    instance.add_batch(
+        ids=[1, 2],
+        texts=["east", "north"],
+        embeddings=[[1.0, 0.0], [0.0, 1.0]],
+        metadatas=[{"kind": "a"}, {"kind": "b"}],
+    )
+    return instance
+
+
+def test_search_batch_returns_one_list_per_query(store):
+    results = store.search_batch([[1.0, 0.1], [0.1, 1.0]], n_results=1)
+    assert [[r.text for r in rs] for rs in results] == [["east"], ["north"]]
+    assert results[0][0].metadata == {"kind": "a"}
+
+
+def test_search_batch_applies_filters(store):
+    results = store.search_batch([[1.0, 0.0]], n_results=2, filters={"kind": "b"})
+    assert [r.text for r in results[0]] == ["north"]
+
+
+def test_search_batch_empty(store):
+    assert store.search_batch([]) == []
+
+
+def test_accepts_numpy_embeddings(store):
+    np = pytest.importorskip("numpy")
+
+    store.add_batch(
+        ids=[3],
+        texts=["diagonal"],
+        embeddings=np.array([[1.0, 1.0]], dtype=np.float32),
+        metadatas=[{}],
+    )
+    store.add(4, "west", np.array([-1.0, 0.0], dtype=np.float32), {})
+    results = store.search_batch(np.array([[0.7, 0.7], [-1.0, 0.0]], dtype=np.float32), n_results=1)
+    assert [rs[0].text for rs in results] == ["diagonal", "west"]
+
+
+def test_add_batch_waits_only_for_last_upsert(store, monkeypatch):
+    waits = []
+    upsert = store.client.upsert
+
+    def recording_upsert(**kwargs):
+        waits.append(kwargs["wait"])
+        return upsert(**kwargs)
+
+    monkeypatch.setattr(store.client, "upsert", recording_upsert)
+    n = 250
+    store.add_batch(
+        ids=list(range(10, 10 + n)),
+        texts=["x"] * n,
+        embeddings=[[1.0, 0.5]] * n,
+        metadatas=[{}] * n,
+    )
+    assert waits == [False, False, True]
+    assert store.count() == 2 + n
+
+
+async def test_async_add_batch_overlaps_upserts():
+    from data_clients.vectorstore.qdrant import AsyncQdrantVectorStore
+
+    calls = []
+    in_flight = peak = 0
+
+    class _Client:
+        async def upsert(self, collection_name, points, wait):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            calls.append((len(points.ids), wait))
+
+    store = object.__new__(AsyncQdrantVectorStore)
+    store.collection_name = "test"
+    store.client = _Client()
+    n = 450
+    await store.add_batch(
+        ids=list(range(n)), texts=["x"] * n, embeddings=[[1.0, 0.0]] * n, metadatas=[{}] * n
+    )
+    assert peak == 4
+    assert calls[-1] == (50, True)
+    assert sorted(calls[:-1]) == [(100, False)] * 4
+
+
+@pytest.mark.filterwarnings("ignore:Local mode performs exact")
+def test_search_with_hnsw_params(store):
+    for kwargs in ({}, {"ef_search": 128}, {"exact": True}):
+        results = store.search([1.0, 0.1], n_results=1, **kwargs)
+        assert [r.text for r in results] == ["east"]
+    results = store.search([1.0, 0.1], n_results=1, filters={"kind": "b"})
+    assert results[0].metadata == {"kind": "b"}
+
+
+@pytest.mark.filterwarnings("ignore:Local mode performs exact")
+def test_scalar_quantized_collection_rescores(store):
+    from data_clients.vectorstore.qdrant import _quantization_config, _search_params
+
+    store.client.create_collection(
+        collection_name="quantized",
+        vectors_config=VectorParams(size=2, distance=Distance.COSINE),
+        quantization_config=_quantization_config("scalar"),
+    )
+    store.collection_name = "quantized"
+    store.quantized = True
+    store.add_batch(
+        ids=[1, 2],
+        texts=["east", "north"],
+        embeddings=[[1.0, 0.0], [0.0, 1.0]],
+        metadatas=[{}, {}],
+    )
+    assert store.search([1.0, 0.1], n_results=1)[0].text == "east"
+    assert [rs[0].text for rs in store.search_batch([[0.1, 1.0]], n_results=1)] == ["north"]
+    params = _search_params(None, False, quantized=True)
+    assert params.quantization.rescore is True and params.quantization.oversampling == 2.0
+
+
+def test_rejects_unknown_quantization():
+    from data_clients.exceptions import VectorStoreError
+    from data_clients.vectorstore.qdrant import _check_quantization
+
+    assert _check_quantization(None) is False
+    with pytest.raises(VectorStoreError, match="Unsupported"):
+        _check_quantization("binary")
+
+
+def test_search_results_do_not_leak_text_into_stored_payload(store):
+    first = store.search_batch([[1.0, 0.0]], n_results=1)[0][0]
+    again = store.search_batch([[1.0, 0.0]], n_results=1)[0][0]
+    assert first.text == again.text == "east"
+    assert first.metadata == again.metadata == {"kind": "a"}
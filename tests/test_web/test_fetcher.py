@@ -1,35 +1,281 @@
 """Tests for web fetcher."""
 
+import asyncio
+
 import pytest
 
 from data_clients.web.fetcher import _validate_url, WebFetcher
 from data_clients.exceptions import WebFetchError
 
 
-def test_validate_url_valid():
-    is_safe, error, ip = _validate_url("https://example.com")
-    assert is_safe is True
-    assert error is None
+@pytest.mark.parametrize(
+    "url, expected_safe, error_part",
+    [
+        ("https://example.com", True, None),
+        ("file:///etc/passwd", False, "Blocked URL scheme"),
+        ("http://localhost:8080", False, "localhost"),
+        ("http://", False, "no hostname"),
+        ("http://192.168.1.1", False, "private"),
+    ],
+)
+def test_validate_url(monkeypatch, url, expected_safe, error_part):
+    from data_clients.web import fetcher as fetcher_module
 
+    getaddrinfo = fetcher_module.socket.getaddrinfo
 
-def test_validate_url_blocked_scheme():
-    is_safe, error, _ = _validate_url("file:///etc/passwd")
-    assert is_safe is False
-    assert "Blocked URL scheme" in error
+    def fake_getaddrinfo(host, port):
+        # example.com resolves without live DNS; IP literals need no lookup
+        if host == "example.com":
+            return [(None, None, None, "", ("93.184.216.34", 0))]
+        return getaddrinfo(host, port)
 
+    monkeypatch.setattr(fetcher_module, "_dns_cache", fetcher_module.OrderedDict())
+    monkeypatch.setattr(fetcher_module.socket, "getaddrinfo", fake_getaddrinfo)
+    is_safe, error, _ = _validate_url(url)
+    assert is_safe is expected_safe
+    if error_part is None:
+        assert error is None
+    else:
+        assert error_part in error
 
-def test_validate_url_localhost():
-    is_safe, error, _ = _validate_url("http://localhost:8080")
-    assert is_safe is False
-    assert "localhost" in error
 
+def test_sync_client_reused_until_closed():
+    fetcher = WebFetcher()
+    client = fetcher._get_sync_client()
+    assert fetcher._get_sync_client() is client
+    fetcher.close()
+    assert client.is_closed
+    assert fetcher._get_sync_client() is not client
 
-def test_validate_url_no_hostname():
-    is_safe, error, _ = _validate_url("http://")
-    assert is_safe is False
 
+async def test_async_client_reused_on_same_loop():
+    async with WebFetcher() as fetcher:
+        client = fetcher._get_async_client()
+        assert fetcher._get_async_client() is client
+    assert client.is_closed
+
+
+@pytest.fixture(params=["selectolax", "beautifulsoup"])
+def html_backend(request, monkeypatch):
+    """Run a test against each HTML parsing backend of the fetcher."""
+    from data_clients.web import fetcher as fetcher_module
+
+    if request.param == "selectolax":
+        pytest.importorskip("selectolax.lexbor")
+    else:
+        monkeypatch.setattr(fetcher_module, "HTMLParser", None)
+    return request.param
+
+
+def test_extract_text_drops_scripts_and_chrome(html_backend):
+    from data_clients.web.fetcher import _extract_text
+
+    html = (
+        "<html><body><nav>Menu</nav><script>var x;</script>"
+        "<p>Hello</p><p>world</p><footer>Legal</footer></body></html>"
+    )
+    assert _extract_text(html, 5000) == "Hello\nworld"
+    assert _extract_text(html, 8) == "Hello\nwo"
+    assert _extract_text(html, 5) == "Hello"
+
+
+def test_extract_text_skips_whitespace_only_nodes(html_backend):
+    from data_clients.web.fetcher import _extract_text
+
+    html = "<div>\n  <p> A <b>bold</b> move </p>\n\n  <ul>\n<li>one</li>\n</ul>\n</div>"
+    assert _extract_text(html, 5000) == "A\nbold\nmove\none"
+
+
+def test_extract_links(html_backend):
+    from data_clients.web.fetcher import _extract_links
+
+    html = (
+        '<a href="/a"> First </a><a>no href</a><a href>bare</a>'
+        '<a href="https://b.example">B</a>'
+    )
+    assert _extract_links(html) == [
+        {"href": "/a", "text": "First"},
+        {"href": "", "text": "bare"},
+        {"href": "https://b.example", "text": "B"},
+    ]
 
-def test_validate_url_private_ip():
-    is_safe, error, _ = _validate_url("http://192.168.1.1")
+
+def test_dns_lookups_memoized(monkeypatch):
+    from data_clients.web import fetcher as fetcher_module
+
+    calls = []
+
+    def fake_getaddrinfo(host, port):
+        calls.append(host)
+        return [(None, None, None, "", ("93.184.216.34", 0))]
+
+    monkeypatch.setattr(fetcher_module, "_dns_cache", fetcher_module.OrderedDict())
+    monkeypatch.setattr(fetcher_module.socket, "getaddrinfo", fake_getaddrinfo)
+    assert _validate_url("https://cached.example/a") == (True, None, "93.184.216.34")
+    is_safe, _, _, parsed = fetcher_module._check_url("https://cached.example/b")
+    assert is_safe and parsed.hostname == "cached.example"
+    assert calls == ["cached.example"]
+
+
+async def test_async_check_resolves_off_loop(monkeypatch):
+    from data_clients.web import fetcher as fetcher_module
+
+    async def fake_getaddrinfo(host, port):
+        return [(None, None, None, "", ("10.0.0.5", 0))]
+
+    monkeypatch.setattr(fetcher_module, "_dns_cache", fetcher_module.OrderedDict())
+    loop = asyncio.get_running_loop()
+    monkeypatch.setattr(loop, "getaddrinfo", fake_getaddrinfo)
+    is_safe, error, _, _ = await fetcher_module._check_url_async("https://internal.example")
     assert is_safe is False
     assert "private" in error.lower()
+
+
+def test_decode_head_matches_full_text():
+    import httpx
+    from data_clients.web.fetcher import _decode_head
+
+    body = "héllo wörld — ünïcode ✓ " * 50
+    response = httpx.Response(
+        200, content=body.encode(), headers={"content-type": "text/plain; charset=utf-8"}
+    )
+    for length in (1, 7, 30, 5000):
+        assert _decode_head(response, length) == response.text[:length]
+
+
+def _mock_fetcher(monkeypatch, handler, **kwargs):
+    import httpx
+    from data_clients.web import fetcher as fetcher_module
+
+    def check(url):
+        return True, None, "93.184.216.34", fetcher_module.urlparse(url)
+
+    async def check_async(url):
+        return check(url)
+
+    monkeypatch.setattr(fetcher_module, "_check_url", check)
+    monkeypatch.setattr(fetcher_module, "_check_url_async", check_async)
+    fetcher = WebFetcher(**kwargs)
+    fetcher._sync_client = httpx.Client(
+        transport=httpx.MockTransport(handler), **fetcher_module._client_options()
+    )
+    return fetcher
+
+
+def test_fetch_sync_follows_redirect_and_decodes_gzip(monkeypatch):
+    import gzip
+    import httpx
+
+    def handler(request):
+        if request.url.path == "/old":
+            return httpx.Response(301, headers={"location": "https://site.example/new"})
+        return httpx.Response(
+            200,
+            content=gzip.compress(b"<p>moved here</p>"),
+            headers={"content-type": "text/html", "content-encoding": "gzip"},
+        )
+
+    fetcher = _mock_fetcher(monkeypatch, handler)
+    result = fetcher.fetch_sync("https://site.example/old")
+    assert result["url"] == "https://site.example/new"
+    assert result["content"] == "moved here"
+
+
+def test_fetch_sync_rejects_oversized_stream(monkeypatch):
+    import httpx
+
+    sent = []
+
+    def chunks():
+        for _ in range(1000):
+            sent.append(1)
+            yield b"x" * 1024
+
+    fetcher = _mock_fetcher(
+        monkeypatch, lambda request: httpx.Response(200, content=chunks()), max_response_bytes=4096
+    )
+    with pytest.raises(WebFetchError, match="too large"):
+        fetcher.fetch_sync("https://site.example/big", extract_mode="raw")
+    assert len(sent) < 100  # stopped within one 64 KiB read of the cap
+
+    fetcher = _mock_fetcher(
+        monkeypatch,
+        lambda request: httpx.Response(200, headers={"content-length": "99999"}, content=b""),
+        max_response_bytes=4096,
+    )
+    with pytest.raises(WebFetchError, match="too large"):
+        fetcher.fetch_sync("https://site.example/declared")
+
+
+async def test_fetch_async_reads_capped_body(monkeypatch):
+    import httpx
+
+    def handler(request):
+        return httpx.Response(200, content=b"plain body", headers={"content-type": "text/plain"})
+
+    fetcher = _mock_fetcher(monkeypatch, handler)
+    fetcher._async_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    fetcher._async_client_loop = asyncio.get_running_loop()
+    result = await fetcher.fetch("https://site.example/", extract_mode="raw", max_length=5)
+    assert result["content"] == "plain"
+    await fetcher.aclose()
+
+
+def test_is_blocked_matches_network_membership():
+    import ipaddress
+    from data_clients.web.fetcher import _BLOCKED_NETWORKS, _is_blocked
+
+    samples = [
+        "9.255.255.255", "10.0.0.0", "10.255.255.255", "11.0.0.0", "172.15.255.255",
+        "172.16.0.1", "172.31.255.255", "172.32.0.0", "127.0.0.1", "169.254.1.1",
+        "0.1.2.3", "8.8.8.8", "::1", "::2", "fc00::1", "fdff::1", "fe80::1", "2001:db8::1",
+    ]
+    for sample in samples:
+        ip = ipaddress.ip_address(sample)
+        assert _is_blocked(ip) == any(ip in n for n in _BLOCKED_NETWORKS), sample
+
+
+def test_fetch_sync_sniffs_markup_without_content_type(monkeypatch):
+    import httpx
+
+    bodies = {"/markup": b"\n  <p>tagged</p>", "/plain": b"  not <b>markup</b>"}
+
+    def handler(request):
+        return httpx.Response(
+            200, content=bodies[request.url.path], headers={"content-type": "text/plain"}
+        )
+
+    fetcher = _mock_fetcher(monkeypatch, handler)
+    assert fetcher.fetch_sync("https://site.example/markup")["content"] == "tagged"
+    assert fetcher.fetch_sync("https://site.example/plain")["content"] == "  not <b>markup</b>"
+
+
+def test_precheck_url_is_memoized():
+    from data_clients.web.fetcher import _precheck_url
+
+    url = "https://memo.example/path?q=1"
+    first = _precheck_url(url)
+    hits = _precheck_url.cache_info().hits
+    assert _precheck_url(url) is first
+    assert _precheck_url.cache_info().hits == hits + 1
+    assert _precheck_url("ftp://memo.example")[0].startswith("Blocked URL scheme")
+
+
+def test_fetch_sync_does_not_persist_cookies(monkeypatch):
+    import httpx
+
+    sent = []
+
+    def handler(request):
+        sent.append(request.headers.get("cookie"))
+        return httpx.Response(
+            200,
+            text="ok",
+            headers={"content-type": "text/plain", "set-cookie": "sid=secret; Path=/"},
+        )
+
+    fetcher = _mock_fetcher(monkeypatch, handler)
+    fetcher.fetch_sync("https://a.example/one")
+    fetcher.fetch_sync("https://a.example/two")
+    assert sent == [None, None]
+    assert not fetcher._sync_client.cookies
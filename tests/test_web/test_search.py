@@ -14,3 +14,280 @@ def test_init_requires_api_key():
 def test_init_succeeds():
     client = BraveSearchClient(api_key="test-key")
     assert client.api_key == "test-key"
+
+
+def _mock_client(handler):
+    import httpx
+
+    client = BraveSearchClient(api_key="test-key")
+    client._sync_client = httpx.Client(
+        transport=httpx.MockTransport(handler), headers=client._headers
+    )
+    return client
+
+
+def test_search_sync_reuses_pooled_client():
+    import httpx
+
+    seen = []
+
+    def handler(request):
+        seen.append(request)
+        return httpx.Response(200, json={"web": {"results": [
+            {"title": "A", "url": "https://a.example", "description": "first"},
+            {"title": "B", "url": "https://b.example"},
+        ]}})
+
+    client = _mock_client(handler)
+    pooled = client._get_sync_client()
+    assert client.search_sync("q", num_results=1) == [
+        {"title": "A", "url": "https://a.example", "description": "first"}
+    ]
+    second = client.search_sync("q")[1]
+    assert second == {"title": "B", "url": "https://b.example", "description": ""}
+    assert client._get_sync_client() is pooled
+    assert seen[0].headers["X-Subscription-Token"] == "test-key"
+    assert seen[0].url.params["count"] == "1"
+    client.close()
+    assert pooled.is_closed
+
+
+def test_search_sync_wraps_http_errors():
+    import httpx
+
+    client = _mock_client(lambda request: httpx.Response(429))
+    with pytest.raises(WebSearchError, match="Web search failed"):
+        client.search_sync("q")
+
+
+def test_pool_limits_override():
+    import httpx
+
+    limits = httpx.Limits(max_connections=5)
+    client = BraveSearchClient(api_key="test-key", pool_limits=limits)
+    assert client._client_options()["limits"] is limits
+    assert BraveSearchClient(api_key="k")._client_options()["limits"].max_connections == 1000
+
+
+def _streamed_results(count, sent):
+    import json
+
+    body = json.dumps({
+        "query": {"original": "q"},
+        "web": {"results": [
+            {"title": f"T{i}", "url": f"https://{i}.example", "extra": {"deep": [1, 2]}}
+            for i in range(count)
+        ]},
+    }).encode()
+
+    def chunks():
+        for i in range(0, len(body), 64):
+            sent.append(i)
+            yield body[i : i + 64]
+
+    return chunks
+
+
+def test_search_sync_stops_reading_after_enough_results():
+    import httpx
+
+    pytest.importorskip("ijson")
+    sent = []
+    chunks = _streamed_results(200, sent)
+    client = _mock_client(lambda request: httpx.Response(200, content=chunks()))
+    results = client.search_sync("q", num_results=2)
+    assert results == [
+        {"title": "T0", "url": "https://0.example", "description": ""},
+        {"title": "T1", "url": "https://1.example", "description": ""},
+    ]
+    assert len(sent) < 10
+
+
+def test_search_sync_without_ijson(monkeypatch):
+    import httpx
+    from data_clients.web import search as search_module
+
+    monkeypatch.setattr(search_module, "ijson", None)
+    chunks = _streamed_results(3, [])
+    client = _mock_client(lambda request: httpx.Response(200, content=chunks()))
+    assert [r["title"] for r in client.search_sync("q", num_results=5)] == ["T0", "T1", "T2"]
+
+
+async def test_search_async_streams_results():
+    import asyncio
+    import httpx
+
+    pytest.importorskip("ijson")
+    sent = []
+
+    async def chunks():
+        for chunk in _streamed_results(3, sent)():
+            yield chunk
+
+    client = BraveSearchClient(api_key="test-key")
+    client._async_client = httpx.AsyncClient(
+        transport=httpx.MockTransport(lambda request: httpx.Response(200, content=chunks()))
+    )
+    client._async_client_loop = asyncio.get_running_loop()
+    assert [r["title"] for r in await client.search("q", num_results=5)] == ["T0", "T1", "T2"]
+    await client.aclose()
+
+
+def test_rate_limiter_sliding_window(monkeypatch):
+    from data_clients.web import search as search_module
+
+    now = [100.0]
+    monkeypatch.setattr(search_module.time, "monotonic", lambda: now[0])
+    limiter = search_module._RateLimiter(requests_per_minute=2)
+    assert limiter._reserve() == 0.0
+    now[0] += 10
+    assert limiter._reserve() == 0.0
+    assert limiter._reserve() == pytest.approx(50.0)
+    now[0] += 50
+    assert limiter._reserve() == 0.0
+
+
+def test_rate_limiter_pauses_on_headers(monkeypatch):
+    import httpx
+    from data_clients.web import search as search_module
+
+    monkeypatch.setattr(search_module.time, "monotonic", lambda: 100.0)
+    limiter = search_module._RateLimiter()
+    limiter.update(httpx.Headers({
+        "X-RateLimit-Limit": "20, 15000",
+        "X-RateLimit-Remaining": "10, 9000",
+        "X-RateLimit-Reset": "1, 86400",
+    }))
+    assert limiter._reserve() == 0.0
+    limiter.update(httpx.Headers({
+        "X-RateLimit-Limit": "20, 15000",
+        "X-RateLimit-Remaining": "1, 9000",
+        "X-RateLimit-Reset": "1, 86400",
+    }))
+    assert limiter._reserve() == pytest.approx(1.0)
+    limiter.update(httpx.Headers({"Retry-After": "5"}))
+    assert limiter._reserve() == pytest.approx(5.0)
+
+
+def test_search_sync_honours_retry_after():
+    import httpx
+
+    client = _mock_client(lambda request: httpx.Response(429, headers={"Retry-After": "30"}))
+    with pytest.raises(WebSearchError):
+        client.search_sync("q")
+    assert client._limiter._reserve() > 29
+
+
+def test_concurrency_aimd():
+    from data_clients.web.search import _Concurrency
+
+    concurrency = _Concurrency(maximum=6, initial=4)
+    concurrency.record(200, 0.1)
+    assert concurrency.limit == 4.5
+    concurrency.record(200, 5.0)
+    assert concurrency.limit == 4.5
+    concurrency.record(429, 0.1)
+    assert concurrency.limit == 2.25
+    concurrency.record(503, 0.1)
+    concurrency.record(503, 0.1)
+    assert concurrency.limit == 1.0
+    for _ in range(20):
+        concurrency.record(200, 0.1)
+    assert concurrency.limit == 6.0
+
+
+async def test_concurrency_caps_in_flight_searches():
+    import asyncio
+    from data_clients.web.search import _Concurrency
+
+    concurrency = _Concurrency(maximum=8, initial=2)
+    active = []
+    peak = 0
+
+    async def job():
+        nonlocal peak
+        async with concurrency:
+            active.append(1)
+            peak = max(peak, len(active))
+            await asyncio.sleep(0.01)
+            active.pop()
+
+    await asyncio.gather(*(job() for _ in range(6)))
+    assert peak == 2
+
+
+def test_search_sync_caches_results(monkeypatch):
+    import httpx
+    from data_clients.web import search as search_module
+
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(200, json={"web": {"results": [{"title": "A", "url": "u"}]}})
+
+    now = [100.0]
+    monkeypatch.setattr(search_module.time, "monotonic", lambda: now[0])
+    client = _mock_client(handler)
+    first = client.search_sync("Python  asyncio")
+    first[0]["title"] = "mutated"
+    assert client.search_sync(" python asyncio ")[0]["title"] == "A"
+    assert len(calls) == 1
+    client.search_sync("python asyncio", num_results=3)
+    assert len(calls) == 2
+    now[0] += 301
+    client.search_sync("python asyncio")
+    assert len(calls) == 3
+
+
+def test_search_cache_evicts_lru_and_can_be_disabled():
+    import httpx
+
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.params["q"])
+        return httpx.Response(200, json={"web": {"results": []}})
+
+    client = _mock_client(handler)
+    client.cache_size = 2
+    for query in ["a", "b", "a", "c", "a", "b"]:
+        client.search_sync(query)
+    assert calls == ["a", "b", "c", "b"]
+
+    client.clear_cache()
+    client.cache_size = 0
+    client.search_sync("a")
+    client.search_sync("a")
+    assert calls[-2:] == ["a", "a"]
+
+
+def test_failed_search_is_not_cached():
+    import httpx
+
+    client = _mock_client(lambda request: httpx.Response(500))
+    with pytest.raises(WebSearchError):
+        client.search_sync("q")
+    assert not client._cache
+
+
+def test_small_responses_parsed_in_one_call(monkeypatch):
+    import httpx
+    from data_clients.web import search as search_module
+
+    parsed = []
+
+    class FakeOrjson:
+        @staticmethod
+        def loads(body):
+            parsed.append(body)
+            return {"web": {"results": [{"title": "A", "url": "u"}]}}
+
+    monkeypatch.setattr(search_module, "orjson", FakeOrjson)
+    client = _mock_client(lambda request: httpx.Response(200, json={"web": {}}))
+    assert client.search_sync("q")[0]["title"] == "A"
+    assert len(parsed) == 1
+
+    monkeypatch.setattr(search_module, "orjson", None)
+    client.clear_cache()
+    assert client.search_sync("q") == []
@@ -0,0 +1,313 @@
+"""Tests for WhatsApp reader."""
+
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+from data_clients.whatsapp.reader import WhatsAppDBReader, APPLE_EPOCH_OFFSET
+from data_clients.exceptions import WhatsAppReadError
+
+
+@pytest.fixture
+def chat_storage(tmp_path):
+    """Create a minimal ChatStorage.sqlite for testing."""
+    db_path = tmp_path / "ChatStorage.sqlite"
+    conn = sqlite3.connect(str(db_path))
+    conn.execute("""
+        CREATE TABLE ZWACHATSESSION (
+            Z_PK INTEGER PRIMARY KEY,
+            ZPARTNERNAME TEXT,
+            ZSESSIONTYPE INTEGER,
+            ZCONTACTJID TEXT
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE ZWAMESSAGE (
+            Z_PK INTEGER PRIMARY KEY,
+            ZCHATSESSION INTEGER,
+            ZTEXT TEXT,
+            ZMESSAGEDATE REAL,
+            ZISFROMME INTEGER,
+            ZFROMJID TEXT,
+            ZTOJID TEXT,
+            ZMESSAGETYPE INTEGER,
+            ZPUSHNAME TEXT
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE ZWAGROUPMEMBER (
+            Z_PK INTEGER PRIMARY KEY,
+            ZCHATSESSION INTEGER,
+            ZMEMBERJID TEXT
+        )
+    """)
+
+    apple_ts = datetime.now().timestamp() - APPLE_EPOCH_OFFSET
+    conn.executemany(
+        "INSERT INTO ZWACHATSESSION VALUES (?, ?, ?, ?)",
+        [
+            (1, "Alice", 0, "alice@s.whatsapp.net"),
+            (2, "Family", 1, "family@g.us"),
+            (3, "Status", 3, "status@broadcast"),
+        ],
+    )
+    conn.executemany(
+        "INSERT INTO ZWAMESSAGE VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        [
+            (1, 1, "Hi Alice", apple_ts - 60, 1, None, "alice@s.whatsapp.net", 0, None),
+            (2, 1, "Hello!", apple_ts - 30, 0, "alice@s.whatsapp.net", None, 0, "Alice"),
+            (3, 2, "Dinner?", apple_ts - 10, 0, "bob@s.whatsapp.net", None, 0, "Bob"),
+            (4, 3, "story", apple_ts, 0, "carol@s.whatsapp.net", None, 1, "Carol"),
+        ],
+    )
+    conn.executemany(
+        "INSERT INTO ZWAGROUPMEMBER VALUES (?, ?, ?)",
+        [(1, 2, "bob@s.whatsapp.net"), (2, 2, "carol@s.whatsapp.net"), (3, 2, None)],
+    )
+    conn.commit()
+    conn.close()
+    return db_path
+
+
+def test_fetch_conversations(chat_storage):
+    reader = WhatsAppDBReader(db_path=chat_storage)
+    convos = reader.fetch_conversations(days=1)
+    assert [c["display_name"] for c in convos] == ["Family", "Alice"]
+    family, alice = convos
+    assert family["is_group"] is True
+    assert family["participant_ids"] == ["bob@s.whatsapp.net", "carol@s.whatsapp.net"]
+    assert alice["chat_guid"] == "whatsapp:alice@s.whatsapp.net"
+    assert alice["participant_ids"] == []
+    assert alice["last_message_date"]
+
+
+def test_fetch_messages(chat_storage):
+    reader = WhatsAppDBReader(db_path=chat_storage)
+    messages = reader.fetch_messages("whatsapp:alice@s.whatsapp.net", days=1)
+    assert [m["text"] for m in messages] == ["Hi Alice", "Hello!"]
+    assert messages[0]["sender_id"] == "me"
+    assert messages[1]["sender_push_name"] == "Alice"
+    assert messages[1]["message_guid"] == f"{chat_storage.parent.name}:2"
+
+
+def test_missing_db(tmp_path):
+    reader = WhatsAppDBReader(db_path=tmp_path / "missing.sqlite")
+    with pytest.raises(WhatsAppReadError, match="not found"):
+        reader.fetch_conversations()
+
+
+def test_connection_is_cached_and_read_only(chat_storage):
+    reader = WhatsAppDBReader(db_path=chat_storage)
+    reader.fetch_conversations(days=1)
+    conn = reader._connect(chat_storage)
+    reader.fetch_messages("whatsapp:pk:2", days=1)
+    assert reader._connect(chat_storage) is conn
+    assert conn.execute("PRAGMA query_only").fetchone()[0] == 1
+    with pytest.raises(sqlite3.OperationalError):
+        conn.execute("DELETE FROM ZWAMESSAGE")
+
+
+def test_cached_connection_sees_new_rows(chat_storage):
+    with WhatsAppDBReader(db_path=chat_storage) as reader:
+        assert len(reader.fetch_messages("whatsapp:pk:2", days=1)) == 1
+        writer = sqlite3.connect(str(chat_storage))
+        writer.execute(
+            "INSERT INTO ZWAMESSAGE (ZCHATSESSION, ZTEXT, ZMESSAGEDATE, ZISFROMME) "
+            "VALUES (2, 'Sure', ?, 1)",
+            (datetime.now().timestamp() - APPLE_EPOCH_OFFSET,),
+        )
+        writer.commit()
+        writer.close()
+        assert len(reader.fetch_messages("whatsapp:pk:2", days=1)) == 2
+    assert reader._open_conns == []
+
+
+def test_group_participants_fetched_in_one_query(chat_storage):
+    reader = WhatsAppDBReader(db_path=chat_storage)
+    conn = reader._connect(chat_storage)
+    statements = []
+    conn.set_trace_callback(statements.append)
+    reader.fetch_conversations(days=1)
+    assert sum("ZWAGROUPMEMBER" in s for s in statements) == 1
+    assert reader._get_group_participants(conn, []) == {}
+
+
+def test_group_participants_without_member_table(chat_storage):
+    conn = sqlite3.connect(str(chat_storage))
+    conn.execute("DROP TABLE ZWAGROUPMEMBER")
+    conn.commit()
+    conn.close()
+    family = WhatsAppDBReader(db_path=chat_storage).fetch_conversations(days=1)[0]
+    assert family["is_group"] is True
+    assert family["participant_ids"] == []
+
+
+def test_excluded_contacts_filtered_before_limit(chat_storage):
+    reader = WhatsAppDBReader(db_path=chat_storage)
+    convos = reader.fetch_conversations(days=1, limit=1, excluded_contacts=["FAM"])
+    assert [c["display_name"] for c in convos] == ["Alice"]
+    assert reader.fetch_conversations(days=1, excluded_contacts=["ali", "mil"]) == []
+    assert len(reader.fetch_conversations(days=1, excluded_contacts=["%"])) == 2
+
+
+def test_excluded_contacts_non_ascii(chat_storage):
+    conn = sqlite3.connect(str(chat_storage))
+    conn.execute("UPDATE ZWACHATSESSION SET ZPARTNERNAME = 'ÉMILE' WHERE Z_PK = 1")
+    conn.commit()
+    conn.close()
+    reader = WhatsAppDBReader(db_path=chat_storage)
+    convos = reader.fetch_conversations(days=1, excluded_contacts=["émile"])
+    assert [c["display_name"] for c in convos] == ["Family"]
+
+
+def test_apple_ts_to_iso():
+    to_iso = WhatsAppDBReader._apple_ts_to_iso
+    assert to_iso(None) == ""
+    assert to_iso(0) == ""
+    assert to_iso(1e30) == ""
+    expected = datetime.fromtimestamp(700000000.5 + APPLE_EPOCH_OFFSET).isoformat()
+    assert to_iso(700000000.5) == expected
+    assert to_iso(700000000) == datetime.fromtimestamp(700000000 + APPLE_EPOCH_OFFSET).isoformat()
+
+
+def test_apple_ts_since():
+    since = WhatsAppDBReader._apple_ts_since(2)
+    assert isinstance(since, int)
+    expected = datetime.now().timestamp() - 2 * 86400 - APPLE_EPOCH_OFFSET
+    assert since == pytest.approx(expected, abs=5)
+
+
+def test_fetch_conversations_skips_sessions_without_recent_messages(chat_storage):
+    old_ts = datetime.now().timestamp() - APPLE_EPOCH_OFFSET - 10 * 86400
+    conn = sqlite3.connect(str(chat_storage))
+    conn.execute("INSERT INTO ZWACHATSESSION VALUES (4, 'Dormant', 0, 'old@s.whatsapp.net')")
+    conn.execute("INSERT INTO ZWACHATSESSION VALUES (5, 'Empty', 0, 'empty@s.whatsapp.net')")
+    conn.execute(
+        "INSERT INTO ZWAMESSAGE (ZCHATSESSION, ZTEXT, ZMESSAGEDATE) VALUES (4, 'old', ?)",
+        (old_ts,),
+    )
+    conn.commit()
+    conn.close()
+    reader = WhatsAppDBReader(db_path=chat_storage)
+    assert [c["display_name"] for c in reader.fetch_conversations(days=1)] == ["Family", "Alice"]
+    names = [c["display_name"] for c in reader.fetch_conversations(days=30)]
+    assert names == ["Family", "Alice", "Dormant"]
+
+
+def test_find_db_paths_scans_mobile_documents(tmp_path, monkeypatch):
+    from data_clients.whatsapp import reader as reader_module
+
+    docs = tmp_path / "Mobile Documents"
+    shallow = docs / "Accounts" / "123" / "ChatStorage.sqlite"
+    too_deep = docs / "a" / "b" / "c" / "d" / "ChatStorage.sqlite"
+    for path in (shallow, too_deep):
+        path.parent.mkdir(parents=True)
+        path.touch()
+    monkeypatch.setattr(reader_module, "WHATSAPP_GROUP_CONTAINER", tmp_path / "missing.sqlite")
+    monkeypatch.setattr(reader_module, "WHATSAPP_MOBILE_DOCUMENTS", docs)
+    assert reader_module._find_db_paths() == [shallow]
+
+    monkeypatch.setattr(reader_module, "WHATSAPP_MOBILE_DOCUMENTS", tmp_path / "absent")
+    assert reader_module._find_db_paths() == []
+
+
+def test_fetch_messages_reuses_session_pk_from_conversations(chat_storage):
+    reader = WhatsAppDBReader(db_path=chat_storage)
+    reader.fetch_conversations(days=1)
+    statements = []
+    reader._connect(chat_storage).set_trace_callback(statements.append)
+    reader.fetch_messages("whatsapp:alice@s.whatsapp.net", days=1)
+    assert not any("ZCONTACTJID = ?" in s for s in statements)
+    assert reader._session_pk_cache["alice@s.whatsapp.net"] == 1
+
+
+def test_resolved_db_path_is_memoized(chat_storage, tmp_path, monkeypatch):
+    reader = WhatsAppDBReader(db_path=chat_storage)
+    assert reader._resolve_db_path() == chat_storage
+    monkeypatch.setattr(type(chat_storage), "exists", lambda self: False)
+    assert reader._resolve_db_path() == chat_storage
+    reader.db_path = tmp_path / "other.sqlite"
+    with pytest.raises(WhatsAppReadError, match="not found"):
+        reader._resolve_db_path()
+
+
+def test_threads_get_their_own_connection(chat_storage):
+    import threading
+
+    reader = WhatsAppDBReader(db_path=chat_storage)
+    main_conn = reader._connect(chat_storage)
+    other = []
+    thread = threading.Thread(target=lambda: other.append(reader._connect(chat_storage)))
+    thread.start()
+    thread.join()
+    assert other[0] is not main_conn
+    assert len(reader._open_conns) == 2
+    reader.close()
+    assert reader._connect(chat_storage) is not main_conn
+    reader.close()
+
+
+async def test_fetch_all_messages(chat_storage):
+    with WhatsAppDBReader(db_path=chat_storage) as reader:
+        result = await reader.fetch_all_messages(
+            ["whatsapp:pk:2", "whatsapp:alice@s.whatsapp.net"], days=1, concurrency=2
+        )
+    assert list(result) == ["whatsapp:pk:2", "whatsapp:alice@s.whatsapp.net"]
+    assert [m["text"] for m in result["whatsapp:pk:2"]] == ["Dinner?"]
+    assert len(result["whatsapp:alice@s.whatsapp.net"]) == 2
+
+
+def test_conversations_sql_is_built_once_per_shape():
+    from data_clients.whatsapp.reader import _conversations_sql
+
+    assert _conversations_sql(()) is _conversations_sql(())
+    sql = _conversations_sql(("LOWER", "casefold"))
+    assert sql.count("instr(") == 2
+    assert "casefold(COALESCE" in sql
+
+
+def test_apple_ts_to_iso_outside_fast_range():
+    to_iso = WhatsAppDBReader._apple_ts_to_iso
+    before_1970 = -APPLE_EPOCH_OFFSET - 86400
+    assert to_iso(before_1970) == datetime.fromtimestamp(-86400).isoformat()
+    assert to_iso(float("inf")) == ""
+
+
+def test_excluded_contacts_casefold(chat_storage):
+    conn = sqlite3.connect(str(chat_storage))
+    conn.execute("UPDATE ZWACHATSESSION SET ZPARTNERNAME = 'Familie Straße' WHERE Z_PK = 2")
+    conn.commit()
+    conn.close()
+    reader = WhatsAppDBReader(db_path=chat_storage)
+    convos = reader.fetch_conversations(days=1, excluded_contacts=["STRAẞE"])
+    assert [c["display_name"] for c in convos] == ["Alice"]
+
+
+def test_results_build_slotted_models(chat_storage):
+    from data_clients.whatsapp.models import Conversation, ParsedMessage
+
+    reader = WhatsAppDBReader(db_path=chat_storage)
+    conversation = Conversation(**reader.fetch_conversations(days=1)[0])
+    conversation.messages = [
+        ParsedMessage(**m) for m in reader.fetch_messages(conversation.chat_guid, days=1)
+    ]
+    assert conversation.messages[0].text == "Dinner?"
+    assert not hasattr(conversation.messages[0], "__dict__")
+
+
+def test_fetch_messages_coalesces_nulls(chat_storage):
+    conn = sqlite3.connect(str(chat_storage))
+    conn.execute(
+        "UPDATE ZWAMESSAGE SET ZTEXT = NULL, ZISFROMME = NULL, ZFROMJID = NULL, "
+        "ZMESSAGETYPE = NULL, ZPUSHNAME = NULL WHERE Z_PK = 3"
+    )
+    conn.commit()
+    conn.close()
+    msg = WhatsAppDBReader(db_path=chat_storage).fetch_messages("whatsapp:pk:2", days=1)[0]
+    assert msg["text"] == ""
+    assert msg["sender_id"] == ""
+    assert msg["sender_is_me"] is False
+    assert msg["sender_push_name"] == ""
+    assert msg["message_type"] == 0
+    assert msg["has_media"] is False